@@ -0,0 +1,139 @@
+import time
+
+import pygame
+
+# -----------------------------
+# Audio
+# -----------------------------
+# Sounds are loaded once into a cache and played on channel groups: each
+# category ('sfx', 'ui', ...) owns a fixed set of reserved mixer channels,
+# so rapid gunfire can never take the channels menu sounds need. When every
+# channel in a group is busy, the voice that started longest ago is stopped
+# and reused.
+#
+# Volume is master * group * per-sound; changing the master (pause menu)
+# or a group re-applies it to every channel from one place.
+#
+# Audio opens the mixer itself, with a small buffer for low latency. main.py
+# never calls pygame.init() (it starts only the subsystems it uses), so
+# nothing opens the mixer with defaults first; make_audio() runs on the
+# loader thread alongside the other assets. Where there is no audio device,
+# or for headless runs, NullAudio has the same interface and does nothing.
+
+DEFAULT_GROUPS = {'sfx': 8, 'ui': 2}
+
+
+class Audio:
+    def __init__(self, groups=None, frequency=44100, buffer=512, channels=2, clock=time.perf_counter):
+        groups = dict(groups or DEFAULT_GROUPS)
+        pygame.mixer.init(frequency, -16, channels, buffer)
+        total = sum(groups.values())
+        pygame.mixer.set_num_channels(total)
+        # Reserve every channel so Sound.play() elsewhere can't grab one
+        pygame.mixer.set_reserved(total)
+
+        self.clock = clock
+        self.buffer = buffer
+        self.master = 1.0
+        self.group_volume = {group: 1.0 for group in groups}
+        self.channels = {}    # group -> [Channel]
+        self.started = {}     # group -> start time per channel
+        self.voice = {}       # group -> volume of the sound each channel last played
+        first = 0
+        for group, count in groups.items():
+            self.channels[group] = [pygame.mixer.Channel(first + i) for i in range(count)]
+            self.started[group] = [0.0] * count
+            self.voice[group] = [1.0] * count
+            first += count
+        self.sounds = {}      # name -> (Sound or None, group, volume)
+        self.plays = 0
+        self.steals = 0
+
+    def load(self, name, path, group='sfx', volume=1.0):
+        """Load and cache a sound. A missing or unreadable file plays as silence."""
+        if group not in self.channels:
+            raise KeyError(f"Unknown audio group: {group}")
+        try:
+            sound = pygame.mixer.Sound(path)
+        except (pygame.error, FileNotFoundError):
+            print(f"Could not load sound {path}")
+            sound = None
+        self.sounds[name] = (sound, group, volume)
+
+    def play(self, name):
+        sound, group, volume = self.sounds[name]
+        if sound is None:
+            return
+        channels = self.channels[group]
+        started = self.started[group]
+        slot = next((i for i, channel in enumerate(channels) if not channel.get_busy()), None)
+        if slot is None:
+            # Over the group's voice limit: steal the oldest
+            slot = min(range(len(channels)), key=started.__getitem__)
+            channels[slot].stop()
+            self.steals += 1
+        channels[slot].set_volume(self.master * self.group_volume[group] * volume)
+        channels[slot].play(sound)
+        started[slot] = self.clock()
+        self.voice[group][slot] = volume
+        self.plays += 1
+
+    def set_volume(self, volume, group=None):
+        """Master volume, or one group's volume if group is given."""
+        if group is None:
+            self.master = volume
+        else:
+            self.group_volume[group] = volume
+        for name, channels in self.channels.items():
+            level = self.master * self.group_volume[name]
+            for channel, voice in zip(channels, self.voice[name]):
+                channel.set_volume(level * voice)
+
+    def stop(self):
+        pygame.mixer.stop()
+
+    def stats(self):
+        return {'plays': self.plays, 'steals': self.steals, 'buffer': self.buffer,
+                'channels': {group: len(channels) for group, channels in self.channels.items()}}
+
+
+class NullAudio:
+    """Same interface as Audio, no mixer; still counts plays for stats()."""
+
+    def __init__(self, groups=None, **kwargs):
+        self.master = 1.0
+        self.group_volume = {group: 1.0 for group in (groups or DEFAULT_GROUPS)}
+        self.sounds = {}
+        self.plays = 0
+        self.steals = 0
+
+    def load(self, name, path, group='sfx', volume=1.0):
+        if group not in self.group_volume:
+            raise KeyError(f"Unknown audio group: {group}")
+        self.sounds[name] = (None, group, volume)
+
+    def play(self, name):
+        self.sounds[name]
+        self.plays += 1
+
+    def set_volume(self, volume, group=None):
+        if group is None:
+            self.master = volume
+        else:
+            self.group_volume[group] = volume
+
+    def stop(self):
+        pass
+
+    def stats(self):
+        return {'plays': self.plays, 'steals': 0, 'buffer': None, 'channels': {}}
+
+
+def make_audio(enabled=True, **kwargs):
+    """Audio if asked for and a device opens, NullAudio otherwise."""
+    if enabled:
+        try:
+            return Audio(**kwargs)
+        except pygame.error as e:
+            print(f"Audio unavailable ({e}), continuing without sound.")
+    return NullAudio(**kwargs)
@@ -0,0 +1,127 @@
+"""Per-tick allocation and garbage collector activity during headless play.
+
+Run from the repo root:
+
+    python -m benchmarks.allocations --ticks 20000
+
+Plays one seeded game with the kite bot (restarting it on death). The
+first --warmup ticks fill the entity stores; the rest are measured for:
+
+  - gc collections per generation and the time spent in them (gc.callbacks)
+  - tracemalloc: peak traced memory above the warmed-up baseline, net
+    growth, and the top allocation sites still alive at the end
+  - entity store capacity stats
+
+--spawn-interval 0.05 keeps a few hundred enemies alive; --render also
+draws every tick through the sprite batch (dummy video driver).
+"""
+import gc
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+
+import engine
+from entities import OVERFLOW_POLICIES
+from bots import Observation, make_bot
+
+
+class GcWatch:
+    """Counts collections per generation and times each one."""
+
+    def __init__(self):
+        self.collections = [0, 0, 0]
+        self.pauses = []
+        self._started = None
+
+    def __call__(self, phase, info):
+        if phase == 'start':
+            self._started = time.perf_counter()
+        elif self._started is not None:
+            self.collections[info['generation']] += 1
+            self.pauses.append(time.perf_counter() - self._started)
+            self._started = None
+
+
+def play(world, bot, ticks, draw=None):
+    for _ in range(ticks):
+        if world.dead:
+            world.reset()
+        engine.step(world, bot.act(Observation(world)), engine.FRAME_DT)
+        if draw is not None:
+            draw(world)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--ticks', type=int, default=20_000)
+    parser.add_argument('--warmup', type=int, default=3_000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--bot', default='kite')
+    parser.add_argument('--spawn-interval', type=float, help="override config spawn_interval")
+    parser.add_argument('--overflow', choices=OVERFLOW_POLICIES, help="override config entity_overflow")
+    parser.add_argument('--render', action='store_true', help="draw every tick with the sprite batch")
+    args = parser.parse_args(argv)
+
+    overrides = {}
+    if args.spawn_interval is not None:
+        overrides['spawn_interval'] = args.spawn_interval
+    if args.overflow is not None:
+        overrides['entity_overflow'] = args.overflow
+    world = engine.World(engine.make_config(**overrides), seed=args.seed)
+    bot = make_bot(args.bot, args.seed)
+
+    draw = None
+    if args.render:
+        os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+        import pygame
+        from sprites import SpriteSheet, SpriteBatch
+        pygame.display.init()
+        screen = pygame.display.set_mode((engine.WIDTH, engine.HEIGHT))
+        batch = SpriteBatch(SpriteSheet(world.config))
+        draw = lambda world: batch.draw(screen, world)
+
+    play(world, bot, args.warmup, draw)
+
+    # GC activity, untraced so timings aren't skewed by tracemalloc
+    watch = GcWatch()
+    gc.collect()
+    gc.callbacks.append(watch)
+    started = time.perf_counter()
+    play(world, bot, args.ticks, draw)
+    wall = time.perf_counter() - started
+    gc.callbacks.remove(watch)
+
+    # Memory, traced over a second stretch of the same game
+    tracemalloc.start(10)
+    gc.collect()
+    tracemalloc.reset_peak()
+    base, _ = tracemalloc.get_traced_memory()
+    before = tracemalloc.take_snapshot()
+    play(world, bot, args.ticks, draw)
+    peak = tracemalloc.get_traced_memory()[1]
+    gc.collect()
+    current = tracemalloc.get_traced_memory()[0]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    pauses_ms = sorted(p * 1000 for p in watch.pauses)
+    print(f"ticks measured:        {args.ticks:,} ({args.ticks / wall:,.0f} ticks/s)")
+    print(f"gc collections:        gen0 {watch.collections[0]}, gen1 {watch.collections[1]}, "
+          f"gen2 {watch.collections[2]}  ({sum(watch.collections) / args.ticks * 1000:.1f} per 1k ticks)")
+    if pauses_ms:
+        print(f"gc pause:              total {sum(pauses_ms):.2f} ms, max {pauses_ms[-1]:.3f} ms")
+    print(f"tracemalloc peak:      {(peak - base) / 1024:.1f} KiB above baseline")
+    print(f"net growth:            {(current - base) / 1024:.1f} KiB over {args.ticks:,} ticks")
+    print("largest surviving allocation sites:")
+    for stat in after.compare_to(before, 'lineno')[:5]:
+        if stat.size_diff:
+            print(f"  {stat.size_diff / 1024:+8.1f} KiB  {stat.traceback}")
+    for name in ('projectiles', 'enemies', 'heal_pickups'):
+        stats = getattr(world, name).stats()
+        print(f"{name + ':':22} " + ", ".join(f"{k} {v}" for k, v in stats.items()))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
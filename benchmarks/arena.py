@@ -0,0 +1,89 @@
+"""Tick and draw cost as the world grows past the screen, at a fixed enemy density.
+
+Run from the repo root (no window needed):
+
+    python -m benchmarks.arena
+
+Enemies are scattered over worlds from one screen up to 20000x20000,
+`--per-screen` of them per screen's worth of area, all chasing one
+player in the middle. 'step' is engine.step with and without the update
+LOD for far enemies; 'draw' is SpriteBatch.draw culled to the camera
+view versus handing every entity to blits().
+"""
+import os
+import sys
+import time
+import argparse
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import numpy as np
+import pygame
+
+import engine
+from engine import WIDTH, HEIGHT
+from camera import Camera
+from sprites import SpriteSheet, SpriteBatch
+
+WORLDS = [(WIDTH, HEIGHT), (4 * WIDTH, 4 * HEIGHT), (10_000, 10_000), (20_000, 20_000)]
+NO_LOD = float('inf')
+
+
+def make_world(size, per_screen, lod_distance, seed):
+    width, height = size
+    n = round(per_screen * width * height / (WIDTH * HEIGHT))
+    config = engine.make_config(world_width=width, world_height=height, lod_distance=lod_distance,
+                                spawn_interval=float('inf'), enemy_capacity=n)
+    world = engine.World(config, seed=seed)
+    rng = np.random.default_rng(seed)
+    xs, ys = rng.uniform(0, width, n), rng.uniform(0, height, n)
+    kinds = rng.integers(0, len(config['enemy_types']), n).astype(np.int8)
+    world.enemies.add_many(n, x=xs, y=ys, prev_x=xs, prev_y=ys, size=config['enemy_size'],
+                           speed=120.0, damage=0, points=0, kind=kinds, far=False)
+    return world
+
+
+def ms_per_tick(world, ticks):
+    for _ in range(ticks // 4):   # warm up, and let the LOD sort near from far
+        engine.step(world, engine.IDLE)
+    started = time.perf_counter()
+    for _ in range(ticks):
+        engine.step(world, engine.IDLE)
+    return (time.perf_counter() - started) / ticks * 1000
+
+
+def ms_per_draw(batch, screen, world, camera, frames):
+    started = time.perf_counter()
+    for _ in range(frames):
+        batch.draw(screen, world, 0.5, camera)
+    return (time.perf_counter() - started) / frames * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--per-screen', type=int, default=50, help="enemies per screen's worth of world")
+    parser.add_argument('--ticks', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    pygame.display.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+
+    print(f"{'world':>12} {'enemies':>8} {'step':>8} {'step+LOD':>9} {'draw all':>9} {'draw view':>10}   (ms)")
+    for size in WORLDS:
+        step_all = ms_per_tick(make_world(size, args.per_screen, NO_LOD, args.seed), args.ticks)
+        world = make_world(size, args.per_screen, engine.DEFAULT_CONFIG['lod_distance'], args.seed)
+        step_lod = ms_per_tick(world, args.ticks)
+
+        batch = SpriteBatch(SpriteSheet(world.config))
+        camera = Camera()
+        camera.follow(world)
+        draw_all = ms_per_draw(batch, screen, world, None, args.ticks)
+        draw_view = ms_per_draw(batch, screen, world, camera, args.ticks)
+        print(f"{'x'.join(map(str, size)):>12} {len(world.enemies):>8} {step_all:>8.3f} {step_lod:>9.3f}"
+              f" {draw_all:>9.3f} {draw_view:>10.3f}")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+"""Screen capture: what a captured frame costs the game loop, and encoder throughput.
+
+Run from the repo root (no window needed):
+
+    python -m benchmarks.capture
+
+'grab' is the time Capture.grab() takes on the game side once a slot is
+free (one copy into shared memory), next to pygame.image.tostring() as a
+baseline for getting the pixels out at all. Frames of a real game go to
+each format with grab(block=True), so nothing is dropped and 'frames/s'
+is what drawing plus the encoder process sustain together.
+"""
+import os
+import sys
+import time
+import tempfile
+import argparse
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import pygame
+
+import engine
+from engine import WIDTH, HEIGHT
+from capture import FORMATS, Capture
+from sprites import SpriteSheet, SpriteBatch
+
+OUTPUTS = {'png': 'frames', 'y4m': 'run.y4m', 'raw': 'run.rgb'}
+
+
+def game_frames(screen, count, seed):
+    """Draw `count` frames of an autopilot game onto the screen, one per tick."""
+    world = engine.World(engine.make_config(), seed=seed)
+    batch = SpriteBatch(SpriteSheet(world.config))
+    for _ in range(count):
+        engine.step(world, engine.autopilot(world))
+        screen.fill((30, 30, 30))
+        batch.draw(screen, world)
+        yield
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--frames', type=int, default=300)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    pygame.display.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+
+    started = time.perf_counter()
+    for _ in range(args.frames):
+        pygame.image.tostring(screen, 'RGB')
+    tostring = (time.perf_counter() - started) / args.frames * 1000
+    print(f"pygame.image.tostring: {tostring:.2f} ms/frame")
+
+    print(f"{'format':>7} {'grab ms':>8} {'frames/s':>9} {'MB/frame':>9} {'dropped':>8}")
+    with tempfile.TemporaryDirectory() as out:
+        for fmt in FORMATS:
+            capture = Capture(os.path.join(out, OUTPUTS[fmt]), screen, fmt)
+            grab = 0.0
+            started = time.perf_counter()
+            for _ in game_frames(screen, args.frames, args.seed):
+                capture.free.acquire()   # wait for the encoder outside the timing
+                capture.free.release()
+                grab_started = time.perf_counter()
+                capture.grab(screen, block=True)
+                grab += time.perf_counter() - grab_started
+            stats = capture.close()
+            rate = stats['encoded'] / (time.perf_counter() - started)
+            print(f"{fmt:>7} {grab / args.frames * 1000:>8.2f} {rate:>9.1f}"
+                  f" {stats['bytes'] / stats['encoded'] / 2**20:>9.2f} {stats['dropped']:>8}")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
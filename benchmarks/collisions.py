@@ -0,0 +1,101 @@
+"""Per-frame projectile/enemy collision cost, grid vs brute force.
+
+Run from the repo root:
+
+    python -m benchmarks.collisions
+
+N enemies and N projectiles are scattered over the 1200x760 playfield.
+'python loop' is the original nested for-loop over dicts, 'numpy brute'
+is the all-pairs array test, 'spatial hash' is engine.projectile_hits
+including the per-tick grid rebuild.
+"""
+import sys
+import time
+import argparse
+
+import numpy as np
+
+import engine
+from engine import WIDTH, HEIGHT
+
+SIZES = [10, 100, 1_000, 10_000]
+PYTHON_LOOP_MAX = 1_000          # 10k x 10k dict pairs takes minutes
+NUMPY_BRUTE_MAX_PAIRS = 25_000_000
+
+
+def make_world(n, seed):
+    rng = np.random.default_rng(seed)
+    world = engine.World(seed=seed)
+    size = world.config['enemy_size']
+    for x, y in zip(rng.uniform(0, WIDTH, n), rng.uniform(0, HEIGHT, n)):
+        world.enemies.add(x=x, y=y, size=size, speed=0, damage=0, points=0, kind=0)
+    for x, y in zip(rng.uniform(0, WIDTH, n), rng.uniform(0, HEIGHT, n)):
+        world.projectiles.add(x=x, y=y, vx=0, vy=0)
+    return world
+
+
+def spatial_hash(world):
+    enemies = world.enemies
+    half = enemies['size'] / 2
+    world.enemy_grid.rebuild(enemies['x'] + half, enemies['y'] + half)
+    return engine.projectile_hits(world)
+
+
+def numpy_brute(world):
+    enemies, projectiles = world.enemies, world.projectiles
+    ex, ey, esize = enemies['x'], enemies['y'], enemies['size']
+    px, py = projectiles['x'], projectiles['y']
+    hits = ((ex[:, None] < px) & (px < (ex + esize)[:, None])
+            & (ey[:, None] < py) & (py < (ey + esize)[:, None]))
+    return np.nonzero(hits)
+
+
+def python_loop(enemies, projectiles):
+    hits = 0
+    for enemy in enemies:
+        ex, ey, esize = enemy['x'], enemy['y'], enemy['size']
+        for proj in projectiles:
+            if ex < proj['x'] < ex + esize and ey < proj['y'] < ey + esize:
+                hits += 1
+    return hits
+
+
+def per_call_ms(fn, *args, min_time=0.2):
+    calls = 0
+    started = time.perf_counter()
+    while True:
+        fn(*args)
+        calls += 1
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time:
+            return elapsed / calls * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    print(f"{'entities':>9} {'python loop':>13} {'numpy brute':>13} {'spatial hash':>13}   (ms/frame)")
+    for n in args.sizes:
+        world = make_world(n, args.seed)
+        grid_ms = per_call_ms(spatial_hash, world)
+
+        brute = '-'
+        if n * n <= NUMPY_BRUTE_MAX_PAIRS:
+            brute = f"{per_call_ms(numpy_brute, world):.3f}"
+
+        loop = '-'
+        if n <= PYTHON_LOOP_MAX:
+            enemies = [{'x': x, 'y': y, 'size': s} for x, y, s in
+                       zip(world.enemies['x'].tolist(), world.enemies['y'].tolist(), world.enemies['size'].tolist())]
+            projectiles = [{'x': x, 'y': y} for x, y in
+                           zip(world.projectiles['x'].tolist(), world.projectiles['y'].tolist())]
+            loop = f"{per_call_ms(python_loop, enemies, projectiles):.3f}"
+
+        print(f"{n:>9} {loop:>13} {brute:>13} {grid_ms:>13.3f}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+"""Podium store cost with a large run history.
+
+Run from the repo root:
+
+    python -m benchmarks.podium --runs 1000000
+
+Builds a journal of N random runs in a temp directory, then times loading
+it, appending runs, and the cached and uncached top-N queries.
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+
+from podium import PodiumStore
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=1_000_000)
+    parser.add_argument('--adds', type=int, default=200)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "podium.txt")
+        with open(path, "w") as f:
+            f.writelines(f"{rng.randrange(0, 500_000)},{rng.uniform(1, 600):.3f}\n" for _ in range(args.runs))
+
+        started = time.perf_counter()
+        store = PodiumStore(path)
+        load_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for _ in range(args.adds):
+            store.add(rng.randrange(0, 500_000), rng.uniform(1, 600))
+        add_ms = (time.perf_counter() - started) / args.adds * 1000
+
+        store.top()
+        started = time.perf_counter()
+        for _ in range(10_000):
+            store.top()
+        cached_us = (time.perf_counter() - started) / 10_000 * 1e6
+
+        started = time.perf_counter()
+        for _ in range(1_000):
+            store.top(10)
+        top10_us = (time.perf_counter() - started) / 1_000 * 1e6
+
+    print(f"runs in journal:      {args.runs:,}")
+    print(f"load + index:         {load_s:.2f} s")
+    print(f"add (append + fsync): {add_ms:.3f} ms")
+    print(f"top() cached:         {cached_us:.2f} us")
+    print(f"top(10):              {top10_us:.2f} us")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+"""Snapshot size and speed: raw state vs keyframes vs delta frames.
+
+Run from the repo root:
+
+    python -m benchmarks.snapshots
+
+Plays the autopilot through the default spawner and each wave set,
+pushing every tick into a 10 second SnapshotRing, and reports the raw
+state size, the encoded keyframe and delta frame sizes, the ring's
+memory at the end, and the time to push a tick and to rewind a second.
+"""
+import sys
+import time
+import argparse
+
+import numpy as np
+
+import engine
+import snapshot
+from waves import load_waves
+
+SCENARIOS = [('default', None), ('ramp', 'wavesets/ramp.json'), ('stress', 'wavesets/stress.json')]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--ticks', type=int, default=3600, help="ticks played per scenario")
+    parser.add_argument('--seconds', type=float, default=10.0, help="rewind buffer length")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    print(f"{'scenario':>9} {'enemies':>8} {'raw KB':>8} {'key KB':>8} {'delta KB':>9} "
+          f"{'ring MB':>8} {'push us':>8} {'rewind 1s ms':>13}")
+    for name, path in SCENARIOS:
+        config = engine.make_config(waves=load_waves(path)) if path else engine.make_config()
+        world = engine.World(config, seed=args.seed)
+        ring = snapshot.SnapshotRing(world, args.seconds)
+        push_time = 0.0
+        for _ in range(args.ticks):
+            engine.step(world, engine.autopilot(world))
+            started = time.perf_counter()
+            ring.push(world)
+            push_time += time.perf_counter() - started
+            if world.dead:
+                break
+        pushed = world.tick
+
+        state = snapshot.capture(world)
+        raw = sum(array.nbytes for array in state.values())
+        key = np.mean([len(frame) for is_key, frame in ring.frames if is_key])
+        delta = np.mean([len(frame) for is_key, frame in ring.frames if not is_key])
+        nbytes = ring.nbytes
+        started = time.perf_counter()
+        ring.rewind(world, engine.TICK_RATE)
+        rewind_ms = (time.perf_counter() - started) * 1000
+        print(f"{name:>9} {len(world.enemies):>8} {raw / 1024:>8.1f} {key / 1024:>8.1f} {delta / 1024:>9.2f} "
+              f"{nbytes / 2**20:>8.2f} {push_time / pushed * 1e6:>8.0f} {rewind_ms:>13.2f}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
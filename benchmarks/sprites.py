@@ -0,0 +1,74 @@
+"""World drawing cost: batched pre-baked sprites vs immediate-mode pygame.draw.
+
+Run from the repo root (no window needed):
+
+    python -m benchmarks.sprites
+
+N enemies, N projectiles and N / 10 pickups are scattered over the
+1200x760 screen and drawn with both paths.
+"""
+import os
+import sys
+import time
+import argparse
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import numpy as np
+import pygame
+
+import engine
+from engine import WIDTH, HEIGHT
+from sprites import SpriteSheet, SpriteBatch, draw_world_immediate
+
+SIZES = [100, 1_000, 5_000, 10_000]
+
+
+def make_world(n, seed):
+    rng = np.random.default_rng(seed)
+    world = engine.World(seed=seed)
+    cfg = world.config
+    kinds = rng.integers(0, len(cfg['enemy_types']), n)
+    for x, y, kind in zip(rng.uniform(0, WIDTH, n), rng.uniform(0, HEIGHT, n), kinds):
+        world.enemies.add(x=x, y=y, prev_x=x, prev_y=y, size=cfg['enemy_size'],
+                          speed=0, damage=0, points=0, kind=kind)
+    for x, y in zip(rng.uniform(0, WIDTH, n), rng.uniform(0, HEIGHT, n)):
+        world.projectiles.add(x=x, y=y, prev_x=x, prev_y=y, vx=0, vy=0)
+    for x, y in zip(rng.uniform(0, WIDTH, n // 10), rng.uniform(0, HEIGHT, n // 10)):
+        world.heal_pickups.add(x=x, y=y, radius=cfg['heal_pickup_radius'], spawn_time=0)
+    return world
+
+
+def per_call_ms(fn, *args, min_time=0.3):
+    calls = 0
+    started = time.perf_counter()
+    while True:
+        fn(*args)
+        calls += 1
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time:
+            return elapsed / calls * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES)
+    args = parser.parse_args(argv)
+
+    pygame.display.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    started = time.perf_counter()
+    batch = SpriteBatch(SpriteSheet(engine.make_config()))
+    print(f"sprite sheet build: {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    print(f"{'entities':>9} {'immediate':>11} {'sprites':>11} {'speedup':>8}   (ms/frame)")
+    for n in args.sizes:
+        world = make_world(n, 0)
+        immediate = per_call_ms(draw_world_immediate, screen, world, 0.5)
+        sprites = per_call_ms(batch.draw, screen, world, 0.5)
+        print(f"{2 * n + n // 10:>9} {immediate:>11.3f} {sprites:>11.3f} {immediate / sprites:>7.2f}x")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""Time from launch to the first frame and to the first gameplay frame.
+
+Run from the repo root:
+
+    python -m benchmarks.startup --runs 5
+
+Launches `main.py --startup-time` in fresh processes (dummy SDL drivers
+unless SDL_VIDEODRIVER is set) and reports, per mode:
+
+  cold   every run gets an empty PYTHONPYCACHEPREFIX, so the game, pygame,
+         numpy and the stdlib are all compiled from source again
+         (add --drop-caches as root to also empty the OS page cache)
+  warm   runs after a first throwaway run, bytecode and files cached
+
+"first frame" is the loading screen, "gameplay" the first game frame,
+both measured inside the process from before its imports; "process" is
+wall time from spawn to exit.
+"""
+import os
+import re
+import sys
+import time
+import argparse
+import tempfile
+import subprocess
+import statistics
+
+LINE = re.compile(r"first frame (\d+) ms, first gameplay frame (\d+) ms")
+
+
+def launch(env):
+    started = time.perf_counter()
+    out = subprocess.run([sys.executable, "main.py", "--startup-time", "--no-audio", "--seed", "0"],
+                         env=env, capture_output=True, text=True, check=True).stdout
+    process_ms = (time.perf_counter() - started) * 1000
+    match = LINE.search(out)
+    if match is None:
+        raise SystemExit(f"main.py didn't report startup times:\n{out}")
+    return int(match.group(1)), int(match.group(2)), process_ms
+
+
+def drop_caches():
+    try:
+        subprocess.run(["sync"], check=True)
+        with open("/proc/sys/vm/drop_caches", "w") as f:
+            f.write("3\n")
+        return True
+    except OSError:
+        return False
+
+
+def report(name, samples):
+    columns = list(zip(*samples))
+    cells = [f"{statistics.median(c):7.0f} ({min(c):.0f}-{max(c):.0f})" for c in columns]
+    print(f"{name:5} {cells[0]:>18} {cells[1]:>18} {cells[2]:>18}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--drop-caches', action='store_true', help="also drop the OS page cache before cold runs")
+    args = parser.parse_args(argv)
+
+    env = dict(os.environ)
+    env.setdefault('SDL_VIDEODRIVER', 'dummy')
+    env.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+    cold = []
+    for _ in range(args.runs):
+        if args.drop_caches and not drop_caches():
+            print("could not drop the page cache (needs root); cold runs only recompile bytecode")
+            args.drop_caches = False
+        with tempfile.TemporaryDirectory() as prefix:
+            cold.append(launch(dict(env, PYTHONPYCACHEPREFIX=prefix)))
+
+    launch(env)
+    warm = [launch(env) for _ in range(args.runs)]
+
+    print(f"median (min-max) ms over {args.runs} runs")
+    print(f"{'':5} {'first frame':>18} {'gameplay':>18} {'process':>18}")
+    report("cold", cold)
+    report("warm", warm)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
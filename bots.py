@@ -0,0 +1,300 @@
+import sys
+import math
+import time
+import random
+import argparse
+
+import numpy as np
+
+import engine
+
+# -----------------------------
+# Bot players
+# -----------------------------
+# A Controller turns an Observation of a world into the engine.Inputs for
+# the next tick, the same thing the gamepad produces in main.py. Bots see
+# only the Observation, never the World, so they can't peek at the RNG or
+# reach into entity stores.
+#
+# Lockstep steps many worlds in one process: every tick it observes all
+# live worlds, hands each controller its whole batch at once (act_batch)
+# and steps them. A bot that can vectorize across worlds overrides
+# act_batch; the default just calls act() per world.
+#
+# In co-op worlds each player gets its own Observation (player=p) and the
+# controller acts once per player.
+
+
+NO_POINTS = np.zeros((0, 2), np.float32)
+
+
+class Observation:
+    """What a bot sees each tick. Positions are centers, in pixels."""
+
+    __slots__ = ('tick', 'elapsed', 'player', 'x', 'y', 'angle', 'ammo', 'max_ammo',
+                 'health', 'max_health', 'reloading', 'reload_left', 'healing', 'heal_left',
+                 'allies', 'enemies', 'enemy_kinds', 'projectiles', 'pickups')
+
+    def __init__(self, world, player=0):
+        cfg = world.config
+        col = world.players.columns
+        p = player
+        half = world.tri_size / 2
+        self.tick = world.tick
+        self.elapsed = world.elapsed
+        self.player = p
+        self.x = float(col['x'][p]) + half
+        self.y = float(col['y'][p]) + half
+        self.angle = float(col['angle'][p])
+        self.ammo = int(col['bullets'][p])
+        self.max_ammo = world.max_bullets
+        self.health = int(col['health'][p])
+        self.max_health = world.max_health
+        self.reloading = bool(col['reloading'][p])
+        self.reload_left = (max(0.0, cfg['reload_duration'] - (world.elapsed - col['reload_start'][p]))
+                            if self.reloading else 0.0)
+        self.healing = bool(col['healing'][p])
+        self.heal_left = (max(0.0, cfg['heal_duration'] - (world.elapsed - col['heal_start'][p]))
+                          if self.healing else 0.0)
+
+        # (n, 2) float32 arrays; allies are the other players still up
+        players = world.players
+        if len(players) == 1:
+            self.allies = NO_POINTS
+        else:
+            others = players.alive.copy()
+            others[p] = False
+            self.allies = np.column_stack((players['x'][others] + half,
+                                           players['y'][others] + half)).astype(np.float32)
+
+        # (n, 2) float32 arrays
+        enemies = world.enemies
+        esize = enemies['size'] / 2
+        self.enemies = np.column_stack((enemies['x'] + esize, enemies['y'] + esize)).astype(np.float32)
+        self.enemy_kinds = enemies['kind'].copy()
+        projectiles = world.projectiles
+        self.projectiles = np.column_stack((projectiles['x'], projectiles['y'])).astype(np.float32)
+        pickups = world.heal_pickups
+        self.pickups = np.column_stack((pickups['x'], pickups['y'])).astype(np.float32)
+
+
+class Controller:
+    """Base class for anything that plays the game from observations."""
+
+    def reset(self):
+        """Called when a world it controls starts a new game."""
+
+    def act(self, obs):
+        raise NotImplementedError
+
+    def act_batch(self, observations):
+        return [self.act(obs) for obs in observations]
+
+
+def _nearest(points, x, y):
+    """(index, dx, dy, squared distance) of the point closest to (x, y)."""
+    d = points - np.array((x, y), np.float32)
+    dist2 = np.einsum('ij,ij->i', d, d)
+    i = int(np.argmin(dist2))
+    return i, float(d[i, 0]), float(d[i, 1]), float(dist2[i])
+
+
+# -----------------------------
+# Bots
+# -----------------------------
+class IdleBot(Controller):
+    """Stands still. A baseline for how fast the enemies win."""
+
+    def act(self, obs):
+        return engine.IDLE
+
+
+class AutopilotBot(Controller):
+    """Aims at the nearest enemy, fires every few ticks, reloads when empty.
+
+    aim_error (degrees, gaussian) and shot_chance make it sloppier.
+    """
+
+    def __init__(self, seed=None, aim_error=0.0, shot_chance=1.0, fire_every=8):
+        self.rng = random.Random(seed)
+        self.aim_error = aim_error
+        self.shot_chance = shot_chance
+        self.fire_every = fire_every
+
+    def _reload(self, obs):
+        # Hold until the reload has finished, then let go so it completes
+        if obs.ammo == 0 or obs.reloading:
+            return engine.Inputs(reload=not (obs.reloading and obs.reload_left == 0))
+        return None
+
+    def _aim(self, dx, dy):
+        if self.aim_error:
+            angle = math.atan2(dy, dx) + math.radians(self.rng.gauss(0, self.aim_error))
+            return math.cos(angle), math.sin(angle)
+        return dx, dy
+
+    def _trigger(self, obs):
+        shoot = obs.tick % self.fire_every == 0
+        if shoot and self.shot_chance < 1.0:
+            shoot = self.rng.random() < self.shot_chance
+        return shoot
+
+    def act(self, obs):
+        reload = self._reload(obs)
+        if reload is not None:
+            return reload
+        if not len(obs.enemies):
+            return engine.IDLE
+        _, dx, dy, _ = _nearest(obs.enemies, obs.x, obs.y)
+        aim_x, aim_y = self._aim(dx, dy)
+        return engine.Inputs(aim_x=aim_x, aim_y=aim_y, shoot=self._trigger(obs))
+
+
+class KiteBot(AutopilotBot):
+    """Autopilot that also backs away from nearby enemies, walks to heal
+    pickups and stands still to heal when nothing is close."""
+
+    def __init__(self, seed=None, aim_error=0.0, shot_chance=1.0, fire_every=8,
+                 danger_radius=220.0, heal_below=50):
+        super().__init__(seed, aim_error, shot_chance, fire_every)
+        self.danger_radius = danger_radius
+        self.heal_below = heal_below
+
+    def act(self, obs):
+        move_x = move_y = 0.0
+        threat = None
+        if len(obs.enemies):
+            d = obs.enemies - np.array((obs.x, obs.y), np.float32)
+            dist2 = np.einsum('ij,ij->i', d, d)
+            close = dist2 < self.danger_radius ** 2
+            if close.any():
+                # Away from the closeness-weighted enemy direction
+                weights = 1.0 / np.maximum(dist2[close], 1.0)
+                threat = (d[close] * weights[:, None]).sum(axis=0)
+                move_x, move_y = -float(threat[0]), -float(threat[1])
+        if threat is None and len(obs.pickups) and obs.health < obs.max_health:
+            _, move_x, move_y, _ = _nearest(obs.pickups, obs.x, obs.y)
+        length = math.hypot(move_x, move_y)
+        if length > 0:
+            move_x, move_y = move_x / length, move_y / length
+
+        if threat is None and (obs.healing or obs.health < self.heal_below):
+            # Let go once the heal has had its full duration
+            return engine.Inputs(heal=not (obs.healing and obs.heal_left == 0))
+
+        # A fresh Inputs (with no enemies the autopilot hands back the shared
+        # engine.IDLE), keeping everything but the movement, reloads included
+        aim = super().act(obs)
+        return engine.Inputs(move_x=move_x, move_y=move_y, aim_x=aim.aim_x, aim_y=aim.aim_y, shoot=aim.shoot,
+                             reload=aim.reload, heal=aim.heal)
+
+
+BOTS = {
+    'idle': lambda seed: IdleBot(),
+    'autopilot': lambda seed: AutopilotBot(seed),
+    'noisy': lambda seed: AutopilotBot(seed, aim_error=20.0, shot_chance=0.5),
+    'kite': lambda seed: KiteBot(seed),
+}
+
+
+def make_bot(name, seed=None):
+    try:
+        return BOTS[name](seed)
+    except KeyError:
+        raise KeyError(f"Unknown bot: {name} (have {', '.join(sorted(BOTS))})") from None
+
+
+# -----------------------------
+# Lockstep
+# -----------------------------
+class Lockstep:
+    """Steps a set of worlds together, one tick at a time.
+
+    controllers is one Controller shared by every world, or one per world;
+    in a co-op world it plays every player. Dead worlds stay dead (and are
+    skipped) until reset().
+    """
+
+    def __init__(self, worlds, controllers, dt=engine.FRAME_DT):
+        self.worlds = list(worlds)
+        if isinstance(controllers, Controller):
+            controllers = [controllers] * len(self.worlds)
+        if len(controllers) != len(self.worlds):
+            raise ValueError("need one controller per world, or a single shared one")
+        self.controllers = list(controllers)
+        self.dt = dt
+        self.ticks = 0
+
+    @property
+    def alive(self):
+        return sum(not world.dead for world in self.worlds)
+
+    def reset(self):
+        for world in self.worlds:
+            world.reset()
+        for controller in {id(c): c for c in self.controllers}.values():
+            controller.reset()
+        self.ticks = 0
+
+    def step(self):
+        """Advance every live world by one tick. Returns how many were stepped."""
+        # Group live worlds by controller so each gets its batch in one call
+        batches = {}
+        for world, controller in zip(self.worlds, self.controllers):
+            if not world.dead:
+                batches.setdefault(id(controller), (controller, []))[1].append(world)
+        stepped = 0
+        for controller, worlds in batches.values():
+            if all(len(world.players) == 1 for world in worlds):
+                actions = controller.act_batch([Observation(world) for world in worlds])
+            else:
+                # One observation per live player; down players get IDLE
+                live = [np.flatnonzero(world.players.alive).tolist() for world in worlds]
+                flat = iter(controller.act_batch([Observation(world, p)
+                                                  for world, players in zip(worlds, live) for p in players]))
+                actions = []
+                for world, players in zip(worlds, live):
+                    inputs = [engine.IDLE] * len(world.players)
+                    for p in players:
+                        inputs[p] = next(flat)
+                    actions.append(inputs)
+            for world, inputs in zip(worlds, actions):
+                engine.step(world, inputs, self.dt)
+            stepped += len(worlds)
+        self.ticks += 1
+        return stepped
+
+    def run(self, max_ticks=None):
+        """Step until every world is dead or max_ticks pass. Returns world-ticks run."""
+        total = 0
+        while self.alive and (max_ticks is None or self.ticks < max_ticks):
+            total += self.step()
+        return total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play many headless games with a bot, in lockstep.")
+    parser.add_argument('--bot', choices=sorted(BOTS), default='kite')
+    parser.add_argument('--worlds', type=int, default=64, help="games stepped together")
+    parser.add_argument('--ticks', type=int, default=3600, help="tick limit per game")
+    parser.add_argument('--seed', type=int, default=0, help="world i gets seed + i")
+    parser.add_argument('--players', type=int, default=1, help="co-op players per world")
+    args = parser.parse_args(argv)
+
+    config = engine.make_config(players=args.players)
+    worlds = [engine.World(config, seed=args.seed + i) for i in range(args.worlds)]
+    controllers = [make_bot(args.bot, args.seed + i) for i in range(args.worlds)]
+    lockstep = Lockstep(worlds, controllers)
+    started = time.perf_counter()
+    total = lockstep.run(args.ticks)
+    wall = time.perf_counter() - started
+
+    survival = np.array([world.elapsed for world in worlds])
+    scores = np.array([world.score for world in worlds])
+    print(f"{args.worlds} x {args.bot}: {sum(w.dead for w in worlds)} died, "
+          f"survival p50 {np.median(survival):.1f}s, score p50 {np.median(scores):.0f}")
+    print(f"{total} world-ticks in {wall:.2f}s ({total / wall:,.0f} ticks/s)")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
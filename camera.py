@@ -0,0 +1,55 @@
+import numpy as np
+
+import engine
+
+# -----------------------------
+# Camera
+# -----------------------------
+# In a world bigger than the screen (config world_width / world_height),
+# the screen shows a WIDTH x HEIGHT window of it centered on the players
+# (their midpoint in co-op) and kept inside the world. The camera moves
+# with the interpolated positions, so scrolling is as smooth as movement.
+#
+# Drawing only touches what the window can show: SpriteBatch takes the
+# enemies from the engine's enemy grid with one query_rect() over the
+# view, and masks the short projectile and pickup arrays. Anything it
+# would draw is offset by -camera.x, -camera.y.
+#
+# A screen-sized world never scrolls: the camera stays at 0, 0.
+
+
+class Camera:
+    def __init__(self):
+        self.x = 0
+        self.y = 0
+        self.width = engine.WIDTH
+        self.height = engine.HEIGHT
+
+    def follow(self, world, alpha=1.0):
+        """Center on the live players as they are drawn this frame."""
+        if not world.large:
+            self.x = self.y = 0
+            return
+        players = world.players
+        up = players.alive
+        if not up.any():
+            return   # everyone is down; hold still
+        half = world.tri_size / 2
+        prev_x, prev_y = players['prev_x'][up], players['prev_y'][up]
+        cx = float(np.mean(prev_x + (players['x'][up] - prev_x) * alpha)) + half
+        cy = float(np.mean(prev_y + (players['y'][up] - prev_y) * alpha)) + half
+        x, y = engine.view_origin(world, cx, cy)
+        self.x, self.y = int(x), int(y)
+
+    def rect(self, margin=0):
+        """(x0, y0, x1, y1) of the view in world coordinates, grown by margin."""
+        return (self.x - margin, self.y - margin,
+                self.x + self.width + margin, self.y + self.height + margin)
+
+    def visible(self, x, y, margin=0):
+        """Mask of the points x, y inside the view grown by margin."""
+        x0, y0, x1, y1 = self.rect(margin)
+        return (x >= x0) & (x <= x1) & (y >= y0) & (y <= y1)
+
+    def to_screen(self, x, y):
+        return x - self.x, y - self.y
@@ -0,0 +1,358 @@
+import os
+import sys
+import time
+import zlib
+import queue
+import struct
+import argparse
+import multiprocessing
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# -----------------------------
+# Gameplay capture
+# -----------------------------
+# Records what the screen shows without a screen recorder. grab() copies
+# the surface's pixels, exactly as they sit in its buffer (pitch, byte
+# order and all), into the next free slot of a shared-memory ring and
+# queues the slot number. That one memcpy is all the game loop pays; a
+# worker process turns the slot into RGB, encodes and writes it, then
+# frees the slot again.
+#
+# If the worker falls behind and every slot is still taken, the frame is
+# dropped and counted instead of waiting for it. Formats:
+#
+#   'png'   a directory of frame-NNNNNN.png files, numbered by frame, so
+#           dropped frames show up as gaps
+#   'y4m'   one YUV4MPEG2 stream (4:2:0), playable by mpv/VLC and taken
+#           by ffmpeg as input; a dropped frame repeats the last one so
+#           the video keeps time
+#   'raw'   bare rgb24 frames, repeated the same way, e.g.
+#           ffmpeg -f rawvideo -pix_fmt rgb24 -s 1200x760 -r 60 -i run.rgb
+#
+# render() draws a recording from replay.py headless, tick by tick, and
+# captures it without dropping anything, so a replay becomes a video
+# faster than real time.
+#
+#   python capture.py run.rpl run.y4m
+
+FORMATS = ('png', 'y4m', 'raw')
+EXTENSIONS = {'.y4m': 'y4m', '.rgb': 'raw', '.raw': 'raw'}
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+
+def guess_format(path):
+    """'y4m' / 'raw' from the file extension; anything else is a PNG directory."""
+    return EXTENSIONS.get(os.path.splitext(path)[1].lower(), 'png')
+
+
+# -----------------------------
+# Encoders (worker side)
+# -----------------------------
+def png_bytes(rgb, level=1):
+    """A complete PNG file for an (h, w, 3) uint8 array."""
+    h, w, _ = rgb.shape
+    rows = np.zeros((h, 1 + w * 3), np.uint8)   # filter byte 0 (none) per row
+    rows[:, 1:] = rgb.reshape(h, -1)
+
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+    return (PNG_SIGNATURE
+            + chunk(b'IHDR', struct.pack('>IIBBBBB', w, h, 8, 2, 0, 0, 0))
+            + chunk(b'IDAT', zlib.compress(rows.tobytes(), level))
+            + chunk(b'IEND', b''))
+
+
+def yuv420(rgb):
+    """Full-range BT.601 Y, Cb, Cr planes (chroma halved both ways) as bytes."""
+    h, w, _ = rgb.shape
+    if h % 2 or w % 2:
+        rgb = np.pad(rgb, ((0, h % 2), (0, w % 2), (0, 0)), mode='edge')
+    # 8-bit fixed point: luma fits uint16 at full size, chroma is worked out
+    # once per 2x2 block from the block's mean color
+    r, g, b = (rgb[:h, :w, i].astype(np.uint16) for i in range(3))
+    y = (77 * r + 150 * g + 29 * b + 128) >> 8
+    quad = rgb[0::2, 0::2].astype(np.int32) + rgb[1::2, 0::2] + rgb[0::2, 1::2] + rgb[1::2, 1::2]
+    r, g, b = quad[..., 0], quad[..., 1], quad[..., 2]   # 4x the mean
+    cb = (-43 * r - 85 * g + 128 * b + (128 << 10) + 512) >> 10
+    cr = (128 * r - 107 * g - 21 * b + (128 << 10) + 512) >> 10
+    return y.astype(np.uint8).tobytes() + cb.astype(np.uint8).tobytes() + cr.astype(np.uint8).tobytes()
+
+
+class PngWriter:
+    repeats = False
+
+    def __init__(self, path, width, height, fps, level):
+        self.path = path
+        self.level = level
+        os.makedirs(path, exist_ok=True)
+
+    def write(self, rgb, index):
+        data = png_bytes(rgb, self.level)
+        with open(os.path.join(self.path, f"frame-{index:06}.png"), 'wb') as f:
+            f.write(data)
+        return data
+
+    def repeat(self, data):
+        pass
+
+    def close(self):
+        pass
+
+
+class StreamWriter:
+    repeats = True
+
+    def __init__(self, path, width, height, fps, level):
+        self.file = open(path, 'wb')
+
+    def encode(self, rgb):
+        return rgb.tobytes()
+
+    def write(self, rgb, index):
+        data = self.encode(rgb)
+        self.file.write(data)
+        return data
+
+    def repeat(self, data):
+        self.file.write(data)
+
+    def close(self):
+        self.file.close()
+
+
+class Y4mWriter(StreamWriter):
+    def __init__(self, path, width, height, fps, level):
+        super().__init__(path, width, height, fps, level)
+        self.file.write(f"YUV4MPEG2 W{width} H{height} F{fps}:1 Ip A1:1 C420jpeg\n".encode())
+
+    def encode(self, rgb):
+        return b'FRAME\n' + yuv420(rgb)
+
+
+WRITERS = {'png': PngWriter, 'y4m': Y4mWriter, 'raw': StreamWriter}
+
+
+def _encode_frames(shm, layout, path, fmt, fps, level, jobs, free, results):
+    """Worker process: encode queued slots until the (None, frame count) sentinel."""
+    width, height, pitch, bytesize, order, slots = layout
+    frames = np.ndarray((slots, height, pitch), np.uint8, shm.buf)
+    stats = {'encoded': 0, 'repeated': 0, 'bytes': 0, 'encode_time': 0.0, 'error': None}
+    writer = None
+    last, next_index = None, 0
+    try:
+        writer = WRITERS[fmt](path, width, height, fps, level)
+    except OSError as e:
+        stats['error'] = str(e)
+
+    def fill(until):
+        # A stream keeps time: every dropped frame repeats the last one written
+        if writer.repeats and last is not None:
+            for _ in range(next_index, until):
+                writer.repeat(last)
+                stats['repeated'] += 1
+                stats['bytes'] += len(last)
+
+    while True:
+        slot, index = jobs.get()
+        if slot is None:
+            if stats['error'] is None:
+                try:
+                    fill(index)   # frames dropped at the very end
+                except OSError as e:
+                    stats['error'] = str(e)
+            break
+        # Pixels out of the slot first, so it can be handed back right away
+        rgb = frames[slot, :, :width * bytesize].reshape(height, width, bytesize)[..., order]
+        free.release()
+        if stats['error'] is not None:
+            continue   # keep freeing slots so the game never stalls on a dead writer
+        started = time.perf_counter()
+        try:
+            fill(index)
+            last = writer.write(rgb, index)
+        except OSError as e:
+            stats['error'] = str(e)
+            continue
+        next_index = index + 1
+        stats['encoded'] += 1
+        stats['bytes'] += len(last)
+        stats['encode_time'] += time.perf_counter() - started
+    if writer is not None:
+        writer.close()
+    del frames
+    results.put(stats)
+
+
+# -----------------------------
+# Capture (game side)
+# -----------------------------
+def _context():
+    # fork where there is one: spawn would re-import the launching script
+    # in the worker, and main.py runs the game at import
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('fork' if 'fork' in methods else None)
+
+
+class Capture:
+    def __init__(self, path, surface, fmt=None, fps=60, slots=8, level=1):
+        """Capture frames shaped like `surface` to `path` ('png' / 'y4m' / 'raw')."""
+        fmt = fmt or guess_format(path)
+        if fmt not in FORMATS:
+            raise ValueError(f"unknown capture format {fmt!r} (expected one of {', '.join(FORMATS)})")
+        bytesize = surface.get_bytesize()
+        if bytesize not in (3, 4):
+            raise ValueError(f"can only capture 24 or 32 bit surfaces, not {bytesize * 8} bit")
+        self.path = path
+        self.format = fmt
+        self.size = surface.get_size()
+        self.slots = slots
+        self.frames = 0        # grab() calls
+        self.captured = 0      # handed to the worker
+        self.dropped = 0       # no free slot at the time
+        self.result = {}       # the worker's own counters, once closed
+        width, height = self.size
+        pitch = surface.get_pitch()
+        # Byte offset of R, G and B within a pixel
+        order = [shift // 8 if sys.byteorder == 'little' else bytesize - 1 - shift // 8
+                 for shift in surface.get_shifts()[:3]]
+
+        ctx = _context()
+        self.shm = shared_memory.SharedMemory(create=True, size=slots * height * pitch)
+        self.buffers = np.ndarray((slots, height, pitch), np.uint8, self.shm.buf)
+        self.buffers.fill(0)   # fault the pages in now rather than on the first grabs
+        self.free = ctx.Semaphore(slots)
+        self.jobs = ctx.Queue()
+        self.results = ctx.Queue()
+        layout = (width, height, pitch, bytesize, order, slots)
+        self.worker = ctx.Process(target=_encode_frames, name='capture', daemon=True,
+                                  args=(self.shm, layout, path, fmt, fps, level,
+                                        self.jobs, self.free, self.results))
+        self.worker.start()
+
+    def grab(self, surface, block=False):
+        """Queue the surface's current pixels. False if the frame was dropped."""
+        index = self.frames
+        self.frames += 1
+        if not self.free.acquire(block):
+            self.dropped += 1
+            return False
+        slot = self.captured % self.slots
+        pixels = surface.get_buffer()   # locks the surface until released
+        np.copyto(self.buffers[slot], np.frombuffer(pixels, np.uint8).reshape(self.buffers.shape[1:]))
+        del pixels
+        self.jobs.put((slot, index))
+        self.captured += 1
+        return True
+
+    def close(self, timeout=30.0):
+        """Let the worker finish what is queued; returns stats()."""
+        if self.worker is None:
+            return self.stats()
+        self.jobs.put((None, self.frames))
+        try:
+            self.result = self.results.get(timeout=timeout)
+        except queue.Empty:
+            self.result = {'error': "encoder did not finish in time"}
+            self.worker.terminate()
+        self.worker.join()
+        self.worker = None
+        del self.buffers
+        self.shm.close()
+        self.shm.unlink()
+        return self.stats()
+
+    def stats(self):
+        stats = {'frames': self.frames, 'captured': self.captured, 'dropped': self.dropped}
+        stats.update(self.result)
+        return stats
+
+
+class NullCapture:
+    """Same interface as Capture, captures nothing."""
+    frames = captured = dropped = 0
+
+    def grab(self, surface, block=False):
+        return False
+
+    def close(self, timeout=30.0):
+        return self.stats()
+
+    def stats(self):
+        return {'frames': 0, 'captured': 0, 'dropped': 0}
+
+
+def summary(stats):
+    line = f"Capture: {stats['captured']}/{stats['frames']} frames, {stats['dropped']} dropped"
+    if stats.get('repeated'):
+        line += f" ({stats['repeated']} repeated in the stream)"
+    if 'bytes' in stats:
+        line += f", {stats['bytes'] / 2**20:.1f} MB"
+    if stats.get('error'):
+        line += f" - error: {stats['error']}"
+    return line
+
+
+# -----------------------------
+# Headless replay rendering
+# -----------------------------
+def render(recording, path, fmt=None, every=1, level=1):
+    """Draw every `every`-th tick of a recording off screen and capture it. Returns (world, stats)."""
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    import pygame
+    import engine
+    from camera import Camera
+    from sprites import SpriteSheet, SpriteBatch
+
+    pygame.display.init()
+    pygame.font.init()
+    screen = pygame.display.set_mode((engine.WIDTH, engine.HEIGHT))
+    font = pygame.font.Font(None, 36)
+    world = recording.new_world()
+    batch = SpriteBatch(SpriteSheet(world.config))
+    camera = Camera()
+    fps = max(1, round(recording.tick_rate / every))
+    capture = Capture(path, screen, fmt, fps=fps, level=level)
+    dt = 1.0 / recording.tick_rate
+    try:
+        for i, inputs in enumerate(recording.inputs()):
+            engine.step(world, inputs, dt)
+            if i % every:
+                continue
+            screen.fill((30, 30, 30))
+            camera.follow(world)
+            batch.draw(screen, world, 1.0, camera if world.large else None)
+            hud = font.render(f"Score: {world.score}   Time: {world.elapsed:.2f}s", True, (255, 255, 255))
+            screen.blit(hud, (10, 10))
+            capture.grab(screen, block=True)
+    finally:
+        stats = capture.close()
+        pygame.quit()
+    return world, stats
+
+
+def main(argv=None):
+    from replay import Recording
+
+    parser = argparse.ArgumentParser(description="Render a recorded run to PNG frames or a video stream, headless.")
+    parser.add_argument('recording')
+    parser.add_argument('out', help="PNG directory, or a .y4m / .rgb file")
+    parser.add_argument('--format', choices=FORMATS, help="default: from the extension of OUT")
+    parser.add_argument('--every', type=int, default=1, help="capture every Nth tick (default: all of them)")
+    parser.add_argument('--level', type=int, default=1, help="PNG compression level 0-9")
+    args = parser.parse_args(argv)
+
+    recording = Recording(args.recording)
+    started = time.perf_counter()
+    world, stats = render(recording, args.out, args.format, args.every, args.level)
+    took = time.perf_counter() - started
+    print(summary(stats))
+    print(f"{len(recording)} ticks ({world.elapsed:.1f}s of play) rendered in {took:.1f}s "
+          f"({world.elapsed / took:.1f}x real time)")
+    return 1 if stats.get('error') else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,257 @@
+import math
+import time
+
+import pygame
+
+import engine
+
+# -----------------------------
+# Input layer
+# -----------------------------
+# Everything the game reads from the player goes through Controls, fed one
+# pygame event at a time. Physical inputs (pad buttons, hat directions, keys,
+# mouse buttons) map to named actions; an action is held while any of its
+# sources is down, so a pad and the keyboard can be used side by side.
+#
+# Menus ask pressed(action) for the down-edge this frame, or repeated(action)
+# for a press that auto-repeats on the clock while held. Gameplay takes one
+# snapshot() per sim tick: held state plus any press seen since the last
+# snapshot, so a tap shorter than a tick still registers.
+#
+# Pads are opened and dropped as JOYDEVICEADDED / JOYDEVICEREMOVED arrive;
+# with none connected the keyboard and mouse still drive everything.
+#
+# For co-op (players > 1) each pad is bound to a player slot in the order
+# it was plugged in, and snapshot(player=p) reads only that slot's pad.
+# The keyboard and mouse always play player 0: alongside the first pad, or
+# on their own with keyboard_player=True (pads then start at player 1).
+# Menus still listen to every device.
+
+# Xbox-style layout, as pygame numbers it on most platforms
+PAD_BUTTONS = {
+    0: ('heal', 'confirm'),             # A
+    1: ('reload', 'back'),              # B
+    2: ('button_x',),                   # X
+    3: ('button_y',),                   # Y
+    4: ('volume_down', 'rewind'),       # LB
+    5: ('shoot', 'volume_up'),          # RB
+    7: ('start',),                      # Start
+}
+HAT_ACTIONS = {1: ('up',), -1: ('down',)}   # d-pad vertical
+
+KEYS = {
+    pygame.K_w: ('move_up', 'up'),
+    pygame.K_s: ('move_down', 'down'),
+    pygame.K_a: ('move_left',),
+    pygame.K_d: ('move_right',),
+    pygame.K_UP: ('up',),
+    pygame.K_DOWN: ('down',),
+    pygame.K_LEFT: ('volume_down',),
+    pygame.K_RIGHT: ('volume_up',),
+    pygame.K_SPACE: ('shoot', 'confirm'),
+    pygame.K_RETURN: ('confirm',),
+    pygame.K_e: ('heal',),
+    pygame.K_r: ('reload',),
+    pygame.K_1: ('button_x',),
+    pygame.K_2: ('button_y',),
+    pygame.K_q: ('rewind',),
+    pygame.K_ESCAPE: ('start', 'back'),
+    pygame.K_BACKSPACE: ('back',),
+}
+MOUSE_BUTTONS = {1: ('shoot',), 3: ('heal',)}
+
+GAME_BUTTONS = ('shoot', 'heal', 'reload', 'button_x', 'button_y')
+
+
+def _owner(source):
+    """The pad a physical input belongs to; None for keyboard and mouse."""
+    return source[1] if source[0] in ('pad', 'hat') else None
+
+
+class Controls:
+    def __init__(self, players=1, keyboard_player=False, repeat_delay=0.35, repeat_interval=0.12,
+                 debounce=0.04, clock=time.perf_counter):
+        self.repeat_delay = repeat_delay
+        self.repeat_interval = repeat_interval
+        self.debounce = debounce
+        self.clock = clock
+        self.players = players
+        self.slots = [None] * players   # player -> bound pad instance id
+        self.first_pad_slot = 1 if keyboard_player and players > 1 else 0
+        self.pads = {}            # instance id -> pygame Joystick
+        self.pad_axes = {}        # instance id -> axis values
+        self.active_pad = None    # the pad that sent the last event
+        self.sources = {}         # action -> physical inputs holding it
+        self.held_since = {}      # action -> time of its last accepted press
+        self.repeats = {}         # action -> repeats fired since that press
+        self.last_press = {}      # (action, owner) -> time of last press, accepted or not
+        self.pressed_now = set()  # down-edges this frame
+        self.latched = set()      # (action, owner) presses not yet taken by a snapshot
+        self.mouse_pos = None
+        self.aim_with_mouse = False
+        for index in range(pygame.joystick.get_count()):
+            self._open_pad(index)
+
+    # ----- Events -----
+    def begin_frame(self):
+        """Start a new frame: forget last frame's edges. Call before handle()."""
+        self.pressed_now.clear()
+
+    def handle(self, event):
+        kind = event.type
+        if kind == pygame.JOYBUTTONDOWN or kind == pygame.JOYBUTTONUP:
+            self.active_pad = event.instance_id
+            source = ('pad', event.instance_id, event.button)
+            for action in PAD_BUTTONS.get(event.button, ()):
+                self._set(action, source, kind == pygame.JOYBUTTONDOWN)
+        elif kind == pygame.JOYAXISMOTION:
+            axes = self.pad_axes.setdefault(event.instance_id, [0.0] * 4)
+            if event.axis < len(axes):
+                axes[event.axis] = event.value
+            self.active_pad = event.instance_id
+            if event.axis in (2, 3) and abs(event.value) > 0.5:
+                self.aim_with_mouse = False
+        elif kind == pygame.JOYHATMOTION:
+            self.active_pad = event.instance_id
+            source = ('hat', event.instance_id, event.hat)
+            y = event.value[1]
+            for direction, actions in HAT_ACTIONS.items():
+                for action in actions:
+                    self._set(action, source, y == direction)
+        elif kind == pygame.KEYDOWN or kind == pygame.KEYUP:
+            for action in KEYS.get(event.key, ()):
+                self._set(action, ('key', event.key), kind == pygame.KEYDOWN)
+        elif kind == pygame.MOUSEBUTTONDOWN or kind == pygame.MOUSEBUTTONUP:
+            for action in MOUSE_BUTTONS.get(event.button, ()):
+                self._set(action, ('mouse', event.button), kind == pygame.MOUSEBUTTONDOWN)
+        elif kind == pygame.MOUSEMOTION:
+            self.mouse_pos = event.pos
+            self.aim_with_mouse = True
+        elif kind == pygame.JOYDEVICEADDED:
+            self._open_pad(event.device_index)
+        elif kind == pygame.JOYDEVICEREMOVED:
+            self._close_pad(event.instance_id)
+
+    def _set(self, action, source, down):
+        holders = self.sources.setdefault(action, set())
+        was_held = bool(holders)
+        owner = _owner(source)
+        # Edges are per device, so two players can press the same button
+        owner_held = any(_owner(s) == owner for s in holders)
+        if down:
+            holders.add(source)
+        else:
+            holders.discard(source)
+        if down and not owner_held:
+            now = self.clock()
+            last = self.last_press.get((action, owner))
+            self.last_press[(action, owner)] = now
+            if last is not None and now - last < self.debounce:
+                return   # contact bounce: still held, but no new edge
+            self.latched.add((action, owner))
+            if not was_held:
+                self.pressed_now.add(action)
+                self.held_since[action] = now
+                self.repeats[action] = 0
+        elif not holders:
+            self.held_since.pop(action, None)
+
+    def _open_pad(self, device_index):
+        pad = pygame.joystick.Joystick(device_index)
+        pad.init()
+        instance = pad.get_instance_id()
+        if instance not in self.pads:
+            self.pads[instance] = pad
+            free = [p for p in range(self.first_pad_slot, self.players) if self.slots[p] is None]
+            if free:
+                self.slots[free[0]] = instance
+            self.pad_axes[instance] = [0.0] * max(4, pad.get_numaxes())
+            if self.active_pad is None:
+                self.active_pad = instance
+
+    def _close_pad(self, instance):
+        pad = self.pads.pop(instance, None)
+        self.pad_axes.pop(instance, None)
+        if instance in self.slots:
+            self.slots[self.slots.index(instance)] = None
+        # Release whatever the unplugged pad was holding
+        for action, holders in self.sources.items():
+            holders -= {source for source in holders
+                        if source[0] in ('pad', 'hat') and source[1] == instance}
+            if not holders:
+                self.held_since.pop(action, None)
+        if self.active_pad == instance:
+            self.active_pad = next(iter(self.pads), None)
+        if pad is not None:
+            pad.quit()
+
+    # ----- Queries -----
+    def held(self, action, owners=None):
+        """Whether action is held; only by the given owners' devices if set."""
+        holders = self.sources.get(action)
+        if owners is None or not holders:
+            return bool(holders)
+        return any(_owner(source) in owners for source in holders)
+
+    def pressed(self, action):
+        """True on the frame the action went down."""
+        return action in self.pressed_now
+
+    def repeated(self, action):
+        """True on press, then every repeat_interval once held past repeat_delay."""
+        if action in self.pressed_now:
+            return True
+        since = self.held_since.get(action)
+        if since is None:
+            return False
+        held_for = self.clock() - since - self.repeat_delay
+        if held_for < 0:
+            return False
+        due = int(held_for / self.repeat_interval) + 1
+        if due > self.repeats[action]:
+            self.repeats[action] = due
+            return True
+        return False
+
+    def flush(self):
+        """Drop presses no tick has taken yet, e.g. ones made in a menu."""
+        self.latched.clear()
+
+    def snapshot(self, aim_origin=None, player=0):
+        """engine.Inputs for one sim tick of the given player. aim_origin is
+        the player's center, needed to turn the mouse position into an aim
+        direction."""
+        if self.players == 1:
+            owners = None   # every device plays the one player
+            pad = self.active_pad
+        else:
+            pad = self.slots[player]
+            # None is keyboard and mouse, which only ever play player 0; a
+            # slot no pad has claimed yet owns nothing and stays idle
+            owners = {pad} if pad is not None else set()
+            if player == 0:
+                owners.add(None)
+        axes = self.pad_axes.get(pad, (0.0, 0.0, 0.0, 0.0))
+        move_x, move_y, aim_x, aim_y = axes[0], axes[1], axes[2], axes[3]
+
+        if player == 0:
+            key_x = self.held('move_right') - self.held('move_left')
+            key_y = self.held('move_down') - self.held('move_up')
+            if key_x or key_y:
+                length = math.hypot(key_x, key_y)
+                move_x, move_y = key_x / length, key_y / length
+
+            if self.aim_with_mouse and self.mouse_pos is not None and aim_origin is not None:
+                dx = self.mouse_pos[0] - aim_origin[0]
+                dy = self.mouse_pos[1] - aim_origin[1]
+                length = math.hypot(dx, dy)
+                aim_x, aim_y = (dx / length, dy / length) if length >= 1 else (0.0, 0.0)
+
+        if owners is None:
+            latched = {name for name, _ in self.latched}
+            self.latched.clear()
+        else:
+            latched = {name for name, owner in self.latched if owner in owners}
+            self.latched -= {(name, owner) for name in GAME_BUTTONS for owner in owners}
+        buttons = {name: self.held(name, owners) or name in latched for name in GAME_BUTTONS}
+        return engine.Inputs(move_x=move_x, move_y=move_y, aim_x=aim_x, aim_y=aim_y, **buttons)
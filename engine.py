@@ -0,0 +1,699 @@
+import sys
+import math
+import time
+import random
+
+import numpy as np
+
+from entities import EntityStore, PLAYER_FIELDS, PROJECTILE_FIELDS, ENEMY_FIELDS, PICKUP_FIELDS
+from spatial import SpatialHash
+from waves import WaveScheduler, load_waves
+from profiler import Profiler, NULL_PROFILER
+
+# -----------------------------
+# Config
+# -----------------------------
+# Headless simulation core: no pygame in here. The frontend in main.py
+# builds an Inputs each frame, calls step() and draws the World.
+#
+# Speeds and timers are in seconds so the sim is independent of frame
+# rate. The old per-frame values at 60 fps are noted next to each.
+#
+# WIDTH x HEIGHT is the screen. The world defaults to the same size; a
+# bigger one (world_width / world_height) scrolls under a camera that
+# follows the players (camera.py). Enemies then spawn around a player's
+# screen-sized view rather than the world's edges, and those beyond
+# lod_distance of every player only steer every lod_interval ticks, in
+# one bigger step, so per-tick work tracks the action rather than the
+# world's population.
+WIDTH, HEIGHT = 1200, 760
+TICK_RATE = 60
+FRAME_DT = 1.0 / TICK_RATE
+
+DEFAULT_CONFIG = {
+    'tri_size': 60,
+    'tri_speed': 300.0,           # 5 px/frame
+    'move_deadzone': 0.1,
+    'aim_deadzone': 0.2,
+    'players': 1,                 # co-op players, one per controller slot
+    'world_width': None,          # None = the screen size, no scrolling
+    'world_height': None,
+    'lod_distance': 2400.0,       # far enemies update less often (bigger worlds only)
+    'lod_interval': 4,            # ticks between far-enemy updates
+    'projectile_speed': 600.0,    # 10 px/frame
+    'projectile_size': 12,
+    'enemy_size': 40,
+    'grid_cell_size': 40,         # spatial hash cell, tuned to enemy_size
+    # (color, speed px/s, damage, score, spawn weight)
+    'enemy_types': [
+        ((255, 255, 255), 120.0, 5, 500, 0.6),    # White, 2 px/frame
+        ((0, 255, 255),   240.0, 10, 1500, 0.3),  # Blue, 4 px/frame
+        ((255, 0, 0),     420.0, 15, 3000, 0.1),  # Red, 7 px/frame
+    ],
+    'spawn_interval': 1.25,       # 75 frames
+    'waves': None,                # wave spec dict (see waves.py); None = one enemy per spawn_interval
+    'max_bullets': 12,
+    'reload_duration': 0.94,
+    'heal_duration': 5.0,
+    'heal_amount': 20,
+    'max_health': 100,
+    'heal_pickup_duration': 10.0,
+    'heal_pickup_radius': 15,
+    'heal_pickup_heal_amount': 20,
+    'heal_drop_chance': 0.30,
+    'survival_bonus': 2000,       # per full minute survived
+    # Entity pools: preallocated rows per kind, and what to do when one is
+    # full ('grow', 'drop' the new entity, or 'recycle' the oldest)
+    'projectile_capacity': 256,
+    'enemy_capacity': 512,
+    'pickup_capacity': 64,
+    'entity_overflow': 'grow',
+}
+
+# Profiler phases laid down by step(), and the entity counts it reports
+PHASES = ['player', 'projectiles', 'spawn', 'steering', 'collisions', 'pickups']
+COUNTERS = ['projectiles', 'enemies', 'pickups']
+
+# Triangle color feedback
+COLOR_IDLE = (100, 200, 255)
+COLOR_HEALING = (0, 255, 0)
+COLOR_RELOADING = (255, 0, 0)
+COLOR_BUTTON_Y = (255, 255, 0)
+COLOR_BUTTON_X = (0, 0, 255)
+
+# Idle color per player slot (player 0 keeps the original blue); more
+# players than colors reuse them from the start
+PLAYER_COLORS = [COLOR_IDLE, (255, 160, 60), (200, 120, 255), (255, 120, 200)]
+
+# Player 'state' column -> triangle color; idle is the player's own color
+STATE_IDLE, STATE_HEALING, STATE_RELOADING, STATE_BUTTON_Y, STATE_BUTTON_X = range(5)
+STATE_COLORS = [None, COLOR_HEALING, COLOR_RELOADING, COLOR_BUTTON_Y, COLOR_BUTTON_X]
+
+# Cap on (enemies x players) distances computed at once when enemies pick
+# the nearest player
+NEAREST_BLOCK = 1 << 16
+
+
+def make_config(**overrides):
+    unknown = set(overrides) - set(DEFAULT_CONFIG)
+    if unknown:
+        raise KeyError(f"Unknown config keys: {', '.join(sorted(unknown))}")
+    config = dict(DEFAULT_CONFIG)
+    config.update(overrides)
+    return config
+
+
+# -----------------------------
+# Inputs & World
+# -----------------------------
+class Inputs:
+    """One tick of player input, already read from whatever device."""
+
+    __slots__ = ('move_x', 'move_y', 'aim_x', 'aim_y',
+                 'shoot', 'heal', 'reload', 'button_x', 'button_y')
+
+    def __init__(self, move_x=0.0, move_y=0.0, aim_x=0.0, aim_y=0.0,
+                 shoot=False, heal=False, reload=False,
+                 button_x=False, button_y=False):
+        self.move_x = move_x
+        self.move_y = move_y
+        self.aim_x = aim_x
+        self.aim_y = aim_y
+        self.shoot = shoot
+        self.heal = heal
+        self.reload = reload
+        self.button_x = button_x
+        self.button_y = button_y
+
+
+IDLE = Inputs()
+
+
+class World:
+    """Complete simulation state for one run."""
+
+    def __init__(self, config=None, seed=None):
+        self.config = config if config is not None else make_config()
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.profiler = NULL_PROFILER
+
+        cfg = self.config
+        if cfg['players'] < 1:
+            raise ValueError("Need at least one player")
+        self.width = cfg['world_width'] or WIDTH
+        self.height = cfg['world_height'] or HEIGHT
+        if self.width < WIDTH or self.height < HEIGHT:
+            raise ValueError(f"World can't be smaller than the screen ({WIDTH}x{HEIGHT})")
+        self.large = self.width > WIDTH or self.height > HEIGHT
+        overflow = cfg['entity_overflow']
+        self.players = EntityStore(PLAYER_FIELDS, cfg['players'], 'drop')
+        self.projectiles = EntityStore(PROJECTILE_FIELDS, cfg['projectile_capacity'], overflow)
+        self.enemies = EntityStore(ENEMY_FIELDS, cfg['enemy_capacity'], overflow)
+        self.heal_pickups = EntityStore(PICKUP_FIELDS, cfg['pickup_capacity'], overflow)
+        self.enemy_grid = SpatialHash(cfg['grid_cell_size'])
+        self.pickup_grid = SpatialHash(cfg['grid_cell_size'])
+        self.reset()
+
+    def reset(self):
+        cfg = self.config
+        self.tri_size = cfg['tri_size']
+        self.max_bullets = cfg['max_bullets']
+        self.max_health = cfg['max_health']
+
+        # The entity pools outlive a reset; they are only emptied
+        for store in (self.players, self.projectiles, self.enemies, self.heal_pickups):
+            store.clear()
+        self.enemy_grid.clear()
+        self.pickup_grid.clear()
+
+        # One player starts in the middle; more stand in a ring around it
+        n = cfg['players']
+        angles = np.arange(n) * (2 * np.pi / n)
+        radius = min(HEIGHT / 3, self.tri_size * n / 3) if n > 1 else 0
+        xs = self.width // 2 + np.round(radius * np.cos(angles))
+        ys = self.height // 2 + np.round(radius * np.sin(angles))
+        self.players.add_many(n, x=xs, y=ys, prev_x=xs, prev_y=ys, angle=0,
+                              bullets=self.max_bullets, health=self.max_health,
+                              reloading=False, reload_start=0, healing=False, heal_start=0,
+                              prev_shoot=False, state=STATE_IDLE)
+
+        self.elapsed = 0.0
+        self.tick = 0
+        self.spawn_timer = 0.0
+        self.waves = None
+        if cfg['waves'] is not None:
+            self.waves = WaveScheduler(cfg['waves'], np.random.default_rng(self.rng.getrandbits(64)),
+                                       cfg['enemy_types'], cfg['enemy_size'], WIDTH, HEIGHT)
+        self.minutes_scored = 0
+        self.score = 0
+        self.dead = False   # every player is down
+
+        # Things that happened during the last step, for sound/UI/telemetry.
+        # p is the player involved (for kills, the one who fired):
+        # ('shot', p), ('kill', color, p), ('damage', amount, color, p),
+        # ('pickup', p), ('reload', p), ('reloaded', p), ('heal', p),
+        # ('healed', amount, p), ('down', p), and ('death',) once the last
+        # player is down
+        self.events = []
+
+    # ----- Player 0, for single-player code -----
+    def _player0(self, name):
+        return self.players.columns[name][0]
+
+    tri_x = property(lambda self: float(self._player0('x')))
+    tri_y = property(lambda self: float(self._player0('y')))
+    prev_tri_x = property(lambda self: float(self._player0('prev_x')))
+    prev_tri_y = property(lambda self: float(self._player0('prev_y')))
+    triangle_angle = property(lambda self: float(self._player0('angle')))
+    current_bullets = property(lambda self: int(self._player0('bullets')))
+    health = property(lambda self: int(self._player0('health')))
+    reloading = property(lambda self: bool(self._player0('reloading')))
+    reload_start_time = property(lambda self: float(self._player0('reload_start')))
+    healing = property(lambda self: bool(self._player0('healing')))
+    heal_start_time = property(lambda self: float(self._player0('heal_start')))
+    tri_color = property(lambda self: player_color(0, self._player0('state')))
+
+
+# -----------------------------
+# Helpers
+# -----------------------------
+def player_color(player, state):
+    return STATE_COLORS[state] if state else PLAYER_COLORS[player % len(PLAYER_COLORS)]
+
+
+def shoot_projectile(world, p):
+    players = world.players.columns
+    rad = math.radians(players['angle'][p] - 90)
+    speed = world.config['projectile_speed']
+    x = players['x'][p] + world.tri_size // 2
+    y = players['y'][p] + world.tri_size // 2
+    world.projectiles.add(
+        x=x, y=y, prev_x=x, prev_y=y,
+        vx=math.cos(rad) * speed,
+        vy=math.sin(rad) * speed,
+        owner=p,
+    )
+
+
+def view_origin(world, x, y):
+    """Top-left of the screen-sized view centered on x, y, kept in the world."""
+    return (min(max(x - WIDTH / 2, 0), world.width - WIDTH),
+            min(max(y - HEIGHT / 2, 0), world.height - HEIGHT))
+
+
+def spawn_origin(world, live):
+    """Top-left of the view new enemies spawn around: that of a live player
+    (a random one in co-op). Always 0, 0 in a screen-sized world."""
+    if not world.large:
+        return 0, 0
+    p = live[0] if len(live) == 1 else live[world.rng.randrange(len(live))]
+    half = world.tri_size / 2
+    col = world.players.columns
+    return view_origin(world, float(col['x'][p]) + half, float(col['y'][p]) + half)
+
+
+def spawn_enemy(world, origin=(0, 0)):
+    cfg = world.config
+    rng = world.rng
+    types = cfg['enemy_types']
+    kind = rng.choices(range(len(types)), weights=[t[4] for t in types])[0]
+    _, speed, damage, points, _ = types[kind]
+    edge = rng.choice(['top', 'bottom', 'left', 'right'])
+    size = cfg['enemy_size']
+    if edge == 'top':
+        x = rng.randint(0, WIDTH)
+        y = -size
+    elif edge == 'bottom':
+        x = rng.randint(0, WIDTH)
+        y = HEIGHT + size
+    elif edge == 'left':
+        x = -size
+        y = rng.randint(0, HEIGHT)
+    else:
+        x = WIDTH + size
+        y = rng.randint(0, HEIGHT)
+    x += origin[0]
+    y += origin[1]
+    world.enemies.add(x=x, y=y, prev_x=x, prev_y=y, size=size, speed=speed, damage=damage, points=points,
+                      kind=kind, far=False)
+
+
+def target_centers(world, live, x, y):
+    """Center of the nearest of the `live` players to each point of x, y.
+
+    Scalars when only one player is up. Otherwise an argmin over a
+    (points x players) block of squared distances, taken in chunks so the
+    block stays small however many enemies and players there are.
+    """
+    col = world.players.columns
+    half = world.tri_size // 2
+    if len(live) == 1:
+        p = live[0]
+        return col['x'][p] + half, col['y'][p] + half
+    px = col['x'][live] + half
+    py = col['y'][live] + half
+    nearest = np.empty(len(x), np.intp)
+    chunk = max(1, NEAREST_BLOCK // len(live))
+    for start in range(0, len(x), chunk):
+        dx = x[start:start + chunk, None] - px
+        dy = y[start:start + chunk, None] - py
+        nearest[start:start + chunk] = np.argmin(dx * dx + dy * dy, axis=1)
+    return px[nearest], py[nearest]
+
+
+def projectile_hits(world):
+    """Match projectiles to the enemies they are inside, at most one each way.
+
+    Expects world.enemy_grid to be built from the current enemy centers.
+    Returns (enemy indices, projectile indices) of the resolved hits.
+    """
+    enemies = world.enemies
+    projectiles = world.projectiles
+    empty = np.zeros(0, np.intp)
+    if not len(enemies) or not len(projectiles):
+        return empty, empty
+    px, py = projectiles['x'], projectiles['y']
+    ex, ey, esize = enemies['x'], enemies['y'], enemies['size']
+    pi, ei = world.enemy_grid.query_pairs(px, py, world.config['enemy_size'] / 2)
+    inside = ((ex[ei] < px[pi]) & (px[pi] < ex[ei] + esize[ei])
+              & (ey[ei] < py[pi]) & (py[pi] < ey[ei] + esize[ei]))
+    pi, ei = pi[inside], ei[inside]
+    if not len(pi):
+        return empty, empty
+    # Each projectile takes the lowest-index enemy it is inside, then each
+    # enemy is claimed by the lowest-index projectile. A projectile that
+    # loses its enemy to another one keeps flying.
+    order = np.lexsort((ei, pi))
+    pi, ei = pi[order], ei[order]
+    _, first = np.unique(pi, return_index=True)
+    pi, ei = pi[first], ei[first]
+    _, first = np.unique(ei, return_index=True)
+    return ei[first], pi[first]
+
+
+# -----------------------------
+# Step
+# -----------------------------
+def update_player(world, p, inputs, dt):
+    """Movement, aim, heal, reload and shooting for player p."""
+    cfg = world.config
+    col = world.players.columns
+    events = world.events
+    now = world.elapsed
+    size = world.tri_size
+    healing = bool(col['healing'][p])
+    reloading = bool(col['reloading'][p])
+
+    # Movement (left stick)
+    axis_x, axis_y = inputs.move_x, inputs.move_y
+    deadzone = cfg['move_deadzone']
+    if abs(axis_x) < deadzone: axis_x = 0
+    if abs(axis_y) < deadzone: axis_y = 0
+
+    x, y = float(col['x'][p]), float(col['y'][p])
+    if not healing:
+        x += axis_x * cfg['tri_speed'] * dt
+        y += axis_y * cfg['tri_speed'] * dt
+    col['x'][p] = max(0, min(world.width - size, x))
+    col['y'][p] = max(0, min(world.height - size, y))
+
+    # Aim (right stick)
+    aim_deadzone = cfg['aim_deadzone']
+    if abs(inputs.aim_x) > aim_deadzone or abs(inputs.aim_y) > aim_deadzone:
+        col['angle'][p] = math.degrees(math.atan2(inputs.aim_y, inputs.aim_x)) + 90
+
+    # Hold to self-heal
+    if inputs.heal:
+        if not healing:
+            healing = True
+            col['heal_start'][p] = now
+            events.append(('heal', p))
+    elif healing:
+        if now - col['heal_start'][p] >= cfg['heal_duration']:
+            health = int(col['health'][p])
+            healed = min(world.max_health, health + cfg['heal_amount']) - health
+            col['health'][p] = health + healed
+            events.append(('healed', healed, p))
+        healing = False
+
+    # Hold to reload
+    if inputs.reload:
+        if not reloading and not healing:
+            reloading = True
+            col['reload_start'][p] = now
+            events.append(('reload', p))
+    elif reloading:
+        if now - col['reload_start'][p] >= cfg['reload_duration']:
+            col['bullets'][p] = world.max_bullets
+            events.append(('reloaded', p))
+        reloading = False
+    col['healing'][p] = healing
+    col['reloading'][p] = reloading
+
+    # Shoot on press
+    if inputs.shoot and not col['prev_shoot'][p] and col['bullets'][p] > 0 and not healing:
+        shoot_projectile(world, p)
+        col['bullets'][p] -= 1
+        events.append(('shot', p))
+    col['prev_shoot'][p] = inputs.shoot
+
+    # Color feedback
+    if healing:
+        col['state'][p] = STATE_HEALING
+    elif reloading:
+        col['state'][p] = STATE_RELOADING
+    elif inputs.button_y:
+        col['state'][p] = STATE_BUTTON_Y
+    elif inputs.button_x:
+        col['state'][p] = STATE_BUTTON_X
+    else:
+        col['state'][p] = STATE_IDLE
+
+
+def step(world, inputs, dt=FRAME_DT):
+    """Advance the world by dt seconds.
+
+    inputs is one Inputs (for a single player) or a sequence with one per
+    player; players past its end stand still. Does nothing once every
+    player is down.
+    """
+    if world.dead:
+        return
+    cfg = world.config
+    events = world.events
+    events.clear()
+    world.tick += 1
+    world.elapsed += dt
+    now = world.elapsed
+    size = world.tri_size
+    prof = world.profiler
+
+    # Remember where everything started this tick, for render interpolation
+    for store in (world.players, world.projectiles, world.enemies):
+        if len(store):
+            store['prev_x'][:] = store['x']
+            store['prev_y'][:] = store['y']
+
+    # Players who are up; this only changes at the down check at the end
+    players = world.players
+    col = players.columns
+    live = np.flatnonzero(players.alive).tolist()
+    if isinstance(inputs, Inputs):
+        inputs = (inputs,)
+    for p in live:
+        update_player(world, p, inputs[p] if p < len(inputs) else IDLE, dt)
+
+    prof.lap('player')
+
+    # Projectiles: integrate and cull once out of the world
+    projectiles = world.projectiles
+    if len(projectiles):
+        px, py = projectiles['x'], projectiles['y']
+        px += projectiles['vx'] * dt
+        py += projectiles['vy'] * dt
+        projectiles.alive[:] = (px >= 0) & (px <= world.width) & (py >= 0) & (py <= world.height)
+        projectiles.compact()
+
+    prof.lap('projectiles')
+
+    # Spawn enemies
+    if world.waves is not None:
+        world.waves.update(world.enemies, now, dt, spawn_origin(world, live))
+    else:
+        world.spawn_timer += dt
+        if world.spawn_timer >= cfg['spawn_interval']:
+            spawn_enemy(world, spawn_origin(world, live))
+            world.spawn_timer -= cfg['spawn_interval']
+
+    prof.lap('spawn')
+
+    # Enemies seek the nearest player
+    enemies = world.enemies
+    if len(enemies) and not world.large:
+        ex, ey = enemies['x'], enemies['y']
+        cx, cy = target_centers(world, live, ex, ey)
+        dx = cx - ex
+        dy = cy - ey
+        dist = np.hypot(dx, dy)
+        dist[dist == 0] = 1.0
+        step_len = enemies['speed'] * dt / dist
+        ex += dx * step_len
+        ey += dy * step_len
+    elif len(enemies):
+        # Update LOD: far enemies take turns, each stepping lod_interval
+        # ticks' worth on its turn; whether it is far is rechecked then
+        interval = cfg['lod_interval']
+        far = enemies['far']
+        rows = np.flatnonzero(~far | ((enemies.born[:len(enemies)] + world.tick) % interval == 0))
+        ex, ey = enemies['x'][rows], enemies['y'][rows]
+        cx, cy = target_centers(world, live, ex, ey)
+        dx = cx - ex
+        dy = cy - ey
+        dist = np.hypot(dx, dy)
+        dist[dist == 0] = 1.0
+        step_len = enemies['speed'][rows] * np.where(far[rows], interval * dt, dt) / dist
+        enemies['x'][rows] = ex + dx * step_len
+        enemies['y'][rows] = ey + dy * step_len
+        far[rows] = dist > cfg['lod_distance']
+
+    prof.lap('steering')
+
+    # Broad phase: bucket enemies by center for this tick's collision
+    # checks. The grid follows the enemies through compaction below, so
+    # it still indexes them after the step (the renderer culls with it).
+    if len(enemies):
+        half = enemies['size'] / 2
+        world.enemy_grid.rebuild(enemies['x'] + half, enemies['y'] + half)
+    else:
+        world.enemy_grid.clear()
+
+    # Projectile vs enemy collisions + drop heal + scoring
+    enemy_idx, proj_idx = projectile_hits(world)
+    if len(enemy_idx):
+        enemies.alive[enemy_idx] = False
+        projectiles.alive[proj_idx] = False
+        types = cfg['enemy_types']
+        ex, ey, esize, kinds = enemies['x'], enemies['y'], enemies['size'], enemies['kind']
+        shooters = projectiles['owner'][proj_idx].tolist()
+        for e, shooter in zip(enemy_idx.tolist(), shooters):
+            world.score += int(enemies['points'][e])
+            events.append(('kill', types[kinds[e]][0], shooter))
+
+            # heal pickup drop chance
+            if world.rng.random() < cfg['heal_drop_chance']:
+                world.heal_pickups.add(
+                    x=ex[e] + esize[e] / 2,
+                    y=ey[e] + esize[e] / 2,
+                    radius=cfg['heal_pickup_radius'],
+                    spawn_time=now,
+                )
+        projectiles.compact()
+
+    # Enemy contact damage (enemies killed above are still in the grid but
+    # not alive). An enemy touching two players hits the lower-numbered one.
+    exposed = [p for p in live if not col['healing'][p]]
+    if exposed and len(enemies):
+        ex, ey, esize = enemies['x'], enemies['y'], enemies['size']
+        types = cfg['enemy_types']
+        for p in exposed:
+            cx = col['x'][p] + size // 2
+            cy = col['y'][p] + size // 2
+            near = world.enemy_grid.query_point(cx, cy, size / 2 + cfg['enemy_size'] / 2)
+            if not len(near):
+                continue
+            near = np.sort(near)
+            dist = np.hypot(cx - (ex[near] + esize[near] / 2), cy - (ey[near] + esize[near] / 2))
+            touching = near[(dist < size // 2 + esize[near] // 2) & enemies.alive[near]]
+            for e in touching.tolist():
+                damage = int(enemies['damage'][e])
+                col['health'][p] -= damage
+                events.append(('damage', damage, types[enemies['kind'][e]][0], p))
+            enemies.alive[touching] = False
+    moved = enemies.compact(remap=True)
+    if moved is not None:
+        world.enemy_grid.remap(moved)
+
+    prof.lap('collisions')
+
+    # Heal pickups: expire, collect
+    pickups = world.heal_pickups
+    if len(pickups):
+        pickups.alive[:] = now - pickups['spawn_time'] <= cfg['heal_pickup_duration']
+        pickups.compact()
+    if len(pickups):
+        px, py, radius = pickups['x'], pickups['y'], pickups['radius']
+        world.pickup_grid.rebuild(px, py)
+        for p in live:
+            pcx = col['x'][p] + size / 2
+            pcy = col['y'][p] + size / 2
+            near = world.pickup_grid.query_point(pcx, pcy, size / 2 + cfg['heal_pickup_radius'])
+            if not len(near):
+                continue
+            touching = near[(np.hypot(pcx - px[near], pcy - py[near]) < size / 2 + radius[near])
+                            & pickups.alive[near]]
+            for _ in range(len(touching)):
+                col['health'][p] = min(world.max_health, col['health'][p] + cfg['heal_pickup_heal_amount'])
+                events.append(('pickup', p))
+            pickups.alive[touching] = False
+        pickups.compact()
+
+    # Survival bonus: award once per new minute
+    new_minutes = int(world.elapsed // 60)
+    if new_minutes > world.minutes_scored:
+        world.score += (new_minutes - world.minutes_scored) * cfg['survival_bonus']
+        world.minutes_scored = new_minutes
+
+    # Down check; the run ends with the last player standing
+    down = [p for p in live if col['health'][p] <= 0]
+    if down:
+        for p in down:
+            players.alive_mask[p] = False
+            events.append(('down', p))
+        if len(down) == len(live):
+            world.dead = True
+            events.append(('death',))
+
+    prof.lap('pickups')
+    prof.count('projectiles', len(world.projectiles))
+    prof.count('enemies', len(world.enemies))
+    prof.count('pickups', len(world.heal_pickups))
+
+
+# -----------------------------
+# Headless runs
+# -----------------------------
+def autopilot(world):
+    """Tiny scripted player: aim at the nearest enemy, shoot, reload when empty."""
+    size = world.tri_size
+    cx = world.tri_x + size / 2
+    cy = world.tri_y + size / 2
+    if world.current_bullets == 0 or world.reloading:
+        # Hold reload until the reload has had time to finish
+        held = world.reloading and world.elapsed - world.reload_start_time >= world.config['reload_duration']
+        return Inputs(reload=not held)
+    enemies = world.enemies
+    if not len(enemies):
+        return IDLE
+    half = enemies['size'] / 2
+    ex = enemies['x'] + half
+    ey = enemies['y'] + half
+    nearest = int(np.argmin((ex - cx) ** 2 + (ey - cy) ** 2))
+    return Inputs(aim_x=float(ex[nearest] - cx), aim_y=float(ey[nearest] - cy),
+                  shoot=world.tick % 8 == 0)
+
+
+def run(world, controller=autopilot, max_ticks=None, dt=FRAME_DT):
+    """Step world until the player dies or max_ticks pass. Returns ticks run."""
+    ticks = 0
+    prof = world.profiler
+    while not world.dead and (max_ticks is None or ticks < max_ticks):
+        prof.begin_frame()
+        inputs = controller(world)
+        prof.lap('controller')
+        step(world, inputs, dt)
+        prof.end_frame()
+        ticks += 1
+    return ticks
+
+
+def parse_size(text):
+    """'20000x20000' -> (20000, 20000)"""
+    width, _, height = text.lower().partition('x')
+    return int(width), int(height)
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the game headless as fast as possible.")
+    parser.add_argument('--ticks', type=int, default=100_000, help="total ticks to simulate")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--waves', help="spawn from a wave spec JSON file (see wavesets/)")
+    parser.add_argument('--world', type=parse_size, metavar='WxH', help="world size (default: the screen)")
+    parser.add_argument('--profile', action='store_true', help="print per-phase p50/p95/p99 at the end")
+    parser.add_argument('--profile-out', help="write per-tick phase timings to a .csv or .jsonl file")
+    parser.add_argument('--checkpoint', metavar='FILE', help="save the running game to FILE every --checkpoint-every ticks")
+    parser.add_argument('--checkpoint-every', type=int, default=36_000, metavar='TICKS',
+                        help="ticks between checkpoints (default 36000, ten minutes of play)")
+    parser.add_argument('--resume', metavar='FILE', help="start from a checkpoint instead of a new game")
+    args = parser.parse_args(argv)
+    if args.checkpoint or args.resume:
+        import snapshot
+
+    profiler = NULL_PROFILER
+    if args.profile or args.profile_out:
+        profiler = Profiler(['controller'] + PHASES, COUNTERS, window=10_000, export=args.profile_out)
+
+    overrides = {}
+    if args.waves:
+        overrides['waves'] = load_waves(args.waves)
+    if args.world:
+        overrides['world_width'], overrides['world_height'] = args.world
+    config = make_config(**overrides)
+    total = 0
+    games = 0
+    started = time.perf_counter()
+    while total < args.ticks:
+        if args.resume and not games:
+            world = snapshot.load(args.resume)
+        else:
+            world = World(config, seed=args.seed + games)
+        world.profiler = profiler
+        if args.checkpoint:
+            while not world.dead and total < args.ticks:
+                total += run(world, max_ticks=min(args.checkpoint_every, args.ticks - total))
+                snapshot.save(world, args.checkpoint)
+        else:
+            total += run(world, max_ticks=args.ticks - total)
+        games += 1
+        print(f"game {games}: score={world.score} time={world.elapsed:.2f}s dead={world.dead}")
+    wall = time.perf_counter() - started
+    print(f"{total} ticks in {wall:.2f}s ({total / wall:,.0f} ticks/s)")
+    if args.profile:
+        print("\n".join(profiler.summary_lines()))
+    profiler.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,215 @@
+import numpy as np
+
+# -----------------------------
+# Structure-of-arrays entity storage
+# -----------------------------
+# Each entity kind is a set of parallel NumPy columns plus an alive mask.
+# Rows [0, count) are live slots; systems update whole columns at once and
+# flag removals in `alive`, then compact() swap-removes the dead rows.
+#
+# The columns are the pool: they are allocated once at `capacity` and
+# reused for the life of the store (World.reset() just clears them), so
+# steady-state play allocates no per-entity objects. What happens when an
+# add() finds the store full is the overflow policy:
+#
+#   'grow'     double the columns (the only path that reallocates)
+#   'drop'     refuse the new entity; add() returns -1
+#   'recycle'  overwrite the oldest live entity
+
+# prev_x/prev_y hold the position at the start of the last tick, so the
+# renderer can interpolate between ticks.
+PROJECTILE_FIELDS = {
+    'x': np.float64,
+    'y': np.float64,
+    'prev_x': np.float64,
+    'prev_y': np.float64,
+    'vx': np.float64,
+    'vy': np.float64,
+    'owner': np.int8,     # index of the player who fired it
+}
+
+ENEMY_FIELDS = {
+    'x': np.float64,
+    'y': np.float64,
+    'prev_x': np.float64,
+    'prev_y': np.float64,
+    'size': np.float64,
+    'speed': np.float64,
+    'damage': np.int32,
+    'points': np.int32,
+    'kind': np.int8,      # index into config['enemy_types']
+    'far': np.bool_,      # beyond the update LOD distance (see engine.step)
+}
+
+# One row per player, in controller-slot order. Player rows are never
+# compacted, so a player's index stays put; `alive` goes False when they
+# are down.
+PLAYER_FIELDS = {
+    'x': np.float64,
+    'y': np.float64,
+    'prev_x': np.float64,
+    'prev_y': np.float64,
+    'angle': np.float64,
+    'bullets': np.int32,
+    'health': np.int32,
+    'reloading': np.bool_,
+    'reload_start': np.float64,
+    'healing': np.bool_,
+    'heal_start': np.float64,
+    'prev_shoot': np.bool_,
+    'state': np.int8,     # color feedback, index into engine.STATE_COLORS
+}
+
+PICKUP_FIELDS = {
+    'x': np.float64,
+    'y': np.float64,
+    'radius': np.float64,
+    'spawn_time': np.float64,
+}
+
+
+OVERFLOW_POLICIES = ('grow', 'drop', 'recycle')
+
+
+class EntityStore:
+    """Fixed-capacity set of NumPy columns with an alive mask."""
+
+    def __init__(self, fields, capacity=64, overflow='grow'):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        self.dtypes = dict(fields)
+        self.capacity = capacity
+        self.overflow = overflow
+        self.count = 0
+        self.columns = {name: np.zeros(capacity, dtype) for name, dtype in self.dtypes.items()}
+        self.alive_mask = np.zeros(capacity, bool)
+        self.born = np.zeros(capacity, np.int64)   # add() serial, to find the oldest row
+        self.serial = 0
+        # Lifetime stats
+        self.high_water = 0
+        self.grows = 0
+        self.dropped = 0
+        self.recycled = 0
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, name):
+        """Live view of one column (rows [0, count))."""
+        return self.columns[name][:self.count]
+
+    @property
+    def alive(self):
+        return self.alive_mask[:self.count]
+
+    def add(self, **values):
+        """Store one entity; returns its row, or -1 if it was dropped."""
+        if self.count < self.capacity:
+            i = self.count
+            self.count += 1
+            self.high_water = max(self.high_water, self.count)
+        elif self.overflow == 'grow':
+            self._grow(self.capacity * 2)
+            i = self.count
+            self.count += 1
+            self.high_water = self.count
+        elif self.overflow == 'drop':
+            self.dropped += 1
+            return -1
+        else:
+            i = int(np.argmin(self.born[:self.count]))
+            self.recycled += 1
+        for name, value in values.items():
+            self.columns[name][i] = value
+        self.alive_mask[i] = True
+        self.born[i] = self.serial
+        self.serial += 1
+        return i
+
+    def add_many(self, n, **values):
+        """Store n entities at once; values are columns of length n or scalars.
+        Returns the rows written (fewer than n if the 'drop' policy refused some)."""
+        free = self.capacity - self.count
+        if n > free and self.overflow == 'grow':
+            capacity = self.capacity
+            while capacity - self.count < n:
+                capacity *= 2
+            self._grow(capacity)
+            free = self.capacity - self.count
+        appended = min(n, free)
+        rows = np.arange(self.count, self.count + appended)
+        if appended < n and self.overflow == 'recycle':
+            # Overwrite the oldest live rows, oldest first
+            oldest = np.argsort(self.born[:self.count], kind='stable')[:n - appended]
+            rows = np.concatenate((rows, oldest))
+            self.recycled += len(oldest)
+        if len(rows) < n:
+            self.dropped += n - len(rows)
+            values = {name: value[:len(rows)] if np.ndim(value) else value for name, value in values.items()}
+        self.count += appended
+        self.high_water = max(self.high_water, self.count)
+        for name, value in values.items():
+            self.columns[name][rows] = value
+        self.alive_mask[rows] = True
+        self.born[rows] = np.arange(self.serial, self.serial + len(rows))
+        self.serial += len(rows)
+        return rows
+
+    def clear(self):
+        self.count = 0
+
+    def restore(self, columns, alive, born, serial):
+        """Replace the contents with saved rows (see snapshot.py)."""
+        n = len(alive)
+        if n > self.capacity:
+            self._grow(max(n, self.capacity * 2))
+        for name, values in columns.items():
+            self.columns[name][:n] = values
+        self.alive_mask[:n] = alive
+        self.born[:n] = born
+        self.count = n
+        self.serial = serial
+        self.high_water = max(self.high_water, n)
+
+    def stats(self):
+        return {'count': self.count, 'capacity': self.capacity, 'high_water': self.high_water,
+                'grows': self.grows, 'dropped': self.dropped, 'recycled': self.recycled}
+
+    def compact(self, remap=False):
+        """Swap-remove dead rows: fill holes below the new count with live rows above it.
+
+        With remap=True, returns where each old row went (-1 if removed),
+        or None if nothing moved.
+        """
+        n = self.count
+        alive = self.alive_mask[:n]
+        k = int(np.count_nonzero(alive))
+        if k == n:
+            return None
+        holes = np.flatnonzero(~alive[:k])
+        movers = np.flatnonzero(alive[k:n]) + k
+        new_rows = None
+        if remap:
+            new_rows = np.where(alive, np.arange(n), -1)
+            new_rows[movers] = holes
+        if len(holes):
+            for col in self.columns.values():
+                col[holes] = col[movers]
+            self.born[holes] = self.born[movers]
+        self.alive_mask[:k] = True
+        self.count = k
+        return new_rows
+
+    def _grow(self, capacity):
+        for name, col in self.columns.items():
+            bigger = np.zeros(capacity, col.dtype)
+            bigger[:self.count] = col[:self.count]
+            self.columns[name] = bigger
+        mask = np.zeros(capacity, bool)
+        mask[:self.count] = self.alive_mask[:self.count]
+        self.alive_mask = mask
+        born = np.zeros(capacity, np.int64)
+        born[:self.count] = self.born[:self.count]
+        self.born = born
+        self.capacity = capacity
+        self.grows += 1
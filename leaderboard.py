@@ -0,0 +1,494 @@
+import os
+import sys
+import json
+import time
+import uuid
+import socket
+import asyncio
+import threading
+from urllib.parse import urlsplit, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# -----------------------------
+# Remote leaderboard
+# -----------------------------
+# Finished runs also go to a central leaderboard, so every cabinet's best
+# scores end up in one place. The game thread only ever hands a run to
+# the client's own thread (one call_soon_threadsafe) and reads the cached
+# global top-N; all network and disk work happens on an asyncio loop
+# running on that thread:
+#
+#   queue    every run is appended to a JSON-lines journal (`queue_path`)
+#            before it is sent, and the journal is rewritten once a batch
+#            is accepted, so runs made while offline (or before a crash)
+#            are sent the next time the game starts
+#   batches  runs are POSTed to <url>/runs up to `batch_size` at a time,
+#            `flush_interval` after the first one queued; a failed batch
+#            is retried with exponential backoff up to `max_backoff`
+#   pool     up to `connections` keep-alive HTTP/1.1 connections are
+#            reused across requests, so a batch doesn't pay for a TCP
+#            handshake
+#   top      GET <url>/top?n=N every `refresh_interval` seconds and after
+#            each accepted batch; top() returns the last good answer
+#
+# Each run carries a random id and the server ignores ids it has already
+# seen, so a batch resent after a lost reply isn't counted twice.
+#
+# LeaderboardServer is a small stand-in for the real service, to run a
+# cabinet against locally:  python leaderboard.py serve --port 8765
+
+NETWORK_ERRORS = (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError)
+
+
+class ConnectionPool:
+    """Keep-alive HTTP/1.1 connections to one host, for one event loop."""
+
+    def __init__(self, host, port, size=2, timeout=5.0):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.idle = []                        # (reader, writer) ready for reuse
+        self.slots = asyncio.Semaphore(size)
+        self.opened = 0
+
+    async def request(self, method, path, body=b''):
+        """(status, body bytes) of one request; raises one of NETWORK_ERRORS."""
+        async with self.slots:
+            while True:
+                reused = bool(self.idle)
+                if reused:
+                    conn = self.idle.pop()
+                else:
+                    conn = await asyncio.wait_for(asyncio.open_connection(self.host, self.port), self.timeout)
+                    self.opened += 1
+                try:
+                    status, data, keep = await asyncio.wait_for(self._exchange(conn, method, path, body),
+                                                                self.timeout)
+                except NETWORK_ERRORS:
+                    conn[1].close()
+                    if reused:
+                        continue   # the server closed it while idle; try a fresh one
+                    raise
+                if keep:
+                    self.idle.append(conn)
+                else:
+                    conn[1].close()
+                return status, data
+
+    async def _exchange(self, conn, method, path, body):
+        reader, writer = conn
+        writer.write(f"{method} {path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\n"
+                     f"Connection: keep-alive\r\nContent-Type: application/json\r\n"
+                     f"Content-Length: {len(body)}\r\n\r\n".encode('latin-1') + body)
+        await writer.drain()
+        status_line = await reader.readuntil(b"\r\n")
+        if not status_line:
+            raise ValueError("Connection closed")
+        status = int(status_line.split(None, 2)[1])
+        headers = {}
+        while True:
+            line = await reader.readuntil(b"\r\n")
+            if line == b"\r\n":
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        data = await reader.readexactly(int(headers.get('content-length', 0)))
+        return status, data, headers.get('connection', '').lower() != 'close'
+
+    def close(self):
+        for _, writer in self.idle:
+            writer.close()
+        self.idle.clear()
+
+
+class Leaderboard:
+    def __init__(self, url, queue_path='leaderboard-queue.jsonl', cabinet=None, batch_size=50,
+                 flush_interval=1.0, top_n=10, refresh_interval=30.0, connections=2, timeout=5.0,
+                 max_backoff=60.0):
+        parts = urlsplit(url)
+        if parts.scheme != 'http' or not parts.hostname:
+            raise ValueError(f"Leaderboard URL must be http://host[:port][/path]: {url}")
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.prefix = parts.path.rstrip('/')
+        self.queue_path = queue_path
+        self.cabinet = cabinet or socket.gethostname()
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.top_n = top_n
+        self.close_timeout = timeout
+        self.refresh_interval = refresh_interval
+        self.connections = connections
+        self.timeout = timeout
+        self.max_backoff = max_backoff
+
+        # Read by the game thread; replaced whole by the client thread
+        self.top_cache = ()
+        self.version = 0        # bumps whenever top_cache changes
+        self.online = None      # unknown until the first request
+        self.sent = 0
+        self.batches = 0
+        self.failures = 0
+        self.rejected = 0
+
+        self.loop = None
+        self.pool = None
+        self.pending = []
+        self.ready = threading.Event()
+        self.start_lock = threading.Lock()
+        self.started = False
+        self.offline = False    # the client thread never came up; runs only go to the queue file
+        self.thread = threading.Thread(target=self._run, name="leaderboard", daemon=True)
+        self.thread.start()
+        # Never hold up startup: a client thread that fails or is slow to come
+        # up leaves the game offline for the session, journaling runs itself
+        self.ready.wait(timeout)
+        with self.start_lock:
+            if not self.started:
+                self.offline = True
+                self.online = False
+
+    # ----- Game thread side -----
+    def submit(self, score, elapsed, **meta):
+        """Queue a finished run for the leaderboard; returns immediately."""
+        run = {'id': uuid.uuid4().hex, 'cabinet': self.cabinet, 'score': int(score),
+               'time': round(float(elapsed), 3), 'at': round(time.time(), 3), **meta}
+        if self.offline:
+            # Kept for a later session to send
+            self.pending.append(run)
+            self._journal(run)
+            return
+        self.loop.call_soon_threadsafe(self._enqueue, run)
+
+    def top(self):
+        """Cached global top-N as (score, time, cabinet) tuples, best first."""
+        return self.top_cache
+
+    def close(self, timeout=2.0):
+        """Try to send what is queued for up to `timeout` seconds, then stop.
+        Anything unsent stays in the queue file for next time."""
+        if self.started and self.thread.is_alive():
+            self.loop.call_soon_threadsafe(self._stop, timeout)
+            self.thread.join(timeout + 1.0)
+
+    def stats(self):
+        return {'queued': len(self.pending), 'sent': self.sent, 'batches': self.batches,
+                'failures': self.failures, 'rejected': self.rejected, 'online': self.online,
+                'connections_opened': self.pool.opened if self.pool is not None else 0}
+
+    # ----- Client thread -----
+    def _stop(self, timeout):
+        self.close_timeout = timeout
+        self.stopping.set()
+
+    def _run(self):
+        try:
+            asyncio.run(self._main())
+        except Exception as e:
+            print(f"Leaderboard client stopped ({e}), runs stay in the queue file.")
+        finally:
+            self.ready.set()
+
+    async def _main(self):
+        self.loop = asyncio.get_running_loop()
+        self.wake = asyncio.Event()
+        self.refresh_now = asyncio.Event()
+        self.stopping = asyncio.Event()
+        self.pool = ConnectionPool(self.host, self.port, self.connections, self.timeout)
+        self.pending = self._load_queue()
+        if self.pending:
+            self.wake.set()
+        with self.start_lock:
+            if self.offline:
+                return   # came up after the game gave up waiting
+            self.started = True
+        self.ready.set()
+
+        tasks = [asyncio.create_task(self._sender()), asyncio.create_task(self._refresher())]
+        await self.stopping.wait()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        # Last chance for runs from this session, e.g. the one just quit
+        try:
+            await asyncio.wait_for(self._flush(), self.close_timeout)
+        except asyncio.TimeoutError:
+            pass
+        self.pool.close()
+
+    def _enqueue(self, run):
+        self.pending.append(run)
+        self._journal(run)
+        self.wake.set()
+
+    def _journal(self, run):
+        if self.queue_path is None:
+            return
+        try:
+            with open(self.queue_path, 'a') as f:
+                f.write(json.dumps(run) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+        except OSError as e:
+            # Still sent this session if the server is up; only lost on a crash
+            print(f"Could not write leaderboard queue {self.queue_path} ({e})")
+
+    def _load_queue(self):
+        runs = []
+        if self.queue_path is not None and os.path.exists(self.queue_path):
+            try:
+                with open(self.queue_path) as f:
+                    for line in f:
+                        try:
+                            runs.append(json.loads(line))
+                        except ValueError:
+                            pass   # torn last line from a crash mid-append
+            except OSError as e:
+                print(f"Could not read leaderboard queue {self.queue_path} ({e})")
+        return runs
+
+    def _save_queue(self):
+        if self.queue_path is None:
+            return
+        try:
+            if not self.pending:
+                if os.path.exists(self.queue_path):
+                    os.remove(self.queue_path)
+                return
+            tmp_path = self.queue_path + ".tmp"
+            with open(tmp_path, 'w') as f:
+                f.writelines(json.dumps(run) + "\n" for run in self.pending)
+            os.replace(tmp_path, self.queue_path)
+        except OSError as e:
+            print(f"Could not write leaderboard queue {self.queue_path} ({e})")
+
+    async def _sender(self):
+        backoff = 1.0
+        while True:
+            await self.wake.wait()
+            self.wake.clear()
+            if len(self.pending) < self.batch_size:
+                await asyncio.sleep(self.flush_interval)   # let a batch build up
+            while self.pending:
+                if await self._send_batch():
+                    backoff = 1.0
+                else:
+                    await asyncio.sleep(backoff)
+                    backoff = min(backoff * 2, self.max_backoff)
+
+    async def _flush(self):
+        while self.pending and await self._send_batch():
+            pass
+
+    async def _send_batch(self):
+        batch = self.pending[:self.batch_size]
+        try:
+            status, _ = await self.pool.request('POST', self.prefix + '/runs', json.dumps({'runs': batch}).encode())
+        except NETWORK_ERRORS:
+            status = None
+        if status is None or status >= 500 or status == 429:
+            self.online = False
+            self.failures += 1
+            return False
+        self.online = True
+        if status >= 400:
+            self.rejected += len(batch)   # the server will never take these; don't retry forever
+        else:
+            self.sent += len(batch)
+            self.batches += 1
+        del self.pending[:len(batch)]
+        self._save_queue()
+        self.refresh_now.set()
+        return True
+
+    async def _refresher(self):
+        while True:
+            await self._refresh_top()
+            try:
+                await asyncio.wait_for(self.refresh_now.wait(), self.refresh_interval)
+            except asyncio.TimeoutError:
+                pass
+            self.refresh_now.clear()
+
+    async def _refresh_top(self):
+        try:
+            status, data = await self.pool.request('GET', f"{self.prefix}/top?n={self.top_n}")
+            if status != 200:
+                return
+            top = tuple((int(r['score']), float(r['time']), str(r['cabinet'])) for r in json.loads(data)['top'])
+        except NETWORK_ERRORS + (KeyError, TypeError):
+            self.online = False
+            return
+        self.online = True
+        if top != self.top_cache:
+            self.top_cache = top
+            self.version += 1
+
+
+class NullLeaderboard:
+    """Same interface as Leaderboard; reports nowhere."""
+    version = 0
+
+    def submit(self, score, elapsed, **meta):
+        pass
+
+    def top(self):
+        return ()
+
+    def close(self, timeout=2.0):
+        pass
+
+    def stats(self):
+        return {'queued': 0, 'sent': 0, 'batches': 0, 'failures': 0, 'rejected': 0, 'online': None,
+                'connections_opened': 0}
+
+
+# -----------------------------
+# Stand-in server
+# -----------------------------
+class LeaderboardServer:
+    """Local leaderboard service: POST /runs {"runs": [...]}, GET /top?n=N.
+
+    Keeps runs in memory (and appends them to `path` if given), ignores
+    run ids it has seen, and counts connections and requests, which shows
+    whether clients are reusing keep-alive connections.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, path=None):
+        self.path = path
+        self.runs = {}
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.connections = 0
+        self.fail = False   # while set, answer 503 to everything, like a service that is down
+        if path is not None and os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    run = json.loads(line)
+                    self.runs[run['id']] = run
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'   # keep-alive
+
+            def setup(self):
+                super().setup()
+                with server.lock:
+                    server.connections += 1
+
+            def log_message(self, format, *args):
+                pass
+
+            def reply(self, status, payload):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                with server.lock:
+                    server.requests += 1
+                if server.fail:
+                    return self.reply(503, {'error': 'unavailable'})
+                if urlsplit(self.path).path != '/runs':
+                    return self.reply(404, {'error': 'not found'})
+                try:
+                    runs = json.loads(body)['runs']
+                    runs = [run for run in runs if isinstance(run.get('id'), str) and 'score' in run]
+                except (ValueError, KeyError, TypeError, AttributeError):
+                    return self.reply(400, {'error': 'bad batch'})
+                self.reply(200, {'accepted': server.add(runs)})
+
+            def do_GET(self):
+                with server.lock:
+                    server.requests += 1
+                if server.fail:
+                    return self.reply(503, {'error': 'unavailable'})
+                parts = urlsplit(self.path)
+                if parts.path != '/top':
+                    return self.reply(404, {'error': 'not found'})
+                n = int(parse_qs(parts.query).get('n', ['10'])[0])
+                self.reply(200, {'top': server.top(n)})
+
+        return Handler
+
+    def add(self, runs):
+        """Store runs not seen before; returns how many were new."""
+        with self.lock:
+            new = [run for run in runs if run['id'] not in self.runs]
+            for run in new:
+                self.runs[run['id']] = run
+            if new and self.path is not None:
+                with open(self.path, 'a') as f:
+                    f.writelines(json.dumps(run) + "\n" for run in new)
+        return len(new)
+
+    def top(self, n):
+        with self.lock:
+            ranked = sorted(self.runs.values(), key=lambda run: (-run['score'], run.get('time', 0.0)))
+        return [{'score': run['score'], 'time': run.get('time', 0.0), 'cabinet': run.get('cabinet', '?')}
+                for run in ranked[:n]]
+
+    def start(self):
+        """Serve on a background thread."""
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="leaderboard-server", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Local leaderboard server, and a client check against it.")
+    sub = parser.add_subparsers(dest='command', required=True)
+    serve = sub.add_parser('serve', help="run the stand-in leaderboard server")
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8765)
+    serve.add_argument('--data', help="keep submitted runs in this JSON-lines file")
+    top = sub.add_parser('top', help="print a leaderboard's global top-N")
+    top.add_argument('url')
+    top.add_argument('-n', type=int, default=10)
+    args = parser.parse_args(argv)
+
+    if args.command == 'serve':
+        server = LeaderboardServer(args.host, args.port, args.data)
+        print(f"Leaderboard at {server.url} ({len(server.runs)} runs)")
+        try:
+            server.httpd.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        server.httpd.server_close()
+        return 0
+
+    client = Leaderboard(args.url, queue_path=None, top_n=args.n)
+    deadline = time.perf_counter() + client.timeout
+    while client.online is None and time.perf_counter() < deadline:
+        time.sleep(0.05)
+    if not client.online:
+        print(f"{args.url}: unreachable")
+        return 1
+    for i, (score, elapsed, cabinet) in enumerate(client.top(), 1):
+        print(f"{i:>3}. {score:>9}  {elapsed:>9.2f}s  {cabinet}")
+    client.close(timeout=0)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
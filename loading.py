@@ -0,0 +1,53 @@
+import threading
+
+# -----------------------------
+# Background asset loading
+# -----------------------------
+# The window comes up first and shows a loading bar while fonts, sprites,
+# sounds and the podium load on a worker thread. Tasks run in the order
+# they were added; each one's return value is kept under its name. If a
+# task raises, loading stops and result() re-raises it on the main thread.
+
+
+class Loader:
+    def __init__(self):
+        self.tasks = []
+        self.results = {}
+        self.completed = 0
+        self.current = None
+        self.error = None
+        self.thread = None
+
+    def add(self, name, fn, *args, **kwargs):
+        self.tasks.append((name, fn, args, kwargs))
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name="asset-loader", daemon=True)
+        self.thread.start()
+        return self
+
+    def _run(self):
+        for name, fn, args, kwargs in self.tasks:
+            self.current = name
+            try:
+                self.results[name] = fn(*args, **kwargs)
+            except BaseException as e:
+                self.error = e
+                return
+            self.completed += 1
+        self.current = None
+
+    @property
+    def done(self):
+        return self.thread is not None and not self.thread.is_alive()
+
+    @property
+    def progress(self):
+        return self.completed / len(self.tasks) if self.tasks else 1.0
+
+    def result(self):
+        """All results by task name, once done. Re-raises a task's error."""
+        self.thread.join()
+        if self.error is not None:
+            raise self.error
+        return self.results
@@ -1,620 +1,676 @@
-import os
-import sys
-import math
-import time
-import random
-import pygame
-
-# -----------------------------
-# Init
-# -----------------------------
-pygame.init()
-pygame.joystick.init()
-pygame.mixer.init()
-
-WIDTH, HEIGHT = 1200, 760
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Controller Triangle Shooter")
-
-# Require a controller
-if pygame.joystick.get_count() == 0:
-    print("No controller connected!")
-    sys.exit()
-joystick = pygame.joystick.Joystick(0)
-joystick.init()
-
-# Fonts
-font = pygame.font.SysFont(None, 48)
-title_font = pygame.font.SysFont(None, 56)
-small_font = pygame.font.SysFont(None, 36)
-
-clock = pygame.time.Clock()
-
-# -----------------------------
-# Game State
-# -----------------------------
-tri_x, tri_y = WIDTH // 2, HEIGHT // 2
-tri_size = 60
-tri_speed = 5
-tri_color = (100, 200, 255)
-triangle_angle = 0
-
-paused = False
-viewing_podium = False
-death_screen = False
-selected_option = 0
-options = ["Resume Game", "Volume", "Podium", "Quit Game"]
-death_options = ["Respawn", "Quit Game"]
-volume = 0.5
-
-prev_button_start = False
-prev_button_a = False
-prev_button_rb = False
-prev_hat_y = 0
-
-projectiles = []
-enemies = []
-
-# Healing pickups (drop from killed enemies)
-heal_pickups = []
-heal_pickup_duration = 10.0  # seconds
-heal_pickup_radius = 15
-heal_pickup_heal_amount = 20
-heal_drop_chance = 0.30
-
-# Ammo & reload
-max_bullets = 12
-current_bullets = max_bullets
-reloading = False
-reload_start_time = None
-reload_duration = 0.94
-
-# Hold-to-heal (player ability)
-healing = False
-heal_start_time = None
-heal_duration = 5.0
-heal_amount = 20
-
-# Health
-health = 100
-max_health = 100
-
-# Timer / score
-start_time = time.time()
-total_paused_time = 0.0
-pause_start_time = None
-minutes_scored = 0  # survival bonus tracker
-score = 0
-
-# Audio
-try:
-    pew_sound = pygame.mixer.Sound("pew.wav")
-    pew_sound.set_volume(volume)
-except pygame.error:
-    pew_sound = None
-
-# Podium persistence
-PODIUM_FILE = "podium.txt"
-MAX_PODIUM_ENTRIES = 3
-
-def load_podium():
-    if not os.path.exists(PODIUM_FILE):
-        return []
-    podium = []
-    with open(PODIUM_FILE, "r") as f:
-        for line in f:
-            parts = line.strip().split(",")
-            if len(parts) == 2:
-                try:
-                    s = int(parts[0])
-                    t = float(parts[1])
-                    podium.append((s, t))
-                except ValueError:
-                    pass
-    # Sort by score desc, then time asc (optional tweak)
-    podium.sort(key=lambda x: (-x[0], x[1]))
-    return podium[:MAX_PODIUM_ENTRIES]
-
-def update_podium(new_score, elapsed_time):
-    podium = load_podium()
-    podium.append((new_score, elapsed_time))
-    # Sort and trim
-    podium.sort(key=lambda x: (-x[0], x[1]))
-    podium = podium[:MAX_PODIUM_ENTRIES]
-    with open(PODIUM_FILE, "w") as f:
-        for s, t in podium:
-            f.write(f"{s},{t:.3f}\n")
-
-# -----------------------------
-# Drawing & Spawn Helpers
-# -----------------------------
-def draw_attached_triangle(surface, x, y, size, angle, color):
-    cx, cy = x + size // 2, y + size // 2
-    length = size * 0.6
-    width = size * 0.4
-    triangle = [(0, -length), (-width, width), (width, width)]
-    rad = math.radians(angle)
-    rotated = []
-    for px, py in triangle:
-        rx = px * math.cos(rad) - py * math.sin(rad)
-        ry = px * math.sin(rad) + py * math.cos(rad)
-        rotated.append((cx + rx, cy + ry))
-    pygame.draw.polygon(surface, color, rotated)
-
-def shoot_projectile(x, y, angle):
-    rad = math.radians(angle - 90)
-    dx = math.cos(rad)
-    dy = math.sin(rad)
-    return {
-        'x': x + tri_size // 2,
-        'y': y + tri_size // 2,
-        'dx': dx * 10,
-        'dy': dy * 10,
-        'size': 12,
-        'alive': True
-    }
-
-def spawn_enemy():
-    # (color, speed, damage, size_display) — size is overwritten to 40 later
-    types = [
-        ((255, 255, 255), 2, 5, 20),   # White
-        ((0, 255, 255),   4, 10, 20),  # Blue
-        ((255, 0, 0),     7, 15, 24),  # Red
-    ]
-    choice = random.choices(types, weights=[0.6, 0.3, 0.1])[0]
-    color, speed, damage, size = choice
-    edge = random.choice(['top', 'bottom', 'left', 'right'])
-    size = 40
-    if edge == 'top':
-        x = random.randint(0, WIDTH)
-        y = -size
-    elif edge == 'bottom':
-        x = random.randint(0, WIDTH)
-        y = HEIGHT + size
-    elif edge == 'left':
-        x = -size
-        y = random.randint(0, HEIGHT)
-    else:
-        x = WIDTH + size
-        y = random.randint(0, HEIGHT)
-    return {'x': x, 'y': y, 'color': color, 'speed': speed, 'damage': damage, 'size': size, 'alive': True}
-
-
-
-spawn_timer = 0
-spawn_interval = 75
-
-running = True
-while running:
-    screen.fill((30, 30, 30))
-
-    # ------------- Events -------------
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            # Save score on window close
-            # Compute final elapsed_time safely
-            if paused or viewing_podium:
-                if pause_start_time is not None:
-                    effective_elapsed_time = pause_start_time - start_time - total_paused_time
-                else:
-                    effective_elapsed_time = time.time() - start_time - total_paused_time
-            else:
-                effective_elapsed_time = time.time() - start_time - total_paused_time
-            update_podium(score, effective_elapsed_time)
-            running = False
-
-    # Start button toggles pause (not in death screen, not in podium)
-    button_start = joystick.get_button(7)
-    if button_start and not prev_button_start:
-        if death_screen:
-            pass
-        else:
-            if not paused and not viewing_podium:
-                paused = True
-                pause_start_time = time.time()
-            elif paused and not viewing_podium:
-                paused = False
-                if pause_start_time is not None:
-                    total_paused_time += time.time() - pause_start_time
-                    pause_start_time = None
-        pygame.time.wait(150)
-    prev_button_start = button_start
-
-    # ------------- Death Screen -------------
-    if death_screen:
-        menu_width, menu_height = 500, 240
-        menu_x = WIDTH // 2 - menu_width // 2
-        menu_y = HEIGHT // 2 - menu_height // 2
-        menu_surface = pygame.Surface((menu_width, menu_height), pygame.SRCALPHA)
-        menu_surface.fill((80, 0, 0, 220))
-        screen.blit(menu_surface, (menu_x, menu_y))
-
-        title_text = title_font.render("You Died", True, (255, 255, 255))
-        screen.blit(title_text, (WIDTH // 2 - title_text.get_width() // 2, menu_y + 20))
-
-        for i, text in enumerate(death_options):
-            color = (255, 255, 255) if i == selected_option else (180, 180, 180)
-            option_text = font.render(text, True, color)
-            text_x = WIDTH // 2 - option_text.get_width() // 2 + 20
-            text_y = menu_y + 90 + i * 50
-            screen.blit(option_text, (text_x, text_y))
-            if i == selected_option:
-                arrow_text = font.render("▶", True, (255, 255, 255))
-                screen.blit(arrow_text, (text_x - 40, text_y))
-
-        # Navigation
-        hat_y = joystick.get_hat(0)[1]
-        if hat_y == 1 and prev_hat_y != 1:
-            selected_option = (selected_option - 1) % len(death_options)
-            pygame.time.wait(150)
-        elif hat_y == -1 and prev_hat_y != -1:
-            selected_option = (selected_option + 1) % len(death_options)
-            pygame.time.wait(150)
-        prev_hat_y = hat_y
-
-        # Select
-        if joystick.get_button(0) and not prev_button_a:
-            if death_options[selected_option] == "Respawn":
-                # Reset core state
-                health = 100
-                current_bullets = max_bullets
-                projectiles = []
-                enemies = []
-                heal_pickups = []
-                tri_x, tri_y = WIDTH // 2, HEIGHT // 2
-                # Reset timer & score
-                score = 0
-                start_time = time.time()
-                total_paused_time = 0.0
-                pause_start_time = None
-                minutes_scored = 0
-                death_screen = False
-            else:
-                # Save last run to podium before quitting
-                # Compute elapsed safely
-                if pause_start_time is not None:
-                    elapsed_time = pause_start_time - start_time - total_paused_time
-                else:
-                    elapsed_time = time.time() - start_time - total_paused_time
-                update_podium(score, elapsed_time)
-                pygame.quit()
-                sys.exit()
-        prev_button_a = joystick.get_button(0)
-
-    # ------------- Pause Menu -------------
-    elif paused:
-        menu_width, menu_height = 600, 360  # bigger box
-        menu_x = WIDTH // 2 - menu_width // 2
-        menu_y = HEIGHT // 2 - menu_height // 2
-        menu_surface = pygame.Surface((menu_width, menu_height), pygame.SRCALPHA)
-        menu_surface.fill((50, 50, 50, 200))
-        screen.blit(menu_surface, (menu_x, menu_y))
-
-        title_text = title_font.render("Paused", True, (255, 255, 255))
-        screen.blit(title_text, (WIDTH // 2 - title_text.get_width() // 2, menu_y + 20))
-
-        for i, text in enumerate(options):
-            display_text = text
-            if text == "Volume":
-                display_text += f" [{int(volume * 100)}%]"
-            color = (255, 255, 255) if i == selected_option else (180, 180, 180)
-            option_text = font.render(display_text, True, color)
-            text_x = WIDTH // 2 - option_text.get_width() // 2 + 20
-            text_y = menu_y + 90 + i * 60
-            screen.blit(option_text, (text_x, text_y))
-            if i == selected_option:
-                arrow_text = font.render("▶", True, (255, 255, 255))
-                screen.blit(arrow_text, (text_x - 40, text_y))
-
-        # Navigate
-        hat_y = joystick.get_hat(0)[1]
-        if hat_y == 1 and prev_hat_y != 1:
-            selected_option = (selected_option - 1) % len(options)
-            pygame.time.wait(150)
-        elif hat_y == -1 and prev_hat_y != -1:
-            selected_option = (selected_option + 1) % len(options)
-            pygame.time.wait(150)
-        prev_hat_y = hat_y
-
-        # Adjust volume when "Volume" highlighted (LB/RB)
-        if selected_option == 1:
-            if joystick.get_button(4):  # LB
-                volume = max(0, volume - 0.05)
-                if pew_sound:
-                    pew_sound.set_volume(volume)
-                pygame.time.wait(120)
-            if joystick.get_button(5):  # RB
-                volume = min(1.0, volume + 0.05)
-                if pew_sound:
-                    pew_sound.set_volume(volume)
-                pygame.time.wait(120)
-
-        # Select option
-        if joystick.get_button(0) and not prev_button_a:  # A
-            choice = options[selected_option]
-            if choice == "Resume Game":
-                paused = False
-                if pause_start_time is not None:
-                    total_paused_time += time.time() - pause_start_time
-                    pause_start_time = None
-            elif choice == "Quit Game":
-                # Save score on quit
-                if pause_start_time is not None:
-                    elapsed_time = pause_start_time - start_time - total_paused_time
-                else:
-                    elapsed_time = time.time() - start_time - total_paused_time
-                update_podium(score, elapsed_time)
-                pygame.quit()
-                sys.exit()
-            elif choice == "Podium":
-                viewing_podium = True
-                # ensure timer frozen
-                if pause_start_time is None:
-                    pause_start_time = time.time()
-            # Volume is handled above
-        prev_button_a = joystick.get_button(0)
-
-    # ------------- Podium View -------------
-    elif viewing_podium:
-        screen.fill((20, 20, 20))
-        podium_title = title_font.render("Top 3 Scores", True, (255, 255, 255))
-        screen.blit(podium_title, (WIDTH // 2 - podium_title.get_width() // 2, 100))
-
-        podium = load_podium()
-        for i, (s, t) in enumerate(podium):
-            mins = int(t // 60)
-            secs = int(t % 60)
-            ms = int((t - int(t)) * 1000)
-            h = int(mins // 60)
-            m = mins % 60
-            time_str = f"{h:02}:{m:02}:{secs:02}:{ms:03}"
-            pps = (s / t) if t > 0 else 0.0
-            line = small_font.render(f"{i+1}. Score: {s}  Time: {time_str}  PPS: {pps:.2f}", True, (255, 255, 255))
-            screen.blit(line, (WIDTH // 2 - line.get_width() // 2, 180 + i * 50))
-
-        info_text = small_font.render("Press B to return", True, (150, 150, 150))
-        screen.blit(info_text, (WIDTH // 2 - info_text.get_width() // 2, 400))
-
-        # B to go back
-        if joystick.get_button(1):  # B
-            viewing_podium = False
-            if pause_start_time is not None:
-                total_paused_time += time.time() - pause_start_time
-                pause_start_time = None
-            pygame.time.wait(200)
-
-    # ------------- Gameplay -------------
-    else:
-        # Movement (left stick)
-        axis_x = joystick.get_axis(0)
-        axis_y = joystick.get_axis(1)
-        deadzone = 0.1
-        if abs(axis_x) < deadzone: axis_x = 0
-        if abs(axis_y) < deadzone: axis_y = 0
-
-        if not healing:
-            tri_x += axis_x * tri_speed
-            tri_y += axis_y * tri_speed
-        tri_x = max(0, min(WIDTH - tri_size, tri_x))
-        tri_y = max(0, min(HEIGHT - tri_size, tri_y))
-
-        # Aim (right stick)
-        right_x = joystick.get_axis(2)
-        right_y = joystick.get_axis(3)
-        if abs(right_x) > 0.2 or abs(right_y) > 0.2:
-            angle_rad = math.atan2(right_y, right_x)
-            triangle_angle = math.degrees(angle_rad) + 90
-
-        # Hold A to self-heal
-        if joystick.get_button(0):
-            if not healing:
-                healing = True
-                heal_start_time = time.time()
-        else:
-            if healing and heal_start_time:
-                held_time = time.time() - heal_start_time
-                if held_time >= heal_duration:
-                    health = min(max_health, health + heal_amount)
-                healing = False
-                heal_start_time = None
-
-        # Hold B to reload
-        if joystick.get_button(1):
-            if not reloading and not healing:
-                reloading = True
-                reload_start_time = time.time()
-        else:
-            if reloading and reload_start_time:
-                held_time = time.time() - reload_start_time
-                if held_time >= reload_duration:
-                    current_bullets = max_bullets
-                reloading = False
-                reload_start_time = None
-
-        # RB shoot
-        button_rb = joystick.get_button(5)
-        if button_rb and not prev_button_rb and current_bullets > 0 and not healing:
-            projectile = shoot_projectile(tri_x, tri_y, triangle_angle)
-            projectiles.append(projectile)
-            if pew_sound:
-                pew_sound.play()
-            current_bullets -= 1
-        prev_button_rb = button_rb
-
-        # Color feedback
-        if healing:
-            tri_color = (0, 255, 0)
-        elif reloading:
-            tri_color = (255, 0, 0)
-        elif joystick.get_button(3):
-            tri_color = (255, 255, 0)
-        elif joystick.get_button(2):
-            tri_color = (0, 0, 255)
-        else:
-            tri_color = (100, 200, 255)
-
-        # Draw player
-        draw_attached_triangle(screen, tri_x, tri_y, tri_size, triangle_angle, tri_color)
-
-        # Projectiles update/draw
-        for proj in projectiles:
-            proj['x'] += proj['dx']
-            proj['y'] += proj['dy']
-            pygame.draw.rect(screen, (255, 255, 255), (proj['x'], proj['y'], proj['size'], proj['size']))
-        projectiles = [p for p in projectiles if 0 <= p['x'] <= WIDTH and 0 <= p['y'] <= HEIGHT and p['alive']]
-
-        # Spawn enemies
-        spawn_timer += 1
-        if spawn_timer >= spawn_interval:
-            enemies.append(spawn_enemy())
-            spawn_timer = 0
-
-        # Enemies move toward player
-        for enemy in enemies:
-            dx = tri_x + tri_size // 2 - enemy['x']
-            dy = tri_y + tri_size // 2 - enemy['y']
-            dist = math.hypot(dx, dy)
-            if dist != 0:
-                dx /= dist
-                dy /= dist
-            enemy['x'] += dx * enemy['speed']
-            enemy['y'] += dy * enemy['speed']
-            pygame.draw.rect(screen, enemy['color'], (enemy['x'], enemy['y'], enemy['size'], enemy['size']))
-
-        # Projectile vs enemy collisions + drop heal + scoring
-        for enemy in enemies:
-            ex, ey, esize = enemy['x'], enemy['y'], enemy['size']
-            for proj in projectiles:
-                if (ex < proj['x'] < ex + esize and ey < proj['y'] < ey + esize):
-                    enemy['alive'] = False
-                    proj['alive'] = False
-
-                    # scoring by enemy color
-                    if enemy['color'] == (255, 255, 255):
-                        score += 500
-                    elif enemy['color'] == (0, 255, 255):
-                        score += 1500
-                    elif enemy['color'] == (255, 0, 0):
-                        score += 3000
-
-                    # heal pickup drop chance
-                    if random.random() < heal_drop_chance:
-                        heal_pickups.append({
-                            'x': ex + esize / 2,
-                            'y': ey + esize / 2,
-                            'spawn_time': time.time(),
-                            'radius': heal_pickup_radius,
-                            'alive': True
-                        })
-
-        enemies = [e for e in enemies if e['alive']]
-
-        # Enemy contact damage
-        if not healing:
-            for enemy in enemies:
-                dx = (tri_x + tri_size // 2) - (enemy['x'] + enemy['size'] / 2)
-                dy = (tri_y + tri_size // 2) - (enemy['y'] + enemy['size'] / 2)
-                distance = math.hypot(dx, dy)
-                if distance < (tri_size // 2 + enemy['size'] // 2):
-                    health -= enemy['damage']
-                    enemy['alive'] = False
-
-        # Heal pickups: expire, draw, collect
-        now = time.time()
-        for hp in heal_pickups:
-            if now - hp['spawn_time'] > heal_pickup_duration:
-                hp['alive'] = False
-        heal_pickups = [hp for hp in heal_pickups if hp['alive']]
-
-        for hp in heal_pickups:
-            pygame.draw.circle(screen, (0, 255, 0), (int(hp['x']), int(hp['y'])), hp['radius'])
-            dx = (tri_x + tri_size / 2) - hp['x']
-            dy = (tri_y + tri_size / 2) - hp['y']
-            dist = math.hypot(dx, dy)
-            if dist < (tri_size / 2 + hp['radius']):
-                health = min(max_health, health + heal_pickup_heal_amount)
-                hp['alive'] = False
-        heal_pickups = [hp for hp in heal_pickups if hp['alive']]
-
-        # Death check
-        if health <= 0:
-            death_screen = True
-            # Save score on death
-            # Compute elapsed safely
-            elapsed_time = time.time() - start_time - total_paused_time
-            update_podium(score, elapsed_time)
-
-    # --------- UI common (timer/score/health/ammo/progress arcs) ----------
-    # Compute elapsed time (freeze while paused or in podium)
-    if paused or viewing_podium:
-        if pause_start_time is not None:
-            effective_elapsed_time = pause_start_time - start_time - total_paused_time
-        else:
-            effective_elapsed_time = time.time() - start_time - total_paused_time
-    else:
-        effective_elapsed_time = time.time() - start_time - total_paused_time
-    elapsed_time = max(0.0, effective_elapsed_time)
-
-    # survival bonus: award once per new minute
-    new_minutes = int(elapsed_time // 60)
-    if new_minutes > minutes_scored:
-        score += (new_minutes - minutes_scored) * 2000
-        minutes_scored = new_minutes
-
-    # Timer display
-    total_ms = int(elapsed_time * 1000)
-    hours = (total_ms // (3600 * 1000)) % 100  # 2-digit hours
-    minutes = (total_ms // (60 * 1000)) % 60
-    seconds = (total_ms // 1000) % 60
-    milliseconds = total_ms % 1000
-
-    time_text = small_font.render(f"Time: {hours:02}:{minutes:02}:{seconds:02}:{milliseconds:03}", True, (255, 255, 255))
-    time_x = WIDTH // 2 - time_text.get_width() // 2
-    screen.blit(time_text, (time_x, 10))
-
-    # Score display (below timer)
-    score_text = small_font.render(f"Score: {score}", True, (255, 255, 255))
-    screen.blit(score_text, (WIDTH // 2 - score_text.get_width() // 2, 50))
-
-    # Ammo text
-    bullet_text = small_font.render(f"Bullets: {current_bullets} / {max_bullets}", True, (255, 255, 255))
-    screen.blit(bullet_text, (20, HEIGHT - 40))
-
-    # Health bar
-    health_bar_width = 200
-    health_ratio = max(0, min(1, health / max_health))
-    pygame.draw.rect(screen, (255, 0, 0), (20, HEIGHT - 70, health_bar_width, 20))
-    pygame.draw.rect(screen, (0, 255, 0), (20, HEIGHT - 70, int(health_bar_width * health_ratio), 20))
-
-    # Reload/Heal arcs
-    if reloading and reload_start_time:
-        elapsed = time.time() - reload_start_time
-        progress = min(elapsed / reload_duration, 1.0)
-        arc_radius = int(tri_size * 0.7)
-        arc_rect = pygame.Rect(
-            int(tri_x + tri_size // 2 - arc_radius),
-            int(tri_y + tri_size // 2 - arc_radius),
-            arc_radius * 2, arc_radius * 2
-        )
-        start_angle = -math.pi / 2
-        end_angle = start_angle + progress * 2 * math.pi
-        pygame.draw.arc(screen, (255, 0, 0), arc_rect, start_angle, end_angle, 4)
-
-    if healing and heal_start_time:
-        elapsed = time.time() - heal_start_time
-        progress = min(elapsed / heal_duration, 1.0)
-        arc_radius = int(tri_size * 0.7)
-        arc_rect = pygame.Rect(
-            int(tri_x + tri_size // 2 - arc_radius),
-            int(tri_y + tri_size // 2 - arc_radius),
-            arc_radius * 2, arc_radius * 2
-        )
-        start_angle = -math.pi / 2
-        end_angle = start_angle + progress * 2 * math.pi
-        pygame.draw.arc(screen, (0, 255, 0), arc_rect, start_angle, end_angle, 4)
-
-    pygame.display.flip()
-    clock.tick(60)
-
-pygame.quit()
-sys.exit()
+import time
+STARTED = time.perf_counter()   # before the heavy imports, for --startup-time
+
+import gc
+import os
+import sys
+import math
+import random
+import argparse
+import pygame
+
+import engine
+from engine import WIDTH, HEIGHT
+from textcache import TextCache, GlyphAtlas
+from render import make_renderer
+from timestep import FixedTimestep, GameClock
+from scenes import Scene, SceneStack
+from profiler import Profiler, NULL_PROFILER
+from replay import Recorder, Recording, verify
+from podium import PodiumStore
+from waves import load_waves
+from audio import make_audio
+from sprites import SpriteSheet, SpriteBatch
+from controls import Controls
+from bots import BOTS, Observation, make_bot
+from loading import Loader
+from telemetry import FORMATS, Telemetry, NullTelemetry
+from camera import Camera
+from leaderboard import Leaderboard, NullLeaderboard
+from capture import FORMATS as CAPTURE_FORMATS, Capture, NullCapture, summary as capture_summary
+import snapshot
+
+parser = argparse.ArgumentParser(description="Controller Triangle Shooter")
+parser.add_argument('--cache-stats', action='store_true', help="print text cache hit rate on exit")
+parser.add_argument('--dirty-rects', action='store_true',
+                    help="only push changed screen regions to the display (for low-power hardware)")
+parser.add_argument('--tick-rate', type=int, default=engine.TICK_RATE, help="simulation ticks per second")
+parser.add_argument('--fps', type=int, default=60, help="render frame cap (0 = uncapped)")
+parser.add_argument('--profile', action='store_true', help="show per-phase frame timings on screen")
+parser.add_argument('--profile-out', help="write per-frame phase timings to a .csv or .jsonl file")
+parser.add_argument('--seed', type=int, help="RNG seed for the run (random by default)")
+parser.add_argument('--record', help="record the run's inputs to this file")
+parser.add_argument('--replay', help="play back a recorded run instead of reading the controller")
+parser.add_argument('--waves', help="spawn enemies from a wave spec JSON file (e.g. wavesets/ramp.json)")
+parser.add_argument('--audio-buffer', type=int, default=512,
+                    help="mixer buffer in samples; smaller is lower latency (default 512)")
+parser.add_argument('--no-audio', action='store_true', help="run without opening an audio device")
+parser.add_argument('--bot', choices=sorted(BOTS), help="let a scripted bot play (menus still use the controller)")
+parser.add_argument('--players', type=int, choices=range(1, 5), default=1,
+                    help="local co-op players, one per controller (default 1)")
+parser.add_argument('--keyboard', action='store_true',
+                    help="in co-op, keyboard and mouse play player 1 on their own and pads start at player 2")
+parser.add_argument('--world', type=engine.parse_size, metavar='WxH',
+                    help="play in a bigger, scrolling world, e.g. 20000x20000 (default: the screen)")
+parser.add_argument('--telemetry', metavar='DIR', help="log per-run analytics to rotating files in DIR")
+parser.add_argument('--telemetry-format', choices=FORMATS, default='jsonl',
+                    help="telemetry file format (default jsonl, gzip-compressed)")
+parser.add_argument('--leaderboard', metavar='URL',
+                    help="also report finished runs to a leaderboard service (see leaderboard.py)")
+parser.add_argument('--cabinet', help="name this machine reports runs under (default: its hostname)")
+parser.add_argument('--capture', metavar='PATH',
+                    help="record what the screen shows to PATH: a directory of PNGs, or a .y4m / .rgb video")
+parser.add_argument('--capture-format', choices=CAPTURE_FORMATS, help="default: from the extension of PATH")
+parser.add_argument('--rewind', type=float, metavar='SECONDS',
+                    help="keep the last SECONDS of play; hold Q / LB to rewind through them")
+parser.add_argument('--save', metavar='FILE',
+                    help="save the run to FILE every few seconds and on quit; carry on with --resume FILE")
+parser.add_argument('--resume', metavar='FILE',
+                    help="continue a run saved with --save (its players, waves and world size are kept)")
+parser.add_argument('--startup-time', action='store_true',
+                    help="print time to first frame and to the first gameplay frame, then exit")
+args = parser.parse_args()
+if args.seed is not None and not -2 ** 63 <= args.seed < 2 ** 63:
+    parser.error("--seed must fit in a signed 64-bit integer")
+if (args.rewind or args.save or args.resume) and (args.record or args.replay):
+    parser.error("--rewind, --save and --resume can't be combined with --record or --replay")
+
+# -----------------------------
+# Init
+# -----------------------------
+# Fast path to a window: only the pygame subsystems the game uses (no
+# pygame.init()), then a loading screen while fonts, sprites, sounds and
+# the podium load on a worker thread.
+pygame.display.init()
+pygame.joystick.init()
+pygame.font.init()
+
+screen = pygame.display.set_mode((WIDTH, HEIGHT))
+pygame.display.set_caption("Controller Triangle Shooter")
+
+# Screen capture (see capture.py): one copy of the screen per frame, handed
+# to an encoder process. Started before any of the game's threads exist.
+capture = NullCapture()
+if args.capture:
+    capture = Capture(args.capture, screen, args.capture_format, fps=args.fps or 60)
+
+def draw_loading(progress):
+    screen.fill((30, 30, 30))
+    bar = pygame.Rect(WIDTH // 2 - 200, HEIGHT // 2 - 10, 400, 20)
+    pygame.draw.rect(screen, (70, 70, 70), bar)
+    pygame.draw.rect(screen, (100, 200, 255), (bar.x, bar.y, int(bar.width * progress), bar.height))
+    pygame.display.flip()
+
+# Put something on screen before anything else is set up
+draw_loading(0.0)
+first_frame_time = time.perf_counter() - STARTED
+
+# Pads are picked up as they are plugged in; keyboard and mouse always work
+controls = Controls(players=args.players, keyboard_player=args.keyboard)
+if not controls.pads:
+    print("No controller connected, using keyboard and mouse (plug one in at any time).")
+
+# Rendered text is cached; the timer digits come from a glyph atlas (loaded below)
+text_cache = TextCache()
+
+# Menu backgrounds never change, build them once
+death_menu_surface = pygame.Surface((500, 240), pygame.SRCALPHA)
+death_menu_surface.fill((80, 0, 0, 220))
+pause_menu_surface = pygame.Surface((600, 360), pygame.SRCALPHA)
+pause_menu_surface.fill((50, 50, 50, 200))
+
+clock = pygame.time.Clock()
+renderer = make_renderer(args.dirty_rects)
+
+# One game clock: it only runs while gameplay is the top scene, so the
+# fixed timestep sees no time pass in menus
+game_clock = GameClock()
+
+# Input recording / playback. A recording covers the first run, from
+# start to death or quit.
+recorder = None
+replay = None
+replay_inputs = None
+if args.replay:
+    replay = Recording(args.replay)
+    replay_inputs = replay.inputs()
+    world = replay.new_world()
+    timestep = FixedTimestep(replay.tick_rate, clock=game_clock.now)
+elif args.resume:
+    world = snapshot.load(args.resume)
+    timestep = FixedTimestep(args.tick_rate, clock=game_clock.now)
+else:
+    seed = args.seed if args.seed is not None else random.randrange(2 ** 32)
+    overrides = {}
+    if args.waves:
+        overrides['waves'] = load_waves(args.waves)
+    if args.players > 1:
+        overrides['players'] = args.players
+    if args.world:
+        overrides['world_width'], overrides['world_height'] = args.world
+    world = engine.World(engine.make_config(**overrides) if overrides else None, seed=seed)
+    timestep = FixedTimestep(args.tick_rate, clock=game_clock.now)
+    if args.record:
+        recorder = Recorder(args.record, seed, args.tick_rate, world.config)
+
+# Which part of the world is on screen (always all of it unless --world)
+camera = Camera()
+
+# Rewind buffer and save file (see snapshot.py). A save is written every
+# SAVE_INTERVAL seconds of play, so a crash loses at most that much, and
+# removed once the run ends on the podium.
+SAVE_INTERVAL = 5.0
+save_path = args.save or args.resume
+save_ticks = round(SAVE_INTERVAL * timestep.tick_rate)
+rewind_ring = None
+if args.rewind:
+    rewind_ring = snapshot.SnapshotRing(world, args.rewind, timestep.tick_rate)
+    rewind_ring.push(world)
+
+# Scripted players in place of the sticks and buttons, if asked for
+players = range(len(world.players))
+player_bots = [make_bot(args.bot, world.seed + p) for p in players] if args.bot else None
+
+# Per-run analytics, written from a background thread. Like the podium,
+# replays are left out.
+telemetry = NullTelemetry()
+if args.telemetry and replay is None:
+    telemetry = Telemetry(args.telemetry, args.telemetry_format)
+    telemetry.start_run(world, bot=args.bot, waves=args.waves)
+
+# Per-phase frame timings (engine phases are lapped inside engine.step;
+# 'record' is the rewind ring, saves, telemetry and sounds after each tick)
+PROFILE_PHASES = ['events', 'input'] + engine.PHASES + ['record', 'render', 'hud', 'flip', 'capture']
+profiler = NULL_PROFILER
+if args.profile or args.profile_out:
+    profiler = Profiler(PROFILE_PHASES, engine.COUNTERS, export=args.profile_out)
+profile_overlay = []
+
+# -----------------------------
+# Game State
+# -----------------------------
+# Everything the rules touch lives in the engine World (created above);
+# this file only reads the controller, steps the world and draws it.
+world.profiler = profiler
+
+volume = 0.5
+
+# Engine events that make a sound
+EVENT_SOUNDS = {'shot': 'pew'}
+
+# Podium persistence (append-only run journal, top runs kept in memory)
+PODIUM_FILE = "podium.txt"
+MAX_PODIUM_ENTRIES = 3
+
+# Runs waiting for the remote leaderboard, kept across restarts
+LEADERBOARD_QUEUE = "leaderboard-queue.jsonl"
+GLOBAL_PODIUM_ENTRIES = 5
+
+# -----------------------------
+# Asset loading
+# -----------------------------
+def load_fonts():
+    # Font(None) is the default font SysFont(None) resolves to, without
+    # scanning every font installed on the system first
+    fonts = [pygame.font.Font(None, size) for size in (48, 56, 36)]
+    glyphs = GlyphAtlas(fonts[2], (255, 255, 255))
+    return fonts, glyphs
+
+def load_audio():
+    sound = make_audio(not args.no_audio, buffer=args.audio_buffer)
+    sound.load('pew', "pew.wav", 'sfx')
+    sound.set_volume(volume)
+    return sound
+
+def show_loading():
+    """Loading screen until every asset is in."""
+    while not loader.done:
+        for event in pygame.event.get():
+            controls.handle(event)
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                sys.exit()
+        draw_loading(loader.progress)
+        clock.tick(60)
+
+loader = Loader()
+loader.add('fonts', load_fonts)
+# Every entity shape pre-rendered once; the world is one blits() call per frame
+loader.add('sprites', lambda: SpriteBatch(SpriteSheet(world.config)))
+loader.add('audio', load_audio)
+loader.add('podium', PodiumStore, PODIUM_FILE, top_n=MAX_PODIUM_ENTRIES)
+loader.start()
+show_loading()
+
+assets = loader.result()
+(font, title_font, small_font), timer_glyphs = assets['fonts']
+sprite_batch = assets['sprites']
+audio = assets['audio']
+podium_store = assets['podium']
+
+# Remote leaderboard: runs are sent and the global top fetched from a
+# background thread. Replays are left out here too.
+leaderboard = NullLeaderboard()
+if args.leaderboard and replay is None:
+    leaderboard = Leaderboard(args.leaderboard, LEADERBOARD_QUEUE, cabinet=args.cabinet,
+                              top_n=GLOBAL_PODIUM_ENTRIES)
+
+controls.flush()
+
+# Fonts, sprites and menu surfaces live for the whole session. Move them
+# out of the collector's generations so later collections don't re-scan them.
+gc.collect()
+gc.freeze()
+
+# -----------------------------
+# Input & Drawing Helpers
+# -----------------------------
+def read_inputs():
+    """One input snapshot for the next sim tick."""
+    if len(players) == 1:
+        if player_bots is not None:
+            return player_bots[0].act(Observation(world))
+        half = world.tri_size / 2
+        return controls.snapshot(aim_origin=camera.to_screen(world.tri_x + half, world.tri_y + half))
+    col = world.players.columns
+    half = world.tri_size / 2
+    if player_bots is not None:
+        return [player_bots[p].act(Observation(world, p)) for p in players]
+    return [controls.snapshot(aim_origin=camera.to_screen(col['x'][p] + half, col['y'][p] + half), player=p)
+            for p in players]
+
+def draw_world(surface, world, alpha=1.0):
+    camera.follow(world, alpha)
+    renderer.add_all(sprite_batch.draw(surface, world, alpha, camera if world.large else None))
+
+def draw_progress_arc(surface, world, p, start_time, duration, color):
+    progress = min((world.elapsed - start_time) / duration, 1.0)
+    arc_radius = int(world.tri_size * 0.7)
+    col = world.players.columns
+    arc_rect = pygame.Rect(
+        int(col['x'][p] + world.tri_size // 2 - arc_radius) - camera.x,
+        int(col['y'][p] + world.tri_size // 2 - arc_radius) - camera.y,
+        arc_radius * 2, arc_radius * 2
+    )
+    start_angle = -math.pi / 2
+    end_angle = start_angle + progress * 2 * math.pi
+    return pygame.draw.arc(surface, color, arc_rect, start_angle, end_angle, 4)
+
+def draw_profile_overlay(surface):
+    # Re-render the numbers twice a second; in between blit the same surfaces
+    global profile_overlay
+    if profiler.frames % 30 == 0 or not profile_overlay:
+        profile_overlay = [small_font.render(line, True, (255, 255, 0)) for line in profiler.summary_lines()]
+    x = WIDTH - max(line.get_width() for line in profile_overlay) - 10
+    y = 90
+    for line in profile_overlay:
+        renderer.add(surface.blit(line, (x, y)))
+        y += line.get_height()
+
+def draw_hud(surface):
+    """Timer, score, per-player ammo/health and the reload/heal arcs."""
+    # Timer display
+    total_ms = int(world.elapsed * 1000)
+    hours = (total_ms // (3600 * 1000)) % 100  # 2-digit hours
+    minutes = (total_ms // (60 * 1000)) % 60
+    seconds = (total_ms // 1000) % 60
+    milliseconds = total_ms % 1000
+
+    time_label = text_cache.render(small_font, "Time: ", (255, 255, 255))
+    time_digits = f"{hours:02}:{minutes:02}:{seconds:02}:{milliseconds:03}"
+    time_width = time_label.get_width() + timer_glyphs.width(time_digits)
+    time_x = WIDTH // 2 - time_width // 2
+    surface.blit(time_label, (time_x, 10))
+    timer_glyphs.blit(surface, time_digits, (time_x + time_label.get_width(), 10))
+    renderer.add(pygame.Rect(time_x, 10, time_width, timer_glyphs.height))
+
+    # Score display (below timer)
+    score_text = text_cache.render(small_font, f"Score: {world.score}", (255, 255, 255))
+    renderer.add(surface.blit(score_text, (WIDTH // 2 - score_text.get_width() // 2, 50)))
+
+    # Ammo and health per player, side by side along the bottom
+    col = world.players.columns
+    health_bar_width = 200
+    for p in players:
+        hud_x = 20 + p * (health_bar_width + 60)
+        label = f"P{p + 1} " if len(players) > 1 else ""
+        bullet_text = text_cache.render(small_font, f"{label}Bullets: {col['bullets'][p]} / {world.max_bullets}",
+                                        (255, 255, 255))
+        renderer.add(surface.blit(bullet_text, (hud_x, HEIGHT - 40)))
+
+        health_ratio = max(0, min(1, col['health'][p] / world.max_health))
+        renderer.add(pygame.draw.rect(surface, (255, 0, 0), (hud_x, HEIGHT - 70, health_bar_width, 20)))
+        pygame.draw.rect(surface, (0, 255, 0), (hud_x, HEIGHT - 70, int(health_bar_width * health_ratio), 20))
+
+        # Reload/Heal arcs
+        if not world.players.alive[p]:
+            continue
+        if col['reloading'][p]:
+            renderer.add(draw_progress_arc(surface, world, p, col['reload_start'][p],
+                                           world.config['reload_duration'], (255, 0, 0)))
+        if col['healing'][p]:
+            renderer.add(draw_progress_arc(surface, world, p, col['heal_start'][p],
+                                           world.config['heal_duration'], (0, 255, 0)))
+
+def save_run():
+    # Replays re-run an old game; they don't go on the podium
+    if replay is None:
+        podium_store.add(world.score, world.elapsed)
+        leaderboard.submit(world.score, world.elapsed, seed=world.seed, players=len(players))
+    telemetry.end_run(world)
+    stop_recording()
+    if save_path is not None and os.path.exists(save_path):
+        os.remove(save_path)   # nothing left to resume
+
+def leave_run():
+    """Quit a run still in progress: kept in the save file if there is
+    one (it goes on the podium when it ends), else scored now."""
+    if save_path is None:
+        save_run()
+        return
+    snapshot.save(world, save_path)
+    telemetry.end_run(world)
+
+def stop_recording():
+    global recorder
+    if recorder is not None:
+        recorder.close(world)
+        recorder = None
+
+def next_tick_inputs(inputs):
+    """Inputs for one sim tick: recorded, replayed, or straight from the controller."""
+    if recorder is not None:
+        return recorder.record(inputs)
+    if replay_inputs is not None:
+        tick_inputs = next(replay_inputs, None)
+        if tick_inputs is None:
+            finish_replay()
+        return tick_inputs
+    return inputs
+
+def finish_replay():
+    problems = verify(replay, world)
+    for problem in problems:
+        print(f"Replay MISMATCH {problem}")
+    print(f"Replay finished: score={world.score} time={world.elapsed:.3f}s"
+          + ("" if problems else " (matches recording)"))
+    shutdown()
+
+def shutdown():
+    stop_recording()
+    telemetry.close()
+    leaderboard.close()
+    if args.capture:
+        print(capture_summary(capture.close()))
+    if args.profile:
+        print("\n".join(profiler.summary_lines()))
+    profiler.close()
+    if args.cache_stats:
+        stats = text_cache.stats()
+        print(f"Text cache: {stats['hit_rate']:.1%} hit rate "
+              f"({stats['hits']} hits, {stats['misses']} misses, {stats['entries']} entries)")
+    pygame.quit()
+    sys.exit()
+
+def quit_game():
+    leave_run()
+    shutdown()
+
+
+
+# -----------------------------
+# Scenes
+# -----------------------------
+# Gameplay sits at the bottom of the stack; the pause menu, podium and
+# death screen are pushed over it and popped to go back.
+class Gameplay(Scene):
+    def enter(self):
+        game_clock.start()
+
+    def exit(self):
+        game_clock.stop()
+
+    def pause(self):
+        game_clock.stop()
+
+    def resume(self):
+        # Presses made in a menu don't carry into the game
+        controls.flush()
+        game_clock.start()
+
+    def update(self):
+        if controls.pressed('start'):
+            scenes.push(PauseMenu())
+            return
+        # Fixed-size ticks for however much game time passed, then draw
+        # blended between the last two ticks
+        ticks = timestep.advance()
+        profiler.lap('input')
+        if rewind_ring is not None and controls.held('rewind'):
+            # Back through the kept ticks at the speed they were played
+            if ticks:
+                rewind_ring.rewind(world, ticks)
+            return
+        for _ in range(ticks):
+            # Controller polling and bot decisions count as input, not as the engine's 'player' phase
+            inputs = next_tick_inputs(read_inputs())
+            profiler.lap('input')
+            engine.step(world, inputs, timestep.dt)
+            if rewind_ring is not None:
+                rewind_ring.push(world)
+            if save_path is not None and world.tick % save_ticks == 0 and not world.dead:
+                snapshot.save(world, save_path)
+            telemetry.record(world)
+            for event in world.events:
+                sound = EVENT_SOUNDS.get(event[0])
+                if sound is not None:
+                    audio.play(sound)
+            profiler.lap('record')
+
+            # Death check (the engine stops stepping once dead)
+            if world.dead:
+                save_run()
+                if replay is not None:
+                    finish_replay()
+                scenes.push(DeathScreen())
+                break
+
+    def draw(self, surface):
+        draw_world(surface, world, timestep.alpha)
+        profiler.lap('render')
+        draw_hud(surface)
+        if args.profile:
+            draw_profile_overlay(surface)
+        profiler.lap('hud')
+
+
+class Menu(Scene):
+    """Boxed list of options over the frozen game, navigated up/down."""
+    overlay = True
+    title = ""
+    options = []
+    box = None          # pre-filled translucent background surface
+    line_height = 50
+
+    def enter(self):
+        self.selected = 0
+
+    def static_key(self):
+        return (type(self).__name__, self.selected)
+
+    def label(self, option):
+        return option
+
+    def update(self):
+        if controls.repeated('up'):
+            self.selected = (self.selected - 1) % len(self.options)
+        elif controls.repeated('down'):
+            self.selected = (self.selected + 1) % len(self.options)
+        if controls.pressed('confirm'):
+            self.choose(self.options[self.selected])
+
+    def choose(self, option):
+        pass
+
+    def draw(self, surface):
+        menu_width, menu_height = self.box.get_size()
+        menu_x = WIDTH // 2 - menu_width // 2
+        menu_y = HEIGHT // 2 - menu_height // 2
+        surface.blit(self.box, (menu_x, menu_y))
+
+        title_text = text_cache.render(title_font, self.title, (255, 255, 255))
+        surface.blit(title_text, (WIDTH // 2 - title_text.get_width() // 2, menu_y + 20))
+
+        for i, option in enumerate(self.options):
+            color = (255, 255, 255) if i == self.selected else (180, 180, 180)
+            option_text = text_cache.render(font, self.label(option), color)
+            text_x = WIDTH // 2 - option_text.get_width() // 2 + 20
+            text_y = menu_y + 90 + i * self.line_height
+            surface.blit(option_text, (text_x, text_y))
+            if i == self.selected:
+                arrow_text = text_cache.render(font, "▶", (255, 255, 255))
+                surface.blit(arrow_text, (text_x - 40, text_y))
+
+
+class PauseMenu(Menu):
+    title = "Paused"
+    options = ["Resume Game", "Volume", "Podium", "Quit Game"]
+    box = pause_menu_surface
+    line_height = 60
+
+    def static_key(self):
+        return ('pause', self.selected, volume)
+
+    def label(self, option):
+        return f"{option} [{int(volume * 100)}%]" if option == "Volume" else option
+
+    def update(self):
+        global volume
+        # Start toggles pause
+        if controls.pressed('start'):
+            scenes.pop()
+            return
+        super().update()
+        # Adjust volume when "Volume" highlighted (LB/RB, held to repeat)
+        if self.options[self.selected] == "Volume":
+            if controls.repeated('volume_down'):
+                volume = max(0, volume - 0.05)
+                audio.set_volume(volume)
+            if controls.repeated('volume_up'):
+                volume = min(1.0, volume + 0.05)
+                audio.set_volume(volume)
+
+    def choose(self, option):
+        if option == "Resume Game":
+            scenes.pop()
+        elif option == "Podium":
+            scenes.push(PodiumView())
+        elif option == "Quit Game":
+            quit_game()
+        # Volume is handled in update()
+
+
+class DeathScreen(Menu):
+    title = "You Died"
+    options = ["Respawn", "Quit Game"]
+    box = death_menu_surface
+
+    def choose(self, option):
+        if option == "Respawn":
+            world.reset()
+            telemetry.start_run(world, bot=args.bot, waves=args.waves)
+            if rewind_ring is not None:
+                rewind_ring.clear()
+                rewind_ring.push(world)
+            scenes.pop()
+        else:
+            # Run was already saved to the podium on death
+            shutdown()
+
+
+def format_time(t):
+    mins = int(t // 60)
+    secs = int(t % 60)
+    ms = int((t - int(t)) * 1000)
+    h = int(mins // 60)
+    m = mins % 60
+    return f"{h:02}:{m:02}:{secs:02}:{ms:03}"
+
+
+class PodiumView(Scene):
+    def static_key(self):
+        # Redraw when a new global top-N arrives
+        return ('podium', leaderboard.version)
+
+    def update(self):
+        # B to go back
+        if controls.pressed('back'):
+            scenes.pop()
+
+    def draw(self, surface):
+        surface.fill((20, 20, 20))
+        podium_title = text_cache.render(title_font, "Top 3 Scores", (255, 255, 255))
+        surface.blit(podium_title, (WIDTH // 2 - podium_title.get_width() // 2, 100))
+
+        for i, (s, t) in enumerate(podium_store.top()):
+            pps = (s / t) if t > 0 else 0.0
+            line = text_cache.render(small_font, f"{i+1}. Score: {s}  Time: {format_time(t)}  PPS: {pps:.2f}", (255, 255, 255))
+            surface.blit(line, (WIDTH // 2 - line.get_width() // 2, 180 + i * 50))
+
+        info_text = text_cache.render(small_font, "Press B to return", (150, 150, 150))
+        surface.blit(info_text, (WIDTH // 2 - info_text.get_width() // 2, 400))
+
+        if args.leaderboard:
+            # Whatever the leaderboard thread last fetched; never waits on the network
+            top = leaderboard.top()
+            global_title = text_cache.render(small_font, f"Global Top {GLOBAL_PODIUM_ENTRIES}", (255, 255, 255))
+            surface.blit(global_title, (WIDTH // 2 - global_title.get_width() // 2, 460))
+            if not top:
+                line = text_cache.render(small_font, "Nothing from the leaderboard yet", (150, 150, 150))
+                surface.blit(line, (WIDTH // 2 - line.get_width() // 2, 500))
+            for i, (s, t, cabinet) in enumerate(top):
+                line = text_cache.render(small_font, f"{i+1}. {s}  {format_time(t)}  {cabinet}", (200, 200, 200))
+                surface.blit(line, (WIDTH // 2 - line.get_width() // 2, 500 + i * 40))
+
+
+gameplay = Gameplay()
+scenes = SceneStack(screen)
+scenes.push(gameplay)
+
+running = True
+while running:
+    profiler.begin_frame()
+
+    # ------------- Events -------------
+    controls.begin_frame()
+    for event in pygame.event.get():
+        controls.handle(event)
+        if event.type == pygame.QUIT:
+            # Save score on window close (unless the death screen already did)
+            if not world.dead:
+                leave_run()
+            running = False
+        elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED, pygame.WINDOWRESTORED):
+            # The window was covered or minimized: whatever is on it is stale
+            renderer.invalidate()
+        elif event.type == pygame.JOYDEVICEREMOVED and scenes.top is gameplay:
+            # Pad unplugged mid-run: stop the clock until the player is back
+            scenes.push(PauseMenu())
+    profiler.lap('events')
+
+    # ------------- Top scene -------------
+    scenes.top.update()
+    if scenes.draw(renderer):
+        renderer.present()
+        profiler.lap('flip')
+        if args.startup_time and scenes.top is gameplay:
+            print(f"Startup: first frame {first_frame_time * 1000:.0f} ms, "
+                  f"first gameplay frame {(time.perf_counter() - STARTED) * 1000:.0f} ms")
+            shutdown()
+    # Every frame, drawn or not, so the capture keeps time with the game
+    capture.grab(screen)
+    profiler.lap('capture')
+    profiler.end_frame()
+    clock.tick(args.fps)
+
+shutdown()
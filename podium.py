@@ -0,0 +1,127 @@
+import os
+import bisect
+
+import numpy as np
+
+# -----------------------------
+# Podium / run history store
+# -----------------------------
+# podium.txt is an append-only journal with one "score,elapsed" line per
+# finished run, so saving a run is a single small append (flushed and
+# fsynced) rather than a rewrite of the file. Every run is kept.
+#
+# The ranking is held in two parts: the runs loaded at startup, sorted once
+# into NumPy arrays by (score desc, time asc), and a small bisect-sorted
+# list of runs added since. top(n) merges the first n of each, and the
+# default top-N is cached until the next add, so the podium screen never
+# touches the disk.
+#
+# A crash mid-append can only leave a torn last line. Loading skips lines
+# that don't parse and then compacts: the good lines are written to a temp
+# file which atomically replaces the journal.
+
+
+def _sort_key(score, elapsed):
+    return (-score, elapsed)
+
+
+class PodiumStore:
+    def __init__(self, path, top_n=3):
+        self.path = path
+        self.top_n = top_n
+        self._top = None
+        self.load()
+
+    def __len__(self):
+        return len(self.loaded_scores) + len(self.added)
+
+    def load(self):
+        data = ""
+        if os.path.exists(self.path):
+            with open(self.path, "r") as f:
+                data = f.read()
+        needs_compaction = bool(data) and not data.endswith("\n")
+        scores, times = self._parse_fast(data)
+        if scores is None:
+            scores, times = self._parse_lines(data)
+            needs_compaction = True
+
+        # History in play order, and the same runs ranked best first
+        self.loaded_scores, self.loaded_times = scores, times
+        order = np.lexsort((times, -scores))
+        self.ranked_scores, self.ranked_times = scores[order], times[order]
+        self.added = []           # (score, elapsed) added since load, in play order
+        self.added_index = []     # their sort keys, best first
+        self._top = None
+        if needs_compaction:
+            self.compact()
+
+    @staticmethod
+    def _parse_fast(data):
+        # Whole-file parse for a clean journal: one comma per line
+        lines = data.count("\n") + (0 if data.endswith("\n") or not data else 1)
+        if data.count(",") != lines:
+            return None, None
+        try:
+            values = np.array(data.replace(",", " ").split(), dtype=float)
+        except ValueError:
+            return None, None
+        if len(values) != 2 * lines:
+            return None, None
+        scores = values[0::2]
+        if not np.array_equal(scores, np.round(scores)):
+            return None, None
+        return scores.astype(np.int64), values[1::2]
+
+    @staticmethod
+    def _parse_lines(data):
+        # Line-by-line fallback that skips anything malformed
+        scores, times = [], []
+        for line in data.splitlines():
+            parts = line.strip().split(",")
+            if len(parts) != 2:
+                continue
+            try:
+                score, elapsed = int(parts[0]), float(parts[1])
+            except ValueError:
+                continue
+            scores.append(score)
+            times.append(elapsed)
+        return np.array(scores, np.int64), np.array(times, float)
+
+    def add(self, score, elapsed):
+        score, elapsed = int(score), round(float(elapsed), 3)   # what the journal keeps
+        with open(self.path, "a") as f:
+            f.write(f"{score},{elapsed:.3f}\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.added.append((score, elapsed))
+        bisect.insort(self.added_index, _sort_key(score, elapsed))
+        self._top = None
+
+    def runs(self):
+        """Every run as (score, elapsed), in the order they were played."""
+        return list(zip(self.loaded_scores.tolist(), self.loaded_times.tolist())) + self.added
+
+    def top(self, n=None):
+        """Best n runs as (score, elapsed), best first. Served from memory."""
+        if n is None or n == self.top_n:
+            if self._top is None:
+                self._top = self._merge_top(self.top_n)
+            return self._top
+        return self._merge_top(n)
+
+    def _merge_top(self, n):
+        loaded = [_sort_key(s, t) for s, t in
+                  zip(self.ranked_scores[:n].tolist(), self.ranked_times[:n].tolist())]
+        merged = sorted(loaded + self.added_index[:n])[:n]
+        return [(-s, t) for s, t in merged]
+
+    def compact(self):
+        """Rewrite the journal with only well-formed lines, atomically."""
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            f.writelines(f"{s},{t:.3f}\n" for s, t in self.runs())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
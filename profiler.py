@@ -0,0 +1,129 @@
+import csv
+import json
+import time
+
+import numpy as np
+
+# -----------------------------
+# Frame-phase profiler
+# -----------------------------
+# The loop calls begin_frame(), then lap(name) after each phase finishes
+# (the time since the previous lap is charged to that phase), then
+# end_frame(). Phase times and entity counts go into fixed-size ring
+# buffers, so percentiles cover the last `window` frames. Laps for the same
+# phase within a frame add up, which is what happens when several sim
+# ticks run in one frame.
+#
+# With `export` set, every frame is also written as a row to a .csv or
+# .jsonl file for offline comparison between builds.
+
+
+class Profiler:
+    def __init__(self, phases, counters=(), window=600, export=None):
+        self.phases = list(phases)
+        self.counters = list(counters)
+        self.phase_index = {name: i for i, name in enumerate(self.phases)}
+        self.counter_index = {name: i for i, name in enumerate(self.counters)}
+        self.window = window
+        self.times = np.zeros((window, len(self.phases)))
+        self.totals = np.zeros(window)
+        self.counts = np.zeros((window, len(self.counters)), np.int64)
+        self.current = np.zeros(len(self.phases))
+        self.current_counts = np.zeros(len(self.counters), np.int64)
+        self.frames = 0
+        self.frame_start = None
+        self.last = None
+
+        self.export_file = None
+        self.export_writer = None
+        if export:
+            self.export_file = open(export, 'w', newline='')
+            if not export.endswith('.jsonl'):
+                self.export_writer = csv.writer(self.export_file)
+                self.export_writer.writerow(['frame', 'total_ms']
+                                            + [f"{p}_ms" for p in self.phases] + self.counters)
+
+    def begin_frame(self):
+        self.frame_start = self.last = time.perf_counter()
+        self.current[:] = 0.0
+
+    def lap(self, name):
+        now = time.perf_counter()
+        self.current[self.phase_index[name]] += now - self.last
+        self.last = now
+
+    def count(self, name, value):
+        self.current_counts[self.counter_index[name]] = value
+
+    def end_frame(self):
+        total = time.perf_counter() - self.frame_start
+        row = self.frames % self.window
+        self.times[row] = self.current
+        self.totals[row] = total
+        self.counts[row] = self.current_counts
+        if self.export_file is not None:
+            self._export(total)
+        self.frames += 1
+
+    def _export(self, total):
+        phases_ms = (self.current * 1000).round(4).tolist()
+        counts = self.current_counts.tolist()
+        if self.export_writer is not None:
+            self.export_writer.writerow([self.frames, round(total * 1000, 4)] + phases_ms + counts)
+        else:
+            record = {'frame': self.frames, 'total_ms': round(total * 1000, 4)}
+            record.update(zip((f"{p}_ms" for p in self.phases), phases_ms))
+            record.update(zip(self.counters, counts))
+            self.export_file.write(json.dumps(record) + "\n")
+
+    def percentiles(self, qs=(50, 95, 99)):
+        """{phase: (p50, p95, p99) in ms} over the recorded window, plus 'frame'."""
+        n = min(self.frames, self.window)
+        if not n:
+            return {}
+        phase_ms = np.percentile(self.times[:n], qs, axis=0) * 1000
+        result = {name: tuple(phase_ms[:, i].tolist()) for i, name in enumerate(self.phases)}
+        result['frame'] = tuple((np.percentile(self.totals[:n], qs) * 1000).tolist())
+        return result
+
+    def latest_counts(self):
+        if not self.frames:
+            return {}
+        row = (self.frames - 1) % self.window
+        return dict(zip(self.counters, self.counts[row].tolist()))
+
+    def summary_lines(self):
+        lines = [f"{'phase':<12}{'p50':>8}{'p95':>8}{'p99':>8}  ms"]
+        for name, (p50, p95, p99) in self.percentiles().items():
+            lines.append(f"{name:<12}{p50:>8.3f}{p95:>8.3f}{p99:>8.3f}")
+        counts = self.latest_counts()
+        if counts:
+            lines.append("  ".join(f"{name}={value}" for name, value in counts.items()))
+        return lines
+
+    def close(self):
+        if self.export_file is not None:
+            self.export_file.close()
+            self.export_file = None
+
+
+class NullProfiler:
+    """Stand-in used when profiling is off; every call is a no-op."""
+
+    def begin_frame(self):
+        pass
+
+    def lap(self, name):
+        pass
+
+    def count(self, name, value):
+        pass
+
+    def end_frame(self):
+        pass
+
+    def close(self):
+        pass
+
+
+NULL_PROFILER = NullProfiler()
@@ -0,0 +1,86 @@
+import pygame
+
+# -----------------------------
+# Frame presentation
+# -----------------------------
+# main.py draws through one of these. Every draw call reports the rect it
+# touched with add(); FullRedraw ignores them and flips the whole screen,
+# DirtyRectRenderer erases last frame's rects and pushes only the union of
+# old and new rects to the display.
+#
+# begin() returns False when the frame can be skipped entirely: a static
+# screen (menu, podium) whose key hasn't changed since it was last drawn.
+# invalidate() makes the next frame a full redraw and flip; the scene
+# stack calls it when the top scene changes, main.py when the window has
+# been covered or restored.
+
+
+class FullRedraw:
+    def __init__(self, background=(30, 30, 30)):
+        self.background = background
+
+    def begin(self, surface, static=None):
+        surface.fill(self.background)
+        return True
+
+    def add(self, rect):
+        pass
+
+    def add_all(self, rects):
+        pass
+
+    def invalidate(self):
+        pass
+
+    def present(self):
+        pygame.display.flip()
+
+
+class DirtyRectRenderer:
+    def __init__(self, background=(30, 30, 30)):
+        self.background = background
+        self.previous = []
+        self.current = []
+        self.full = True
+        self.static_key = None
+
+    def begin(self, surface, static=None):
+        if static is not None:
+            if static == self.static_key:
+                return False
+            self.static_key = static
+            self.full = True
+        elif self.static_key is not None:
+            # Leaving a static screen: everything on it is stale
+            self.static_key = None
+            self.full = True
+
+        if self.full:
+            surface.fill(self.background)
+        else:
+            for rect in self.previous:
+                surface.fill(self.background, rect)
+        return True
+
+    def add(self, rect):
+        self.current.append(rect)
+
+    def add_all(self, rects):
+        self.current.extend(rects)
+
+    def invalidate(self):
+        self.full = True
+        self.static_key = None
+
+    def present(self):
+        if self.full:
+            pygame.display.flip()
+            self.full = False
+        else:
+            pygame.display.update(self.previous + self.current)
+        self.previous = self.current
+        self.current = []
+
+
+def make_renderer(dirty_rects=False, background=(30, 30, 30)):
+    return DirtyRectRenderer(background) if dirty_rects else FullRedraw(background)
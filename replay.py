@@ -0,0 +1,187 @@
+import sys
+import json
+import time
+import struct
+
+import numpy as np
+
+import engine
+
+# -----------------------------
+# Input recording format
+# -----------------------------
+# A run is fully determined by its seed, config, tick rate and the input
+# of every tick, so that is all a recording holds:
+#
+#   header  'TSRP', version, seed, tick rate, config JSON
+#   ticks   6 bytes per player each (config['players'], in player
+#           order): 4 stick axes as int8 (value * 127) and a button bitmask
+#   footer  'END!', tick count, final score, final elapsed time
+#
+# The live game steps with the quantized inputs too, so the recording
+# replays bit-for-bit. A missing footer means the game didn't exit
+# cleanly; whatever ticks were written can still be replayed.
+
+MAGIC = b'TSRP'
+VERSION = 1
+HEADER = struct.Struct('<4sHqHI')
+TICK_DTYPE = np.dtype([('axes', 'i1', 4), ('buttons', '<u2')])
+FOOTER = struct.Struct('<4sIqd')
+FOOTER_MAGIC = b'END!'
+BUTTONS = ('shoot', 'heal', 'reload', 'button_x', 'button_y')
+
+
+def _axis(value):
+    return max(-127, min(127, round(value * 127)))
+
+
+def quantize(inputs):
+    """The inputs as stored: (axes, buttons) plus the Inputs they decode to."""
+    axes = (_axis(inputs.move_x), _axis(inputs.move_y), _axis(inputs.aim_x), _axis(inputs.aim_y))
+    buttons = 0
+    for bit, name in enumerate(BUTTONS):
+        if getattr(inputs, name):
+            buttons |= 1 << bit
+    return axes, buttons, decode(axes, buttons)
+
+
+def decode(axes, buttons):
+    return engine.Inputs(
+        move_x=axes[0] / 127, move_y=axes[1] / 127,
+        aim_x=axes[2] / 127, aim_y=axes[3] / 127,
+        **{name: bool(buttons >> bit & 1) for bit, name in enumerate(BUTTONS)}
+    )
+
+
+def config_from_json(text):
+    config = json.loads(text)
+    # JSON turns tuples into lists; colors are compared as tuples
+    config['enemy_types'] = [(tuple(color), *rest) for color, *rest in config['enemy_types']]
+    return engine.make_config(**config)
+
+
+class Recorder:
+    def __init__(self, path, seed, tick_rate, config):
+        self.file = open(path, 'wb')
+        config_json = json.dumps(config).encode()
+        self.file.write(HEADER.pack(MAGIC, VERSION, seed, tick_rate, len(config_json)))
+        self.file.write(config_json)
+        self.tick = struct.Struct('<4bH')
+        self.players = config['players']
+        self.ticks = 0
+
+    def record(self, inputs):
+        """Write one tick; step the world with the returned (quantized) inputs.
+
+        inputs is one Inputs or a sequence with one per player, as for
+        engine.step(); missing players are recorded idle.
+        """
+        if isinstance(inputs, engine.Inputs):
+            inputs = (inputs,)
+        quantized = []
+        for p in range(self.players):
+            axes, buttons, player_inputs = quantize(inputs[p] if p < len(inputs) else engine.IDLE)
+            self.file.write(self.tick.pack(*axes, buttons))
+            quantized.append(player_inputs)
+        self.ticks += 1
+        return quantized[0] if self.players == 1 else quantized
+
+    def close(self, world):
+        if self.file is None:
+            return
+        self.file.write(FOOTER.pack(FOOTER_MAGIC, self.ticks, world.score, world.elapsed))
+        self.file.close()
+        self.file = None
+
+
+class Recording:
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            data = f.read()
+        magic, version, self.seed, self.tick_rate, config_len = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path}: not a version {VERSION} recording")
+        offset = HEADER.size
+        self.config = config_from_json(data[offset:offset + config_len])
+        offset += config_len
+
+        self.footer = None
+        end = len(data)
+        if end - offset >= FOOTER.size and data[end - FOOTER.size:end - FOOTER.size + 4] == FOOTER_MAGIC:
+            _, ticks, score, elapsed = FOOTER.unpack_from(data, end - FOOTER.size)
+            self.footer = {'ticks': ticks, 'score': score, 'elapsed': elapsed}
+            end -= FOOTER.size
+        # A torn final tick (crash mid-write) is dropped
+        self.players = self.config['players']
+        tick_size = TICK_DTYPE.itemsize * self.players
+        count = (end - offset) // tick_size
+        self.ticks = np.frombuffer(data, TICK_DTYPE, count * self.players, offset).reshape(count, self.players)
+
+    def __len__(self):
+        return len(self.ticks)
+
+    def inputs(self):
+        """Decoded inputs per tick, in order: an Inputs, or a list of one
+        per player for co-op recordings."""
+        for axes, buttons in zip(self.ticks['axes'].tolist(), self.ticks['buttons'].tolist()):
+            if self.players == 1:
+                yield decode(axes[0], buttons[0])
+            else:
+                yield [decode(a, b) for a, b in zip(axes, buttons)]
+
+    def new_world(self):
+        return engine.World(config=self.config, seed=self.seed)
+
+
+def play(recording, realtime=False):
+    """Feed a recording through engine.step. Returns the final world."""
+    world = recording.new_world()
+    dt = 1.0 / recording.tick_rate
+    started = time.perf_counter()
+    for i, inputs in enumerate(recording.inputs()):
+        if realtime:
+            delay = started + i * dt - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        engine.step(world, inputs, dt)
+    return world
+
+
+def verify(recording, world):
+    """List of mismatches between the replayed world and the recorded footer."""
+    footer = recording.footer
+    if footer is None:
+        return ["recording has no footer (game did not exit cleanly)"]
+    problems = []
+    if footer['ticks'] != len(recording):
+        problems.append(f"ticks: recorded {footer['ticks']}, file holds {len(recording)}")
+    if footer['score'] != world.score:
+        problems.append(f"score: recorded {footer['score']}, replayed {world.score}")
+    if footer['elapsed'] != world.elapsed:
+        problems.append(f"elapsed: recorded {footer['elapsed']!r}, replayed {world.elapsed!r}")
+    return problems
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Replay a recorded run headless and check it matches.")
+    parser.add_argument('path')
+    parser.add_argument('--realtime', action='store_true', help="pace ticks at the recorded tick rate")
+    args = parser.parse_args(argv)
+
+    recording = Recording(args.path)
+    started = time.perf_counter()
+    world = play(recording, realtime=args.realtime)
+    wall = time.perf_counter() - started
+    print(f"{len(recording)} ticks in {wall:.2f}s: score={world.score} time={world.elapsed:.3f}s dead={world.dead}")
+    problems = verify(recording, world)
+    for problem in problems:
+        print(f"MISMATCH {problem}")
+    if not problems:
+        print("OK: replay matches the recording")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+# -----------------------------
+# Scene stack
+# -----------------------------
+# Each screen of the game (gameplay, pause menu, podium, death screen) is a
+# Scene on a stack. Only the top scene gets update() and draw() each
+# frame; everything underneath costs nothing until it is on top again.
+#
+# Hooks, all optional:
+#   enter()   pushed onto the stack
+#   exit()    popped off it
+#   pause()   another scene was pushed on top
+#   resume()  the scene above was popped
+#
+# An overlay scene (a menu over the game) is drawn over the frame that was
+# on screen when it was pushed. The stack keeps a copy of that frame as the
+# scene's `backdrop`, so the world under a menu is never rendered again.
+#
+# static_key() marks a static screen: while it returns the same value the
+# renderer skips the frame entirely (see render.py). None means redraw
+# every frame. Whenever the top scene changes, the next frame is redrawn
+# in full.
+
+
+class Scene:
+    overlay = False
+
+    def __init__(self):
+        self.stack = None
+        self.backdrop = None
+
+    def enter(self):
+        pass
+
+    def exit(self):
+        pass
+
+    def pause(self):
+        pass
+
+    def resume(self):
+        pass
+
+    def update(self):
+        """Read input and advance; called once per frame while on top."""
+
+    def static_key(self):
+        return None
+
+    def draw(self, surface):
+        """Draw the scene (over its backdrop, for overlays)."""
+
+
+class SceneStack:
+    def __init__(self, surface):
+        self.surface = surface
+        self.scenes = []
+        self.changed = True
+
+    def __len__(self):
+        return len(self.scenes)
+
+    @property
+    def top(self):
+        return self.scenes[-1] if self.scenes else None
+
+    def push(self, scene):
+        below = self.top
+        if below is not None:
+            below.pause()
+        scene.stack = self
+        # What's on screen now is the last frame drawn by the scene below
+        scene.backdrop = self.surface.copy() if scene.overlay and below is not None else None
+        self.scenes.append(scene)
+        self.changed = True
+        scene.enter()
+        return scene
+
+    def pop(self):
+        scene = self.scenes.pop()
+        self.changed = True
+        scene.exit()
+        scene.backdrop = None
+        if self.scenes:
+            self.scenes[-1].resume()
+        return scene
+
+    def replace(self, scene):
+        """Swap the top scene for another, without resuming the one below."""
+        old = self.scenes.pop()
+        old.exit()
+        old.backdrop = None
+        scene.stack = self
+        scene.backdrop = self.surface.copy() if scene.overlay and self.scenes else None
+        self.scenes.append(scene)
+        self.changed = True
+        scene.enter()
+        return old
+
+    def draw(self, renderer):
+        """Draw the top scene through renderer. Returns False if the frame
+        was skipped (a static screen that hasn't changed)."""
+        scene = self.top
+        if self.changed:
+            renderer.invalidate()
+            self.changed = False
+        if not renderer.begin(self.surface, static=scene.static_key()):
+            return False
+        if scene.backdrop is not None:
+            renderer.add(self.surface.blit(scene.backdrop, (0, 0)))
+        scene.draw(self.surface)
+        return True
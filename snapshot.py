@@ -0,0 +1,346 @@
+import os
+import sys
+import json
+import zlib
+import struct
+from collections import deque
+
+import numpy as np
+
+import engine
+from entities import PLAYER_FIELDS, PROJECTILE_FIELDS, ENEMY_FIELDS, PICKUP_FIELDS
+from replay import config_from_json
+
+# -----------------------------
+# World snapshots
+# -----------------------------
+# The complete state of a World between ticks, as a fixed list of named
+# NumPy arrays (the layout): the clocks, score and timers, both RNGs, the
+# live rows of every entity store (players included) and the wave
+# scheduler's pending queue. Restoring a snapshot and stepping on gives
+# exactly the run the snapshot was taken from.
+#
+# An encoded frame holds the arrays as one zlib stream. A delta frame
+# first XORs each array with the same array of the previous frame, over
+# the rows both have: compaction only moves a few rows, so most of the
+# bytes cancel, and what changes (moving positions, ticking timers) keeps
+# its sign, exponent and high mantissa bytes. Each array is then stored
+# byte-plane by byte-plane, so those runs of zero bytes line up for zlib.
+#
+#   frame   flags (bit 0: keyframe), array count, uint32 length of each
+#           array, zlib-compressed planes
+#   file    'TSSN', version, seed, config JSON, one keyframe
+#
+# SnapshotRing keeps the last few seconds of ticks this way for rewind,
+# with a keyframe every `keyframe_interval` ticks so a restore decodes at
+# most that many frames. save() / load() write a single keyframe with the
+# seed and config, enough to rebuild the World: crash-resume in main.py
+# and checkpoints for long headless runs in engine.py.
+
+MAGIC = b'TSSN'
+VERSION = 2
+HEADER = struct.Struct('<4sH?qI')    # magic, version, has seed, seed, config length
+FRAME = struct.Struct('<BI')          # flags, array count
+KEYFRAME = 1
+
+STORES = (('players', PLAYER_FIELDS), ('projectiles', PROJECTILE_FIELDS),
+          ('enemies', ENEMY_FIELDS), ('heal_pickups', PICKUP_FIELDS))
+
+WAVE_LAYOUT = [('waves.rng', np.uint64), ('waves.credit', np.float64), ('waves.counts', np.int64),
+               ('waves.next_burst', np.float64), ('waves.chunks', np.int64),
+               ('waves.kinds', np.int8), ('waves.xs', np.float64), ('waves.ys', np.float64)]
+
+MASK64 = (1 << 64) - 1
+
+
+def layout(world):
+    """(name, dtype) of every array in this world's snapshots, in order."""
+    arrays = [('clock', np.float64), ('counters', np.int64), ('rng', np.uint32), ('rng.gauss', np.float64)]
+    for store, fields in STORES:
+        arrays += [(f'{store}.{name}', dtype) for name, dtype in fields.items()]
+        arrays += [(f'{store}.alive', np.bool_), (f'{store}.born', np.int64), (f'{store}.serial', np.int64)]
+    if world.waves is not None:
+        arrays += WAVE_LAYOUT
+    # Widest items first (see Encoding)
+    return sorted(((name, np.dtype(dtype)) for name, dtype in arrays), key=lambda a: -a[1].itemsize)
+
+
+# -----------------------------
+# Capture / restore
+# -----------------------------
+def capture(world):
+    """The world's state as {name: array}. Arrays may be views of the live
+    columns: pack() or copy them before the world steps again."""
+    version, mt, gauss = world.rng.getstate()
+    state = {
+        'clock': np.array([world.elapsed, world.spawn_timer]),
+        'counters': np.array([world.tick, world.minutes_scored, world.score, world.dead], np.int64),
+        'rng': np.array(mt, np.uint32),
+        'rng.gauss': np.array([np.nan if gauss is None else gauss]),
+    }
+    for store_name, fields in STORES:
+        store = getattr(world, store_name)
+        n = len(store)
+        for name in fields:
+            state[f'{store_name}.{name}'] = store.columns[name][:n]
+        state[f'{store_name}.alive'] = store.alive_mask[:n]
+        state[f'{store_name}.born'] = store.born[:n]
+        state[f'{store_name}.serial'] = np.array([store.serial], np.int64)
+    if world.waves is not None:
+        _capture_waves(world.waves, state)
+    return state
+
+
+def _capture_waves(waves, state):
+    bits = waves.rng.bit_generator.state
+    inner = bits['state']
+    state['waves.rng'] = np.array([inner['state'] >> 64, inner['state'] & MASK64, inner['inc'] >> 64,
+                                   inner['inc'] & MASK64, bits['has_uint32'], bits['uinteger']], np.uint64)
+    state['waves.credit'] = np.array([waves.credit])
+    state['waves.counts'] = np.array([waves.queued, waves.spawned, waves.dropped], np.int64)
+    state['waves.next_burst'] = np.array([np.nan if t is None else t for t in waves.next_burst], np.float64)
+    chunks = list(waves.queue)
+    state['waves.chunks'] = np.array([len(kinds) for kinds, _, _ in chunks], np.int64)
+    for i, (name, dtype) in enumerate((('waves.kinds', np.int8), ('waves.xs', np.float64),
+                                       ('waves.ys', np.float64))):
+        state[name] = np.concatenate([chunk[i] for chunk in chunks]).astype(dtype) if chunks else np.zeros(0, dtype)
+
+
+def restore(world, state):
+    """Put the world back in a captured state (from the same config)."""
+    world.elapsed, world.spawn_timer = state['clock'].tolist()
+    world.tick, world.minutes_scored, world.score, dead = state['counters'].tolist()
+    world.dead = bool(dead)
+    gauss = float(state['rng.gauss'][0])
+    world.rng.setstate((3, tuple(state['rng'].tolist()), None if np.isnan(gauss) else gauss))
+    for store_name, fields in STORES:
+        getattr(world, store_name).restore({name: state[f'{store_name}.{name}'] for name in fields},
+                                           state[f'{store_name}.alive'], state[f'{store_name}.born'],
+                                           int(state[f'{store_name}.serial'][0]))
+    if world.waves is not None:
+        _restore_waves(world.waves, state)
+    world.events = []
+    # The grids are rebuilt every step; the enemy grid is also read by the
+    # renderer between steps, so bring it up to date now
+    enemies = world.enemies
+    if len(enemies):
+        half = enemies['size'] / 2
+        world.enemy_grid.rebuild(enemies['x'] + half, enemies['y'] + half)
+    else:
+        world.enemy_grid.clear()
+    world.pickup_grid.clear()
+
+
+def _restore_waves(waves, state):
+    hi, lo, inc_hi, inc_lo, has_uint32, uinteger = (int(v) for v in state['waves.rng'])
+    waves.rng.bit_generator.state = {
+        'bit_generator': waves.rng.bit_generator.state['bit_generator'],
+        'state': {'state': hi << 64 | lo, 'inc': inc_hi << 64 | inc_lo},
+        'has_uint32': has_uint32, 'uinteger': uinteger,
+    }
+    waves.credit = float(state['waves.credit'][0])
+    waves.queued, waves.spawned, waves.dropped = state['waves.counts'].tolist()
+    waves.next_burst = [None if np.isnan(t) else t for t in state['waves.next_burst'].tolist()]
+    waves.queue = deque()
+    start = 0
+    for length in state['waves.chunks'].tolist():
+        end = start + length
+        waves.queue.append((state['waves.kinds'][start:end].copy(), state['waves.xs'][start:end].copy(),
+                            state['waves.ys'][start:end].copy()))
+        start = end
+
+
+# -----------------------------
+# Encoding
+# -----------------------------
+# A state is packed into one byte buffer, arrays in layout order, plus
+# their lengths. The layout puts the widest items first, so arrays of one
+# item size are contiguous and each size is split into byte planes in one
+# go, and a delta whose lengths match its base is a single XOR.
+def pack(layout, state):
+    """(lengths, bytes) of a captured state."""
+    lengths = np.array([len(state[name]) for name, _ in layout], np.uint32)
+    buf = np.concatenate([np.ascontiguousarray(state[name], dtype).view(np.uint8) for name, dtype in layout])
+    return lengths, buf
+
+
+def unpack(layout, lengths, buf):
+    """The state a packed buffer holds, as views into it."""
+    offsets = _offsets(layout, lengths)
+    return {name: buf[offsets[i]:offsets[i + 1]].view(dtype) for i, (name, dtype) in enumerate(layout)}
+
+
+def _offsets(layout, lengths):
+    sizes = lengths.astype(np.int64) * [dtype.itemsize for _, dtype in layout]
+    return np.concatenate(([0], np.cumsum(sizes))).tolist()
+
+
+def _groups(layout, offsets):
+    """(item size, byte start, byte end) of each run of equal item size."""
+    groups = []
+    for i, (_, dtype) in enumerate(layout):
+        if groups and groups[-1][0] == dtype.itemsize:
+            groups[-1][2] = offsets[i + 1]
+        else:
+            groups.append([dtype.itemsize, offsets[i], offsets[i + 1]])
+    return groups
+
+
+def _xor(layout, packed, base):
+    """packed XOR base, array by array over the rows both have."""
+    lengths, buf = packed
+    base_lengths, base_buf = base
+    if np.array_equal(lengths, base_lengths):
+        return buf ^ base_buf
+    out = buf.copy()
+    offsets = _offsets(layout, lengths)
+    base_offsets = _offsets(layout, base_lengths)
+    common = (np.minimum(lengths, base_lengths).astype(np.int64)
+              * [dtype.itemsize for _, dtype in layout]).tolist()
+    for i, size in enumerate(common):
+        if size:
+            out[offsets[i]:offsets[i] + size] ^= base_buf[base_offsets[i]:base_offsets[i] + size]
+    return out
+
+
+def encode(layout, packed, base=None, level=1):
+    """One frame; a delta against `base` (the previous packed state) if given."""
+    lengths, buf = packed
+    data = buf if base is None else _xor(layout, packed, base)
+    planes = b''.join(data[start:end].reshape(-1, size).T.tobytes()
+                      for size, start, end in _groups(layout, _offsets(layout, lengths)))
+    flags = KEYFRAME if base is None else 0
+    return FRAME.pack(flags, len(layout)) + lengths.tobytes() + zlib.compress(planes, level)
+
+
+def decode(layout, frame, base=None):
+    """Inverse of encode(): the packed state. Delta frames need the packed
+    state they were made against."""
+    flags, count = FRAME.unpack_from(frame)
+    if count != len(layout):
+        raise ValueError(f"Snapshot has {count} arrays, this world's layout {len(layout)}")
+    if not flags & KEYFRAME and base is None:
+        raise ValueError("Delta frame decoded without its base")
+    lengths = np.frombuffer(frame, np.uint32, count, FRAME.size).copy()
+    planes = np.frombuffer(zlib.decompress(memoryview(frame)[FRAME.size + 4 * count:]), np.uint8)
+    buf = np.empty(len(planes), np.uint8)
+    for size, start, end in _groups(layout, _offsets(layout, lengths)):
+        buf[start:end] = planes[start:end].reshape(size, -1).T.ravel()
+    if not flags & KEYFRAME:
+        buf = _xor(layout, (lengths, buf), base)
+    return lengths, buf
+
+
+# -----------------------------
+# Rewind buffer
+# -----------------------------
+class SnapshotRing:
+    """The last `seconds` of a world's ticks, delta-compressed, for rewind."""
+
+    def __init__(self, world, seconds=10.0, tick_rate=engine.TICK_RATE, keyframe_interval=60, level=1):
+        self.layout = layout(world)
+        self.capacity = max(1, round(seconds * tick_rate))
+        self.keyframe_interval = keyframe_interval
+        self.level = level
+        self.frames = deque()   # (is keyframe, encoded frame), oldest first
+        self.last = None        # packed state of the newest frame, the next delta's base
+        self.since_key = 0      # frames after the newest keyframe
+        self.nbytes = 0
+
+    def __len__(self):
+        return len(self.frames)
+
+    def clear(self):
+        self.frames.clear()
+        self.last = None
+        self.since_key = 0
+        self.nbytes = 0
+
+    def push(self, world):
+        """Keep the world's current state as the newest frame."""
+        packed = pack(self.layout, capture(world))
+        key = self.last is None or self.since_key + 1 >= self.keyframe_interval
+        frame = encode(self.layout, packed, None if key else self.last, self.level)
+        self.frames.append((key, frame))
+        self.nbytes += len(frame)
+        self.last = packed
+        self.since_key = 0 if key else self.since_key + 1
+        if len(self.frames) > self.capacity:
+            # Drop the oldest keyframe and the deltas that depend on it
+            self._pop_oldest()
+            while self.frames and not self.frames[0][0]:
+                self._pop_oldest()
+
+    def _pop_oldest(self):
+        self.nbytes -= len(self.frames.popleft()[1])
+
+    def rewind(self, world, ticks=1):
+        """Restore the state from `ticks` frames back (as far as the buffer
+        goes) and forget everything after it. Returns ticks rewound."""
+        if len(self.frames) < 2 or ticks < 1:
+            return 0   # already at the oldest kept state
+        target = max(0, len(self.frames) - 1 - ticks)
+        key = target
+        while not self.frames[key][0]:
+            key -= 1
+        packed = None
+        for i in range(key, target + 1):
+            packed = decode(self.layout, self.frames[i][1], packed)
+        rewound = len(self.frames) - 1 - target
+        for _ in range(rewound):
+            self.nbytes -= len(self.frames.pop()[1])
+        restore(world, unpack(self.layout, *packed))
+        self.last = packed
+        self.since_key = target - key
+        return rewound
+
+
+# -----------------------------
+# Save / resume
+# -----------------------------
+def save(world, path):
+    """Write the world to path as one keyframe, replacing the file atomically."""
+    config_json = json.dumps(world.config).encode()
+    has_seed = world.seed is not None
+    arrays = layout(world)
+    frame = encode(arrays, pack(arrays, capture(world)), level=6)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, has_seed, world.seed if has_seed else 0, len(config_json)))
+        f.write(config_json)
+        f.write(frame)
+    os.replace(tmp_path, path)
+
+
+def load(path):
+    """A new World in the state save() wrote."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    magic, version, has_seed, seed, config_len = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path}: not a version {VERSION} snapshot")
+    offset = HEADER.size
+    config = config_from_json(data[offset:offset + config_len])
+    world = engine.World(config, seed=seed if has_seed else None)
+    arrays = layout(world)
+    restore(world, unpack(arrays, *decode(arrays, data[offset + config_len:])))
+    return world
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Show what a saved snapshot holds.")
+    parser.add_argument('path')
+    args = parser.parse_args(argv)
+
+    world = load(args.path)
+    print(f"{args.path}: {os.path.getsize(args.path):,} bytes, seed={world.seed}, tick={world.tick}, "
+          f"time={world.elapsed:.2f}s, score={world.score}, dead={world.dead}")
+    print(f"players up={int(world.players.alive.sum())}/{len(world.players)} enemies={len(world.enemies)} "
+          f"projectiles={len(world.projectiles)} pickups={len(world.heal_pickups)}"
+          + (f" queued spawns={world.waves.queued}" if world.waves is not None else ""))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
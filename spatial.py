@@ -0,0 +1,116 @@
+import numpy as np
+
+# -----------------------------
+# Uniform-grid spatial hash
+# -----------------------------
+# Items are bucketed by the cell their point falls in. Instead of Python
+# dicts of lists, the buckets are a sort: items are ordered by cell key and
+# a query finds its cell's run with searchsorted. Rebuilding is one argsort
+# per tick, and queries for many points run as a handful of array ops.
+#
+# Below `min_items` the grid is skipped and every item is a candidate for
+# every query: at a few dozen entities the sort costs more than it saves.
+#
+# When the items' store is compacted, remap() follows them to their new
+# rows without re-sorting, so the grid stays usable (e.g. for culling the
+# view with query_rect) until the next rebuild.
+
+_OFFSET = 1 << 20   # keeps negative cell coords positive inside the key
+
+
+def _cell_keys(cx, cy):
+    return ((cx + _OFFSET) << 32) | (cy + _OFFSET)
+
+
+class SpatialHash:
+    def __init__(self, cell_size, min_items=32):
+        self.cell_size = float(cell_size)
+        self.min_items = min_items
+        self.count = 0
+        self.order = np.zeros(0, np.intp)
+        self.keys = None
+
+    def __len__(self):
+        return self.count
+
+    def cells(self, x, y):
+        inv = 1.0 / self.cell_size
+        return np.floor(x * inv).astype(np.int64), np.floor(y * inv).astype(np.int64)
+
+    def clear(self):
+        self.count = 0
+        self.order = np.zeros(0, np.intp)
+        self.keys = None
+
+    def rebuild(self, x, y):
+        """Re-bucket all items; item i is at (x[i], y[i])."""
+        self.count = len(x)
+        if self.count < self.min_items:
+            self.order = np.arange(self.count)
+            self.keys = None
+            return
+        keys = _cell_keys(*self.cells(x, y))
+        self.order = np.argsort(keys, kind='stable')
+        self.keys = keys[self.order]
+
+    def query_pairs(self, qx, qy, reach):
+        """Candidate (query index, item index) pairs.
+
+        Returns every item in a cell overlapping the box of half-width
+        `reach` around query point i, i.e. a superset of the items within
+        `reach` of the point on both axes.
+        Callers do the exact overlap test on the returned pairs.
+        """
+        empty = np.zeros(0, np.intp)
+        if not self.count or not len(qx):
+            return empty, empty
+        if self.keys is None:
+            return np.repeat(np.arange(len(qx)), self.count), np.tile(self.order, len(qx))
+        # Cells overlapping the box [q - reach, q + reach] on each axis
+        span = int(np.ceil(2 * reach / self.cell_size)) + 1
+        offsets = np.arange(span)
+        off_x = np.repeat(offsets, span)
+        off_y = np.tile(offsets, span)
+        qcx, qcy = self.cells(qx - reach, qy - reach)
+        # One row per query point, one column per neighbouring cell
+        keys = _cell_keys(qcx[:, None] + off_x, qcy[:, None] + off_y).ravel()
+        lo = np.searchsorted(self.keys, keys, 'left')
+        counts = np.searchsorted(self.keys, keys, 'right') - lo
+        total = int(counts.sum())
+        if not total:
+            return empty, empty
+        # Expand each [lo, lo + count) run into explicit slots
+        starts = np.repeat(lo - (np.cumsum(counts) - counts), counts)
+        slots = starts + np.arange(total)
+        query_idx = np.repeat(np.arange(len(qx)).repeat(len(off_x)), counts)
+        return query_idx, self.order[slots]
+
+    def query_point(self, x, y, reach):
+        """Candidate item indices near a single point."""
+        return self.query_pairs(np.array([x], float), np.array([y], float), reach)[1]
+
+    def query_rect(self, x0, y0, x1, y1):
+        """Candidate indices of items in cells overlapping the rectangle."""
+        if not self.count:
+            return np.zeros(0, np.intp)
+        if self.keys is None:
+            return self.order
+        (cx0, cx1), (cy0, cy1) = self.cells(np.array([x0, x1], float), np.array([y0, y1], float))
+        # Cells of one column are consecutive keys: one run per column
+        columns = np.arange(cx0, cx1 + 1)
+        lo = np.searchsorted(self.keys, _cell_keys(columns, cy0), 'left')
+        hi = np.searchsorted(self.keys, _cell_keys(columns, cy1), 'right')
+        counts = hi - lo
+        total = int(counts.sum())
+        starts = np.repeat(lo - (np.cumsum(counts) - counts), counts)
+        return self.order[starts + np.arange(total)]
+
+    def remap(self, new_index):
+        """Follow items to new indices after their store was compacted;
+        new_index[i] is item i's new index, or -1 to drop it."""
+        order = new_index[self.order]
+        keep = order >= 0
+        self.order = order[keep]
+        if self.keys is not None:
+            self.keys = self.keys[keep]
+        self.count = len(self.order)
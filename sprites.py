@@ -0,0 +1,235 @@
+import math
+
+import numpy as np
+import pygame
+
+import engine
+
+# -----------------------------
+# Sprite layer
+# -----------------------------
+# Instead of building and rasterizing a polygon/rect/circle per entity per
+# frame, every shape is drawn once onto a small surface and the frame is a
+# single Surface.blits() call. The triangle is pre-rotated at `angle_steps`
+# quantized angles for each of its color states.
+#
+# Given a camera (camera.py), only what is in view is drawn, shifted to
+# screen coordinates.
+
+TRI_COLORS = [engine.COLOR_IDLE, engine.COLOR_HEALING, engine.COLOR_RELOADING,
+              engine.COLOR_BUTTON_Y, engine.COLOR_BUTTON_X]
+BULLET_COLOR = (255, 255, 255)
+PICKUP_COLOR = (0, 255, 0)
+
+
+def triangle_points(cx, cy, size, angle):
+    length = size * 0.6
+    width = size * 0.4
+    triangle = [(0, -length), (-width, width), (width, width)]
+    rad = math.radians(angle)
+    cos, sin = math.cos(rad), math.sin(rad)
+    return [(cx + px * cos - py * sin, cy + px * sin + py * cos) for px, py in triangle]
+
+
+def lerp_positions(store, alpha, rows=None, offset=(0, 0)):
+    """Positions blended from the previous tick toward the current one,
+    of the given rows only if set, minus offset."""
+    prev_x, prev_y, x, y = store['prev_x'], store['prev_y'], store['x'], store['y']
+    if rows is not None:
+        prev_x, prev_y, x, y = prev_x[rows], prev_y[rows], x[rows], y[rows]
+    xs = prev_x + (x - prev_x) * alpha - offset[0]
+    ys = prev_y + (y - prev_y) * alpha - offset[1]
+    return xs.tolist(), ys.tolist()
+
+
+def _new_surface(width, height, alpha=False):
+    # Match the display's pixel format when there is one, so blits are plain copies
+    surf = pygame.Surface((width, height), pygame.SRCALPHA if alpha else 0)
+    if pygame.display.get_surface() is not None:
+        surf = surf.convert_alpha() if alpha else surf.convert()
+    return surf
+
+
+def live_players(world, alpha):
+    """(player, x, y, angle, color) for every player still up."""
+    players = world.players
+    xs, ys = lerp_positions(players, alpha)
+    return [(p, xs[p], ys[p], angle, engine.player_color(p, state))
+            for p, (up, angle, state) in enumerate(zip(players.alive.tolist(), players['angle'].tolist(),
+                                                       players['state'].tolist()))
+            if up]
+
+
+class SpriteSheet:
+    def __init__(self, config, angle_steps=72, prerender=True):
+        self.config = config
+        self.angle_steps = angle_steps
+        self.tri_size = config['tri_size']
+        # Square surface big enough for the triangle at any rotation
+        reach = math.ceil(math.hypot(self.tri_size * 0.4, self.tri_size * 0.6)) + 1
+        self.tri_extent = 2 * reach
+        self.triangles = {}
+        self.squares = {}
+        self.circles = {}
+
+        size = config['projectile_size']
+        self.bullet = _new_surface(size, size)
+        self.bullet.fill(BULLET_COLOR)
+
+        if prerender:
+            for color in TRI_COLORS + engine.PLAYER_COLORS[1:config['players']]:
+                for step in range(angle_steps):
+                    self._render_triangle(step, color)
+            for enemy_type in config['enemy_types']:
+                self.square(enemy_type[0], config['enemy_size'])
+            self.circle(config['heal_pickup_radius'])
+        # The usual enemy sprite per kind, without a dict lookup
+        self.enemy_sprites = [self.square(t[0], config['enemy_size']) for t in config['enemy_types']]
+
+    def _render_triangle(self, step, color):
+        surf = _new_surface(self.tri_extent, self.tri_extent, alpha=True)
+        surf.fill((0, 0, 0, 0))
+        half = self.tri_extent / 2
+        angle = step * 360.0 / self.angle_steps
+        pygame.draw.polygon(surf, color, triangle_points(half, half, self.tri_size, angle))
+        self.triangles[(step, color)] = surf
+        return surf
+
+    def triangle(self, angle, color):
+        step = round(angle * self.angle_steps / 360.0) % self.angle_steps
+        surf = self.triangles.get((step, color))
+        return surf if surf is not None else self._render_triangle(step, color)
+
+    def square(self, color, size):
+        key = (color, size)
+        surf = self.squares.get(key)
+        if surf is None:
+            surf = _new_surface(int(size), int(size))
+            surf.fill(color)
+            self.squares[key] = surf
+        return surf
+
+    def circle(self, radius):
+        surf = self.circles.get(radius)
+        if surf is None:
+            # Same footprint as pygame.draw.circle(center, radius)
+            extent = int(radius) * 2 + 1
+            surf = _new_surface(extent, extent, alpha=True)
+            surf.fill((0, 0, 0, 0))
+            pygame.draw.circle(surf, PICKUP_COLOR, (int(radius), int(radius)), radius)
+            self.circles[radius] = surf
+        return surf
+
+
+class SpriteBatch:
+    """Draws a World with one Surface.blits() call per frame.
+
+    The (surface, position) items handed to blits() are pooled
+    [surface, Rect] pairs updated in place, so a frame doesn't build a
+    tuple per entity for the garbage collector to chase.
+    """
+
+    def __init__(self, sheet):
+        self.sheet = sheet
+        self.items = []
+
+    def _reserve(self, n):
+        items = self.items
+        while len(items) < n:
+            items.append([None, pygame.Rect(0, 0, 0, 0)])
+        return items
+
+    def draw(self, surface, world, alpha=1.0, camera=None):
+        """Blit everything (in view of camera, if given); returns the list of rects touched."""
+        sheet = self.sheet
+        projectiles, enemies, pickups = world.projectiles, world.enemies, world.heal_pickups
+        size = world.tri_size
+        half = sheet.tri_extent // 2
+
+        offset = (0, 0)
+        shots = foes = drops = None   # rows to draw; None is all of them
+        if camera is not None:
+            offset = (camera.x, camera.y)
+            # The enemy grid holds centers as of the last tick; the margin
+            # covers the sprite and a tick of movement since
+            margin = 2 * world.config['enemy_size']
+            foes = np.sort(world.enemy_grid.query_rect(*camera.rect(margin)))
+            if len(projectiles):
+                shots = np.flatnonzero(camera.visible(projectiles['x'], projectiles['y'], margin))
+            if len(pickups):
+                drops = np.flatnonzero(camera.visible(pickups['x'], pickups['y'], margin))
+        items = self._reserve(len(world.players)
+                              + (len(projectiles) if shots is None else len(shots))
+                              + (len(enemies) if foes is None else len(foes))
+                              + (len(pickups) if drops is None else len(drops)))
+
+        n = 0
+        for _, tri_x, tri_y, angle, color in live_players(world, alpha):
+            item = items[n]
+            item[0] = sheet.triangle(angle, color)
+            item[1].x = int(tri_x + size // 2) - offset[0] - half
+            item[1].y = int(tri_y + size // 2) - offset[1] - half
+            n += 1
+
+        bullet = sheet.bullet
+        for x, y in zip(*lerp_positions(projectiles, alpha, shots, offset)):
+            item = items[n]
+            item[0] = bullet
+            rect = item[1]
+            rect.x = int(x)
+            rect.y = int(y)
+            n += 1
+
+        if len(enemies):
+            types = world.config['enemy_types']
+            default_size = world.config['enemy_size']
+            sprites = sheet.enemy_sprites
+            xs, ys = lerp_positions(enemies, alpha, foes, offset)
+            esizes, kinds = enemies['size'], enemies['kind']
+            if foes is not None:
+                esizes, kinds = esizes[foes], kinds[foes]
+            for x, y, esize, kind in zip(xs, ys, esizes.tolist(), kinds.tolist()):
+                item = items[n]
+                item[0] = sprites[kind] if esize == default_size else sheet.square(types[kind][0], esize)
+                rect = item[1]
+                rect.x = int(x)
+                rect.y = int(y)
+                n += 1
+
+        px, py, radius = pickups['x'], pickups['y'], pickups['radius']
+        if drops is not None:
+            px, py, radius = px[drops], py[drops], radius[drops]
+        for x, y, r in zip(px.tolist(), py.tolist(), radius.tolist()):
+            item = items[n]
+            item[0] = sheet.circle(r)
+            rect = item[1]
+            rect.x = int(x) - offset[0] - int(r)
+            rect.y = int(y) - offset[1] - int(r)
+            n += 1
+
+        return surface.blits(items[:n] if n < len(items) else items)
+
+
+# -----------------------------
+# Immediate-mode reference
+# -----------------------------
+# The original per-entity pygame.draw path; kept for the sprite benchmark.
+
+def draw_world_immediate(surface, world, alpha=1.0):
+    rects = []
+    add = rects.append
+    size = world.tri_size
+    for _, tri_x, tri_y, angle, color in live_players(world, alpha):
+        add(pygame.draw.polygon(surface, color, triangle_points(tri_x + size // 2, tri_y + size // 2, size, angle)))
+    proj_size = world.config['projectile_size']
+    for x, y in zip(*lerp_positions(world.projectiles, alpha)):
+        add(pygame.draw.rect(surface, BULLET_COLOR, (x, y, proj_size, proj_size)))
+    enemies = world.enemies
+    colors = [t[0] for t in world.config['enemy_types']]
+    xs, ys = lerp_positions(enemies, alpha)
+    for x, y, esize, kind in zip(xs, ys, enemies['size'].tolist(), enemies['kind'].tolist()):
+        add(pygame.draw.rect(surface, colors[kind], (x, y, esize, esize)))
+    pickups = world.heal_pickups
+    for x, y, r in zip(pickups['x'].tolist(), pickups['y'].tolist(), pickups['radius'].tolist()):
+        add(pygame.draw.circle(surface, PICKUP_COLOR, (int(x), int(y)), r))
+    return rects
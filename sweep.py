@@ -0,0 +1,237 @@
+import os
+import sys
+import json
+import time
+import argparse
+import itertools
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+import engine
+import bots
+
+# -----------------------------
+# Monte Carlo balance sweeps
+# -----------------------------
+# Plays many headless games for every point of a parameter grid and
+# records how each one went. Games are split into chunks and spread over
+# a process pool; each worker writes its chunk straight to a columnar
+# part file (one .npz per chunk, one array per metric), so results stream
+# to disk and nothing big travels back to the parent.
+#
+# Every game's seed comes from a SeedSequence keyed on (base seed, point,
+# game), so a sweep gives the same numbers however many workers run it
+# and in whatever order the chunks finish.
+#
+#   python sweep.py --games 2000 --param spawn_interval=1.0,1.25,1.5 \
+#       --param enemy_weight=0.6/0.3/0.1,0.4/0.4/0.2 --policy noisy
+#
+# Besides the scalar config keys, enemy_speed / enemy_damage /
+# enemy_weight take one value per enemy type, separated by '/'.
+
+METRICS = [
+    ('survival', np.float64),     # seconds survived (sim clock)
+    ('score', np.int64),
+    ('kills', np.int32),
+    ('damage_taken', np.int32),
+    ('shots', np.int32),
+    ('pickups', np.int32),
+    ('died', np.bool_),           # False when the game hit --max-time
+]
+SUMMARY_METRICS = ['survival', 'score', 'kills', 'damage_taken']
+PERCENTILES = [10, 50, 90]
+
+ENEMY_FIELDS = {'enemy_speed': 1, 'enemy_damage': 2, 'enemy_weight': 4}
+
+
+# -----------------------------
+# Parameter points
+# -----------------------------
+def parse_value(text):
+    if '/' in text:
+        return [parse_value(part) for part in text.split('/')]
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
+def parse_param(spec):
+    """'name=v1,v2,...' -> (name, [values])"""
+    name, _, values = spec.partition('=')
+    if name not in engine.DEFAULT_CONFIG and name not in ENEMY_FIELDS:
+        raise SystemExit(f"Unknown parameter: {name}")
+    if not values:
+        raise SystemExit(f"No values given for {name}")
+    return name, [parse_value(v) for v in values.split(',')]
+
+
+def grid(params):
+    """Every combination of the swept values, as a list of {name: value}."""
+    names = [name for name, _ in params]
+    return [dict(zip(names, combo)) for combo in itertools.product(*(values for _, values in params))]
+
+
+def point_config(point):
+    overrides = {}
+    enemy_types = [list(t) for t in engine.DEFAULT_CONFIG['enemy_types']]
+    for name, value in point.items():
+        if name in ENEMY_FIELDS:
+            if len(value) != len(enemy_types):
+                raise SystemExit(f"{name} needs {len(enemy_types)} values separated by '/'")
+            for enemy_type, v in zip(enemy_types, value):
+                enemy_type[ENEMY_FIELDS[name]] = v
+            overrides['enemy_types'] = [tuple(t) for t in enemy_types]
+        else:
+            overrides[name] = value
+    return engine.make_config(**overrides)
+
+
+def game_seed(base_seed, point_index, game):
+    return int(np.random.SeedSequence([base_seed, point_index, game]).generate_state(1, np.uint64)[0])
+
+
+# -----------------------------
+# Workers
+# -----------------------------
+def play(config, seed, policy, max_ticks):
+    """One headless game. Returns its metrics as a dict."""
+    world = engine.World(config, seed=seed)
+    controller = bots.make_bot(policy, seed)
+    players = range(len(world.players))
+    kills = damage = shots = pickups = 0
+    while not world.dead and world.tick < max_ticks:
+        if len(players) == 1:
+            inputs = controller.act(bots.Observation(world))
+        else:
+            inputs = [controller.act(bots.Observation(world, p)) if world.players.alive[p] else engine.IDLE
+                      for p in players]
+        engine.step(world, inputs, engine.FRAME_DT)
+        for event in world.events:
+            kind = event[0]
+            if kind == 'kill':
+                kills += 1
+            elif kind == 'damage':
+                damage += event[1]
+            elif kind == 'shot':
+                shots += 1
+            elif kind == 'pickup':
+                pickups += 1
+    return {'survival': world.elapsed, 'score': world.score, 'kills': kills,
+            'damage_taken': damage, 'shots': shots, 'pickups': pickups, 'died': world.dead}
+
+
+def run_chunk(out_dir, point_index, point, policy, base_seed, games, max_ticks):
+    """Play games[0]..games[1]-1 of one point and write them as a part file."""
+    config = point_config(point)
+    first, last = games
+    columns = {name: np.zeros(last - first, dtype) for name, dtype in METRICS}
+    seeds = np.zeros(last - first, np.uint64)
+    for row, game in enumerate(range(first, last)):
+        seed = game_seed(base_seed, point_index, game)
+        seeds[row] = seed
+        for name, value in play(config, seed, policy, max_ticks).items():
+            columns[name][row] = value
+    path = os.path.join(out_dir, f"part-p{point_index:04d}-g{first:07d}.npz")
+    tmp_path = path + ".tmp.npz"
+    np.savez(tmp_path, point=np.full(last - first, point_index, np.int32), seed=seeds, **columns)
+    os.replace(tmp_path, path)   # readers never see a half-written part
+    return path, last - first
+
+
+# -----------------------------
+# Results
+# -----------------------------
+def load_results(out_dir):
+    """All part files of a sweep, concatenated column by column."""
+    parts = sorted(name for name in os.listdir(out_dir) if name.startswith('part-') and name.endswith('.npz'))
+    columns = {}
+    for name in parts:
+        with np.load(os.path.join(out_dir, name)) as part:
+            for key in part.files:
+                columns.setdefault(key, []).append(part[key])
+    return {key: np.concatenate(arrays) for key, arrays in columns.items()}
+
+
+def summarize(results, points):
+    """Per point: game count, death rate, and mean / p10 / p50 / p90 per metric."""
+    rows = []
+    for index, point in enumerate(points):
+        mask = results['point'] == index
+        row = {'point': index, **{k: json.dumps(v) if isinstance(v, list) else v for k, v in point.items()},
+               'games': int(mask.sum()), 'died': float(results['died'][mask].mean()) if mask.any() else 0.0}
+        for metric in SUMMARY_METRICS:
+            values = results[metric][mask]
+            row[f'{metric}_mean'] = float(values.mean()) if len(values) else 0.0
+            for p, v in zip(PERCENTILES, np.percentile(values, PERCENTILES) if len(values) else [0.0] * 3):
+                row[f'{metric}_p{p}'] = float(v)
+        rows.append(row)
+    return rows
+
+
+def write_summary(rows, path):
+    with open(path, 'w') as f:
+        f.write(",".join(rows[0]) + "\n")
+        for row in rows:
+            f.write(",".join(f'"{v}"' if isinstance(v, str) else f"{v:.6g}" if isinstance(v, float) else str(v)
+                             for v in row.values()) + "\n")
+
+
+def print_summary(rows, names):
+    header = ["point"] + names + ["games", "died"] + [f"{m} p10/p50/p90" for m in SUMMARY_METRICS]
+    print("  ".join(header))
+    for row in rows:
+        cells = [str(row['point'])] + [str(row[n]) for n in names] + [str(row['games']), f"{row['died']:.0%}"]
+        cells += ["/".join(f"{row[f'{m}_p{p}']:.0f}" for p in PERCENTILES) for m in SUMMARY_METRICS]
+        print("  ".join(cells))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run headless balance sweeps across all CPU cores.")
+    parser.add_argument('--param', action='append', default=[], metavar='NAME=V1,V2,...',
+                        help="config value(s) to sweep; repeat for a grid")
+    parser.add_argument('--games', type=int, default=1000, help="games per parameter point")
+    parser.add_argument('--policy', choices=sorted(bots.BOTS), default='noisy', help="bot that plays (see bots.py)")
+    parser.add_argument('--max-time', type=float, default=300.0, help="cut games off after this many sim seconds")
+    parser.add_argument('--seed', type=int, default=0, help="base seed; every game's seed derives from it")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="processes (default: every core)")
+    parser.add_argument('--chunk', type=int, default=25, help="games per task / part file")
+    parser.add_argument('--out', default='sweep-out', help="directory for part files and summary.csv")
+    args = parser.parse_args(argv)
+
+    params = [parse_param(spec) for spec in args.param]
+    points = grid(params)
+    for point in points:
+        point_config(point)   # fail fast on bad values, before any work is queued
+    os.makedirs(args.out, exist_ok=True)
+    for name in os.listdir(args.out):
+        if name.startswith('part-'):
+            os.remove(os.path.join(args.out, name))
+    with open(os.path.join(args.out, 'points.json'), 'w') as f:
+        json.dump({'policy': args.policy, 'seed': args.seed, 'max_time': args.max_time,
+                   'games': args.games, 'points': points}, f, indent=1)
+
+    max_ticks = round(args.max_time * engine.TICK_RATE)
+    tasks = [(point_index, point, (first, min(first + args.chunk, args.games)))
+             for point_index, point in enumerate(points)
+             for first in range(0, args.games, args.chunk)]
+    total = len(points) * args.games
+    done = 0
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = [pool.submit(run_chunk, args.out, point_index, point, args.policy, args.seed, games, max_ticks)
+                   for point_index, point, games in tasks]
+        for future in as_completed(futures):
+            done += future.result()[1]
+            rate = done / (time.perf_counter() - started)
+            print(f"\r{done}/{total} games ({rate:.1f} games/s)", end="", flush=True)
+    print()
+
+    rows = summarize(load_results(args.out), points)
+    write_summary(rows, os.path.join(args.out, 'summary.csv'))
+    print_summary(rows, [name for name, _ in params])
+
+
+if __name__ == "__main__":
+    sys.exit(main())
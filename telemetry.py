@@ -0,0 +1,363 @@
+import os
+import glob
+import gzip
+import json
+import time
+import sqlite3
+import threading
+
+import numpy as np
+
+# -----------------------------
+# Run telemetry
+# -----------------------------
+# Per-run analytics: kills by enemy type, shots and accuracy, reloads and
+# heals, damage taken by enemy type, pickups and health over time.
+#
+# The game loop only ever writes into a preallocated ring of NumPy columns
+# (one row per event: code, tick, time, two int args); that's a handful of
+# array stores under an uncontended lock. A writer thread wakes every
+# `flush_interval` seconds, copies out whatever is pending, turns it into
+# records, keeps the per-run totals and hands the batch to a sink:
+#
+#   'jsonl'   gzip-compressed JSON lines; each batch is appended as its own
+#             gzip member, so a crash loses at most the batch in flight
+#   'sqlite'  one `events` table, one transaction per batch
+#
+# Files rotate once they pass `max_bytes`, and only the newest `keep` are
+# kept. If the writer ever falls a whole ring behind, new events are
+# dropped and counted rather than blocking the loop.
+#
+# Every run ends with a 'summary' record holding its totals.
+
+EVENTS = ('run_start', 'run_end', 'shot', 'kill', 'damage', 'pickup', 'death',
+          'reload', 'reloaded', 'heal', 'healed', 'health', 'down')
+CODES = {name: i for i, name in enumerate(EVENTS)}
+FORMATS = ('jsonl', 'sqlite')
+
+# Enemy colors by name, for readable records; unknown colors get 'type<i>'
+COLOR_NAMES = {(255, 255, 255): 'white', (0, 255, 255): 'blue', (255, 0, 0): 'red'}
+
+
+def enemy_names(config):
+    return [COLOR_NAMES.get(tuple(t[0]), f"type{i}") for i, t in enumerate(config['enemy_types'])]
+
+
+class JsonlSink:
+    extension = '.jsonl.gz'
+
+    def __init__(self, path):
+        self.path = path
+
+    def write(self, records):
+        data = "".join(json.dumps(r, separators=(',', ':')) + "\n" for r in records)
+        with open(self.path, 'ab') as f:
+            f.write(gzip.compress(data.encode()))
+
+    def close(self):
+        pass
+
+
+class SqliteSink:
+    extension = '.sqlite'
+
+    def __init__(self, path):
+        self.path = path
+        self.db = None   # opened on first write, from the writer thread
+
+    def write(self, records):
+        if self.db is None:
+            self.db = sqlite3.connect(self.path)
+            self.db.execute("CREATE TABLE IF NOT EXISTS events "
+                            "(run TEXT, tick INTEGER, t REAL, event TEXT, data TEXT)")
+        rows = [(r['run'], r.get('tick'), r.get('t'), r['event'],
+                 json.dumps({k: v for k, v in r.items() if k not in ('run', 'tick', 't', 'event')}))
+                for r in records]
+        with self.db:
+            self.db.executemany("INSERT INTO events VALUES (?, ?, ?, ?, ?)", rows)
+
+    def close(self):
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+
+
+SINKS = {'jsonl': JsonlSink, 'sqlite': SqliteSink}
+
+
+class RunTotals:
+    """Running totals for one run, kept by the writer thread."""
+
+    def __init__(self, run, names, meta):
+        self.run = run
+        self.names = names
+        self.meta = meta
+        self.shots = 0
+        self.kills = dict.fromkeys(names, 0)
+        self.damage = dict.fromkeys(names, 0)
+        self.hits_taken = 0
+        self.pickups = 0
+        self.reloads = 0
+        self.reloads_done = 0
+        self.heals = 0
+        self.heals_done = 0
+        self.healed = 0
+        self.health = []   # [t, lowest health in the bucket ending at t]
+
+    def name(self, kind):
+        return self.names[kind] if 0 <= kind < len(self.names) else 'unknown'
+
+    def summary(self, t, tick, score, died):
+        kills = sum(self.kills.values())
+        return {'run': self.run, 'event': 'summary', 'tick': tick, 't': t, **self.meta,
+                'score': score, 'died': died, 'shots': self.shots, 'kills': kills,
+                'accuracy': round(kills / self.shots, 4) if self.shots else None,
+                'kills_by_type': self.kills, 'damage_by_type': self.damage,
+                'hits_taken': self.hits_taken, 'pickups': self.pickups,
+                'reloads': self.reloads, 'reloads_completed': self.reloads_done,
+                'heals': self.heals, 'heals_completed': self.heals_done, 'healed': self.healed,
+                'health': self.health}
+
+
+class Telemetry:
+    def __init__(self, directory, format='jsonl', capacity=16384, flush_interval=0.5,
+                 max_bytes=4 << 20, keep=20, health_bucket=5.0):
+        if format not in FORMATS:
+            raise ValueError(f"Unknown telemetry format: {format}")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.format = format
+        self.sink_class = SINKS[format]
+        self.max_bytes = max_bytes
+        self.keep = keep
+        self.flush_interval = flush_interval
+        self.health_bucket = health_bucket
+        self.session = time.strftime("%Y%m%d-%H%M%S")
+
+        # Event ring, written by the game loop, drained by the writer
+        self.capacity = capacity
+        self.code = np.zeros(capacity, np.uint8)
+        self.tick = np.zeros(capacity, np.int64)
+        self.time = np.zeros(capacity, np.float64)
+        self.a = np.zeros(capacity, np.int32)
+        self.b = np.zeros(capacity, np.int32)
+        self.head = 0   # total events written
+        self.tail = 0   # total events drained
+        self.lock = threading.Lock()
+        self.dropped = 0
+
+        # Game-loop side run state
+        self.runs = 0
+        self.active = False
+        self.meta = {}          # run number -> (names, meta), read by the writer
+        self.kind_of = {}       # enemy color -> type index
+        self.next_sample = 0.0
+        self.lowest = 0
+
+        # Writer side
+        self.totals = {}
+        self.sink = None
+        self.part = 0
+        self.records_written = 0
+        self.batches = 0
+        self.wake = threading.Event()
+        self.stopping = False
+        self.thread = threading.Thread(target=self._writer, name="telemetry-writer", daemon=True)
+        self.thread.start()
+
+    # ----- Game loop side -----
+    def _push(self, code, world, a=0, b=0):
+        with self.lock:
+            if self.head - self.tail >= self.capacity:
+                self.dropped += 1
+                return
+            i = self.head % self.capacity
+            self.code[i] = code
+            self.tick[i] = world.tick
+            self.time[i] = world.elapsed
+            self.a[i] = a
+            self.b[i] = b
+            self.head += 1
+
+    def start_run(self, world, **meta):
+        """Begin a run (call after the World is created or reset)."""
+        if self.active:
+            self.end_run(world)
+        self.runs += 1
+        self.active = True
+        config = world.config
+        self.kind_of = {tuple(t[0]): i for i, t in enumerate(config['enemy_types'])}
+        self.meta[self.runs] = (enemy_names(config), dict(meta, seed=world.seed))
+        self.next_sample = world.elapsed + self.health_bucket
+        self.lowest = world.health
+        self._push(CODES['run_start'], world, self.runs)
+
+    def record(self, world):
+        """Log the events of the tick that just ran."""
+        if not self.active:
+            return
+        for event in world.events:
+            kind = event[0]
+            if kind == 'kill':
+                self._push(CODES['kill'], world, self.kind_of.get(tuple(event[1]), -1))
+            elif kind == 'damage':
+                self._push(CODES['damage'], world, event[1], self.kind_of.get(tuple(event[2]), -1))
+            elif kind == 'healed':
+                self._push(CODES['healed'], world, event[1])
+            elif kind == 'down':
+                self._push(CODES['down'], world, event[1])
+            else:
+                self._push(CODES[kind], world)
+        self.lowest = min(self.lowest, world.health)
+        if world.elapsed >= self.next_sample:
+            self._push(CODES['health'], world, self.lowest)
+            self.next_sample += self.health_bucket
+            self.lowest = world.health
+
+    def end_run(self, world):
+        """Close the run; the writer emits its summary. Safe to call twice."""
+        if not self.active:
+            return
+        self.active = False
+        self._push(CODES['health'], world, min(self.lowest, world.health))
+        self._push(CODES['run_end'], world, world.score, int(world.dead))
+        self.wake.set()
+
+    def close(self):
+        """Flush everything still pending and stop the writer."""
+        self.stopping = True
+        self.wake.set()
+        self.thread.join()
+
+    def stats(self):
+        return {'events': self.head, 'pending': self.head - self.tail, 'dropped': self.dropped,
+                'records_written': self.records_written, 'batches': self.batches, 'files': self.part}
+
+    # ----- Writer thread -----
+    def _writer(self):
+        try:
+            while True:
+                self.wake.wait(self.flush_interval)
+                self.wake.clear()
+                stopping = self.stopping
+                self._flush()
+                if stopping:
+                    break
+        finally:
+            if self.sink is not None:
+                self.sink.close()
+
+    def _drain(self):
+        with self.lock:
+            start, end = self.tail, self.head
+            if start == end:
+                return None
+            rows = np.arange(start, end) % self.capacity
+            batch = (self.code[rows], self.tick[rows], self.time[rows], self.a[rows], self.b[rows])
+            self.tail = end
+        return batch
+
+    def _flush(self):
+        batch = self._drain()
+        if batch is None:
+            return
+        records = []
+        run = None
+        totals = None
+        for code, tick, t, a, b in zip(*(column.tolist() for column in batch)):
+            event = EVENTS[code]
+            t = round(t, 4)
+            if event == 'run_start':
+                names, meta = self.meta.pop(a)
+                run = f"{self.session}-{a}"
+                totals = self.totals[run] = RunTotals(run, names, meta)
+                records.append({'run': run, 'event': event, 'tick': tick, 't': t, **meta})
+                continue
+            if totals is None:
+                run, totals = self._open_run()
+            record = {'run': run, 'event': event, 'tick': tick, 't': t}
+            if event == 'shot':
+                totals.shots += 1
+            elif event == 'kill':
+                name = totals.name(a)
+                totals.kills[name] = totals.kills.get(name, 0) + 1
+                record['enemy'] = name
+            elif event == 'damage':
+                name = totals.name(b)
+                totals.damage[name] = totals.damage.get(name, 0) + a
+                totals.hits_taken += 1
+                record.update(amount=a, enemy=name)
+            elif event == 'pickup':
+                totals.pickups += 1
+            elif event == 'reload':
+                totals.reloads += 1
+            elif event == 'reloaded':
+                totals.reloads_done += 1
+            elif event == 'heal':
+                totals.heals += 1
+            elif event == 'healed':
+                totals.heals_done += 1
+                totals.healed += a
+                record['amount'] = a
+            elif event == 'health':
+                totals.health.append([t, a])
+                record['health'] = a
+            elif event == 'down':
+                record['player'] = a
+            elif event == 'run_end':
+                record = totals.summary(t, tick, a, bool(b))
+                del self.totals[run]
+                run = totals = None
+            records.append(record)
+        self._write(records)
+
+    def _open_run(self):
+        """(run, totals) for events that arrive outside a run_start/run_end pair."""
+        if self.totals:
+            # Still in the run the previous batch was working on
+            return next(reversed(self.totals.items()))
+        # The ring was full when run_start was pushed: open the oldest run
+        # that never got one, or a placeholder if there is none
+        number = min(list(self.meta), default=None)
+        names, meta = self.meta.pop(number) if number is not None else ([], {})
+        run = f"{self.session}-{number if number is not None else 'unknown'}"
+        totals = self.totals[run] = RunTotals(run, names, meta)
+        return run, totals
+
+    def _write(self, records):
+        if self.sink is None:
+            self.part += 1
+            path = os.path.join(self.directory, f"telemetry-{self.session}-{self.part:03}{self.sink_class.extension}")
+            self.sink = self.sink_class(path)
+            self._prune()
+        self.sink.write(records)
+        self.records_written += len(records)
+        self.batches += 1
+        if os.path.getsize(self.sink.path) >= self.max_bytes:
+            self.sink.close()
+            self.sink = None
+
+    def _prune(self):
+        # Runs before the new file exists, so leave room for it
+        files = sorted(glob.glob(os.path.join(self.directory, "telemetry-*" + self.sink_class.extension)))
+        for path in files[:max(0, len(files) - self.keep + 1)]:
+            os.remove(path)
+
+
+class NullTelemetry:
+    """Same interface as Telemetry; records nothing."""
+
+    def start_run(self, world, **meta):
+        pass
+
+    def record(self, world):
+        pass
+
+    def end_run(self, world):
+        pass
+
+    def close(self):
+        pass
+
+    def stats(self):
+        return {'events': 0, 'pending': 0, 'dropped': 0, 'records_written': 0, 'batches': 0, 'files': 0}
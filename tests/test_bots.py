@@ -0,0 +1,23 @@
+import engine
+from bots import Observation, make_bot
+
+
+def test_kite_reloads_and_keeps_killing():
+    world = engine.World(engine.make_config(), seed=0)
+    bot = make_bot('kite', seed=0)
+    kills = 0
+    for _ in range(3600):
+        engine.step(world, bot.act(Observation(world)))
+        kills += sum(1 for event in world.events if event[0] == 'kill')
+        if world.dead:
+            break
+    magazine = world.config['max_bullets']
+    assert kills > magazine, f"{kills} kills from a {magazine}-round magazine: the bot never reloaded"
+
+
+def test_kite_leaves_shared_idle_inputs_alone():
+    world = engine.World(engine.make_config(), seed=0)
+    world.players.columns['health'][0] = 70
+    world.heal_pickups.add_many(1, x=10.0, y=10.0)
+    make_bot('kite').act(Observation(world))
+    assert (engine.IDLE.move_x, engine.IDLE.move_y) == (0.0, 0.0)
@@ -0,0 +1,19 @@
+import os
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import pygame
+
+from controls import Controls
+
+
+def test_keyboard_only_plays_player_one_in_coop():
+    pygame.display.init()
+    pygame.joystick.init()
+    controls = Controls(players=2)
+    controls.begin_frame()
+    for key in (pygame.K_SPACE, pygame.K_r, pygame.K_e):
+        controls.handle(pygame.event.Event(pygame.KEYDOWN, key=key, mod=0, unicode='', scancode=0))
+    first, second = controls.snapshot(player=0), controls.snapshot(player=1)
+    assert first.shoot and first.reload and first.heal
+    assert not (second.shoot or second.reload or second.heal)
@@ -0,0 +1,73 @@
+import time
+import shutil
+
+import leaderboard
+from leaderboard import Leaderboard, LeaderboardServer
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.perf_counter() + timeout
+    while not condition():
+        if time.perf_counter() > deadline:
+            return False
+        time.sleep(0.02)
+    return True
+
+
+def queued_lines(path):
+    try:
+        with open(path) as f:
+            return f.readlines()
+    except FileNotFoundError:
+        return []
+
+
+def test_offline_queue_is_sent_once_after_reconnect(tmp_path):
+    queue = str(tmp_path / "queue.jsonl")
+    server = LeaderboardServer().start()
+    try:
+        server.fail = True
+        client = Leaderboard(server.url, queue, cabinet='cab', flush_interval=0.05, max_backoff=0.2)
+        for score in (100, 200, 300):
+            client.submit(score, 10.0)
+        assert wait_for(lambda: client.failures > 0)
+        client.close(timeout=0.1)
+        assert len(queued_lines(queue)) == 3 and not server.runs
+
+        # A reply lost after the server stored the batch: the same runs go out again
+        saved = str(tmp_path / "resend.jsonl")
+        shutil.copy(queue, saved)
+        server.fail = False
+        client = Leaderboard(server.url, queue, flush_interval=0.05)
+        assert wait_for(lambda: not queued_lines(queue) and client.stats()['queued'] == 0)
+        client.close()
+        assert sorted(run['score'] for run in server.runs.values()) == [100, 200, 300]
+
+        shutil.copy(saved, queue)
+        client = Leaderboard(server.url, queue, flush_interval=0.05)
+        assert wait_for(lambda: not queued_lines(queue))
+        client.close()
+        assert len(server.runs) == 3
+    finally:
+        server.stop()
+
+
+def test_unreadable_queue_does_not_stall_startup(tmp_path):
+    started = time.perf_counter()
+    client = Leaderboard("http://127.0.0.1:9", str(tmp_path), timeout=0.5)   # a directory
+    client.submit(100, 10.0)
+    client.close(timeout=0.1)
+    assert time.perf_counter() - started < 5.0
+
+
+def test_client_thread_failure_falls_back_to_offline(tmp_path, monkeypatch):
+    def broken(*args, **kwargs):
+        raise RuntimeError("no event loop for you")
+
+    monkeypatch.setattr(leaderboard, 'ConnectionPool', broken)
+    queue = str(tmp_path / "queue.jsonl")
+    client = Leaderboard("http://127.0.0.1:9", queue, timeout=0.5)
+    assert client.offline and client.online is False
+    client.submit(100, 10.0)
+    client.close()
+    assert len(queued_lines(queue)) == 1
@@ -0,0 +1,18 @@
+import pytest
+
+import engine
+
+
+def test_spawned_counts_only_rows_the_store_took():
+    cfg = engine.make_config(entity_overflow='drop', enemy_capacity=100,
+                             waves={'bursts': [{'at': 0, 'count': 500}], 'max_spawns_per_tick': 500})
+    world = engine.World(cfg, seed=0)
+    for _ in range(3):
+        engine.step(world, engine.IDLE)
+    assert world.waves.spawned == len(world.enemies) <= 100
+
+
+@pytest.mark.parametrize('burst', [{'count': 0}, {'count': -3}, {'count': 2.5}, {'count': 5, 'every': -1}])
+def test_bad_burst_is_a_config_error(burst):
+    with pytest.raises(ValueError):
+        engine.World(engine.make_config(waves={'bursts': [dict(at=1, **burst)]}), seed=0)
@@ -0,0 +1,95 @@
+from collections import OrderedDict
+
+# -----------------------------
+# Text surface cache
+# -----------------------------
+# font.render() allocates a new surface every call. The HUD and menus draw
+# the same handful of strings every frame, so keep the rendered surfaces
+# around, keyed on (font, text, color), and evict least recently used.
+
+
+class TextCache:
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, color):
+        key = (font, text, color)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+        self.misses += 1
+        surface = font.render(text, True, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_entries:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self):
+        return {
+            'entries': len(self.surfaces),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hit_rate(),
+        }
+
+
+# -----------------------------
+# Glyph atlas
+# -----------------------------
+# For strings that change every frame (the timer), caching whole strings
+# never hits. Instead render each character once and blit them side by
+# side. Digits share the widest digit's advance so the text doesn't jitter
+# as it counts.
+
+
+class GlyphAtlas:
+    def __init__(self, font, color, chars="0123456789:"):
+        self.font = font
+        self.color = color
+        self.glyphs = {}
+        self.advance = {}
+        for ch in chars:
+            self._add(ch)
+        digits = [self.advance[d] for d in "0123456789" if d in self.advance]
+        if digits:
+            widest = max(digits)
+            for d in "0123456789":
+                if d in self.advance:
+                    self.advance[d] = widest
+        self.height = font.get_linesize()
+
+    def _add(self, ch):
+        glyph = self.font.render(ch, True, self.color)
+        self.glyphs[ch] = glyph
+        self.advance[ch] = glyph.get_width()
+
+    def width(self, text):
+        advance = self.advance
+        for ch in text:
+            if ch not in advance:
+                self._add(ch)
+        return sum(advance[ch] for ch in text)
+
+    def blit(self, surface, text, pos):
+        """Draw text at pos; returns the width drawn."""
+        x, y = pos
+        glyphs = self.glyphs
+        advance = self.advance
+        start = x
+        for ch in text:
+            if ch not in glyphs:
+                self._add(ch)
+            glyph = glyphs[ch]
+            # center narrow glyphs inside their fixed digit cell
+            surface.blit(glyph, (x + (advance[ch] - glyph.get_width()) // 2, y))
+            x += advance[ch]
+        return x - start
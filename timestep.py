@@ -0,0 +1,81 @@
+import time
+
+# -----------------------------
+# Fixed-timestep accumulator
+# -----------------------------
+# The simulation always advances in steps of exactly `dt`, however fast or
+# slow frames are rendered. Each frame adds the real time that passed to an
+# accumulator and runs as many whole ticks as fit; the remainder becomes
+# `alpha`, how far the renderer should blend from the previous tick's state
+# to the current one.
+#
+# A long stall (debugger, window drag, slow machine) is clamped to
+# `max_frame_time` and at most `max_ticks` per frame, so the sim falls
+# behind real time instead of spiralling into ever longer catch-up frames.
+
+
+class FixedTimestep:
+    def __init__(self, tick_rate=60, max_frame_time=0.25, max_ticks=8, clock=time.perf_counter):
+        self.tick_rate = tick_rate
+        self.dt = 1.0 / tick_rate
+        self.max_frame_time = max_frame_time
+        self.max_ticks = max_ticks
+        self.clock = clock
+        self.accumulator = 0.0
+        self.last = None
+        self.dropped_time = 0.0
+
+    def advance(self):
+        """Number of ticks to simulate this frame."""
+        now = self.clock()
+        if self.last is None:
+            self.last = now
+            return 0
+        frame_time = now - self.last
+        self.last = now
+        if frame_time > self.max_frame_time:
+            self.dropped_time += frame_time - self.max_frame_time
+            frame_time = self.max_frame_time
+        self.accumulator += frame_time
+        ticks = int(self.accumulator / self.dt)
+        self.accumulator -= ticks * self.dt
+        if ticks > self.max_ticks:
+            self.dropped_time += (ticks - self.max_ticks) * self.dt
+            ticks = self.max_ticks
+        return ticks
+
+    @property
+    def alpha(self):
+        """Blend factor in [0, 1) between the previous and current tick."""
+        return min(self.accumulator / self.dt, 1.0)
+
+
+# -----------------------------
+# Game clock
+# -----------------------------
+# One monotonic clock for the whole game: time.perf_counter() minus every
+# stretch spent stopped. Gameplay starts it when it is the top scene and
+# stops it when a menu covers it, so anything timed off it (the fixed
+# timestep above) simply sees no time pass while paused, dead or in the
+# podium, with no pause bookkeeping of its own.
+
+
+class GameClock:
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.stopped_at = clock()   # starts stopped
+        self.stopped_total = 0.0
+
+    def now(self):
+        if self.stopped_at is not None:
+            return self.stopped_at - self.stopped_total
+        return self.clock() - self.stopped_total
+
+    def start(self):
+        if self.stopped_at is not None:
+            self.stopped_total += self.clock() - self.stopped_at
+            self.stopped_at = None
+
+    def stop(self):
+        if self.stopped_at is None:
+            self.stopped_at = self.clock()
@@ -0,0 +1,224 @@
+import json
+from collections import deque
+
+import numpy as np
+
+# -----------------------------
+# Wave scheduler
+# -----------------------------
+# Data-driven enemy spawning, used instead of the fixed spawn_interval when
+# config['waves'] is set. A wave spec (a JSON file, see wavesets/) gives:
+#
+#   rate         spawns per second over elapsed time, as [[t, value], ...]
+#                points joined linearly and held after the last one
+#   mix          enemy type weights over time, [[t, [w0, w1, ...]], ...]
+#   speed_scale  multiplier on every type's speed over time
+#   edges        weights for the random edge pattern, e.g. {"left": 2}
+#   bursts       one-off or repeating waves:
+#                {"at": 30, "count": 200, "pattern": "ring",
+#                 "every": 60, "until": 600, "mix": [0, 0, 1], "edge": "top"}
+#   max_spawns_per_tick   how many queued spawns enter the world per tick
+#   max_enemies           spawning pauses while this many are alive
+#   max_queued            spawns that fall due while the queue already
+#                         holds this many are dropped (default 4096)
+#
+# Everything due is computed in bulk and queued; each tick releases at most
+# max_spawns_per_tick of the queue with one EntityStore.add_many(), so a
+# 500-enemy burst lands over a few dozen ticks instead of in one spike.
+# While max_enemies holds releases back the queue would otherwise grow for
+# as long as the cap lasts, hence max_queued.
+#
+# Patterns place spawns just outside the screen: 'random' (weighted
+# edges), 'edge' (spread along one edge), 'ring' (evenly around the
+# screen) and 'corners'. In a world bigger than the screen, update() is
+# given the top-left of the screen-sized area to spawn around.
+
+EDGES = ('top', 'bottom', 'left', 'right')
+PATTERNS = ('random', 'edge', 'ring', 'corners')
+SPEC_KEYS = {'rate', 'mix', 'speed_scale', 'edges', 'bursts', 'max_spawns_per_tick', 'max_enemies',
+             'max_queued'}
+BURST_KEYS = {'at', 'count', 'pattern', 'every', 'until', 'mix', 'edge'}
+
+
+def load_waves(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def validate(spec, type_count):
+    """Raise ValueError describing the first problem with a wave spec."""
+    unknown = set(spec) - SPEC_KEYS
+    if unknown:
+        raise ValueError(f"Unknown wave keys: {', '.join(sorted(unknown))}")
+    for key in ('rate', 'mix', 'speed_scale'):
+        points = spec.get(key)
+        if points is not None:
+            if not points or any(len(p) != 2 for p in points):
+                raise ValueError(f"'{key}' must be a list of [time, value] points")
+            if any(b[0] < a[0] for a, b in zip(points, points[1:])):
+                raise ValueError(f"'{key}' times must be increasing")
+    for _, weights in spec.get('mix', ()):
+        if len(weights) != type_count:
+            raise ValueError(f"'mix' weights need one value per enemy type ({type_count})")
+    for edge in spec.get('edges', {}):
+        if edge not in EDGES:
+            raise ValueError(f"Unknown edge: {edge}")
+    for burst in spec.get('bursts', ()):
+        unknown = set(burst) - BURST_KEYS
+        if unknown:
+            raise ValueError(f"Unknown burst keys: {', '.join(sorted(unknown))}")
+        if 'at' not in burst or 'count' not in burst:
+            raise ValueError("A burst needs 'at' and 'count'")
+        if not isinstance(burst['count'], int) or burst['count'] < 1:
+            raise ValueError(f"Burst 'count' must be a whole number of at least 1, not {burst['count']!r}")
+        if burst.get('every') is not None and burst['every'] <= 0:
+            raise ValueError(f"Burst 'every' must be positive, not {burst['every']!r}")
+        if burst.get('pattern', 'random') not in PATTERNS:
+            raise ValueError(f"Unknown burst pattern: {burst['pattern']}")
+        if burst.get('edge', 'top') not in EDGES:
+            raise ValueError(f"Unknown edge: {burst['edge']}")
+        if 'mix' in burst and len(burst['mix']) != type_count:
+            raise ValueError(f"Burst 'mix' needs one value per enemy type ({type_count})")
+
+
+class Curve:
+    """Piecewise-linear function of time; values may be scalars or vectors."""
+
+    def __init__(self, points):
+        self.times = np.array([p[0] for p in points], float)
+        self.values = np.array([p[1] for p in points], float)
+
+    def __call__(self, t):
+        if self.values.ndim == 1:
+            return float(np.interp(t, self.times, self.values))
+        return np.array([np.interp(t, self.times, column) for column in self.values.T])
+
+
+class WaveScheduler:
+    def __init__(self, spec, rng, enemy_types, enemy_size, width, height):
+        validate(spec, len(enemy_types))
+        self.rng = rng   # numpy Generator
+        self.enemy_size = enemy_size
+        self.width = width
+        self.height = height
+        self.type_speed = np.array([t[1] for t in enemy_types], float)
+        self.type_damage = np.array([t[2] for t in enemy_types], np.int32)
+        self.type_points = np.array([t[3] for t in enemy_types], np.int32)
+
+        self.rate = Curve(spec.get('rate', [[0, 0.8]]))
+        self.mix = Curve(spec.get('mix', [[0, [t[4] for t in enemy_types]]]))
+        self.speed_scale = Curve(spec.get('speed_scale', [[0, 1.0]]))
+        edges = spec.get('edges', {})
+        weights = np.array([edges.get(edge, 1.0) for edge in EDGES], float)
+        self.edge_weights = weights / weights.sum()
+        self.budget = spec.get('max_spawns_per_tick', 16)
+        self.max_enemies = spec.get('max_enemies')
+        self.max_queued = spec.get('max_queued', 4096)
+
+        self.bursts = [dict(burst) for burst in spec.get('bursts', ())]
+        self.next_burst = [burst['at'] for burst in self.bursts]
+        self.credit = 0.0
+        self.queue = deque()   # (kinds, xs, ys) chunks waiting to spawn
+        self.queued = 0
+        self.spawned = 0
+        self.dropped = 0       # due while the queue was full
+        self.origin = (0, 0)
+
+    # ----- Positions -----
+    def _edge_positions(self, edges):
+        """Random points just off the given edges (indices into EDGES)."""
+        n = len(edges)
+        size = self.enemy_size
+        along_x = self.rng.integers(0, self.width + 1, n).astype(float)
+        along_y = self.rng.integers(0, self.height + 1, n).astype(float)
+        xs = np.select([edges == 2, edges == 3], [-size, self.width + size], along_x)
+        ys = np.select([edges == 0, edges == 1], [-size, self.height + size], along_y)
+        return xs, ys
+
+    def _positions(self, pattern, n, edge=None):
+        size = self.enemy_size
+        if pattern == 'random':
+            return self._edge_positions(self.rng.choice(4, n, p=self.edge_weights))
+        if pattern == 'edge':
+            index = EDGES.index(edge) if edge is not None else int(self.rng.choice(4, p=self.edge_weights))
+            along = (np.arange(n) + self.rng.random(n)) / n
+            if index < 2:
+                xs = along * self.width
+                ys = np.full(n, -size if index == 0 else self.height + size, float)
+            else:
+                xs = np.full(n, -size if index == 2 else self.width + size, float)
+                ys = along * self.height
+            return xs, ys
+        if pattern == 'ring':
+            angles = (np.arange(n) + self.rng.random()) * (2 * np.pi / n)
+            radius = np.hypot(self.width, self.height) / 2 + size
+            return (self.width / 2 + radius * np.cos(angles) - size / 2,
+                    self.height / 2 + radius * np.sin(angles) - size / 2)
+        # corners
+        corner = np.arange(n) % 4
+        jitter = self.rng.random((2, n)) * size * 2
+        xs = np.where(corner % 2 == 0, -size - jitter[0], self.width + size + jitter[0])
+        ys = np.where(corner < 2, -size - jitter[1], self.height + size + jitter[1])
+        return xs, ys
+
+    def _kinds(self, n, weights):
+        weights = np.maximum(np.asarray(weights, float), 0)
+        return self.rng.choice(len(weights), n, p=weights / weights.sum()).astype(np.int8)
+
+    def _enqueue(self, kinds, xs, ys):
+        room = max(self.max_queued - self.queued, 0)
+        if len(kinds) > room:
+            self.dropped += len(kinds) - room
+            kinds, xs, ys = kinds[:room], xs[:room], ys[:room]
+        if len(kinds):
+            ox, oy = self.origin
+            self.queue.append((kinds, xs + ox, ys + oy))
+            self.queued += len(kinds)
+
+    # ----- Per tick -----
+    def update(self, enemies, now, dt, origin=(0, 0)):
+        """Queue whatever became due by `now` and release this tick's share."""
+        self.origin = origin
+        self.credit += self.rate(now) * dt
+        n = int(self.credit)
+        if n:
+            self.credit -= n
+            self._enqueue(self._kinds(n, self.mix(now)), *self._positions('random', n))
+
+        for i, burst in enumerate(self.bursts):
+            while self.next_burst[i] is not None and now >= self.next_burst[i]:
+                count = burst['count']
+                weights = burst['mix'] if 'mix' in burst else self.mix(now)
+                self._enqueue(self._kinds(count, weights),
+                              *self._positions(burst.get('pattern', 'random'), count, burst.get('edge')))
+                every, until = burst.get('every'), burst.get('until')
+                following = self.next_burst[i] + every if every else None
+                if following is not None and until is not None and following > until:
+                    following = None
+                self.next_burst[i] = following
+
+        room = self.budget
+        if self.max_enemies is not None:
+            room = min(room, self.max_enemies - len(enemies))
+        if room > 0 and self.queued:
+            self._release(enemies, min(room, self.queued), now)
+
+    def _release(self, enemies, n, now):
+        parts = []
+        taken = 0
+        while taken < n:
+            kinds, xs, ys = self.queue[0]
+            k = min(n - taken, len(kinds))
+            parts.append((kinds[:k], xs[:k], ys[:k]))
+            if k == len(kinds):
+                self.queue.popleft()
+            else:
+                self.queue[0] = (kinds[k:], xs[k:], ys[k:])
+            taken += k
+        kinds, xs, ys = (np.concatenate(column) for column in zip(*parts))
+        self.queued -= n
+        # Rows the store refused under its 'drop' policy never spawned
+        rows = enemies.add_many(n, x=xs, y=ys, prev_x=xs, prev_y=ys, size=self.enemy_size,
+                                speed=self.type_speed[kinds] * self.speed_scale(now),
+                                damage=self.type_damage[kinds], points=self.type_points[kinds], kind=kinds, far=False)
+        self.spawned += len(rows)